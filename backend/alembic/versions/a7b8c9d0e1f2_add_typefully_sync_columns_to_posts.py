@@ -0,0 +1,33 @@
+"""add typefully sync columns to posts
+
+Revision ID: a7b8c9d0e1f2
+Revises: f6a7b8c9d0e1
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "a7b8c9d0e1f2"
+down_revision: Union[str, None] = "f6a7b8c9d0e1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("posts", sa.Column("typefully_status", sa.String(length=30), nullable=True))
+    op.add_column(
+        "posts", sa.Column("typefully_publish_at", sa.DateTime(timezone=True), nullable=True)
+    )
+    op.add_column(
+        "posts", sa.Column("typefully_synced_at", sa.DateTime(timezone=True), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("posts", "typefully_synced_at")
+    op.drop_column("posts", "typefully_publish_at")
+    op.drop_column("posts", "typefully_status")
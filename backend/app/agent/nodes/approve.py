@@ -41,6 +41,7 @@ async def approve_node(state: AgentState) -> Command:
             update={
                 "approval_status": "edit_requested",
                 "approval_feedback": feedback,
+                "force_image_regeneration": bool(user_response.get("regenerate_image")),
                 "current_stage": "revision",
             },
         )
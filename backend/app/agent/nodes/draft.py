@@ -5,6 +5,9 @@ from app.agent.prompts.simplification import SIMPLIFICATION_PROMPT
 from app.agent.prompts.story import STORY_PROMPT
 from app.agent.prompts.leader_lens import LEADER_LENS_PROMPT
 from app.services.llm import llm_completion
+from app.services.source_index import build_source_index, retrieve_passages
+
+SOURCE_TOKEN_BUDGET = 1250
 
 FORMAT_PROMPTS = {
     "framework": FRAMEWORK_PROMPT,
@@ -35,9 +38,18 @@ async def draft_node(state: AgentState) -> dict:
     )
 
     if state.get("uploaded_file_text"):
-        prompt += f"\n\nSource material from uploaded file:\n{state['uploaded_file_text'][:5000]}"
+        index = state.get("source_index") or build_source_index(state["uploaded_file_text"])
+        query = " ".join(
+            [
+                state.get("user_input", ""),
+                *state.get("trending_angles", []),
+                state.get("approval_feedback", ""),
+            ]
+        )
+        passages = retrieve_passages(index, query, max_tokens=SOURCE_TOKEN_BUDGET)
+        prompt += f"\n\nSource material from uploaded file:\n{passages}"
 
-    result = await llm_completion(prompt)
+    result = await llm_completion(prompt, task="draft")
 
     # Extract hook (first 2 lines) and CTA (last line with ?)
     lines = [l for l in result.strip().split("\n") if l.strip()]
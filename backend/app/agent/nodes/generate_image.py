@@ -1,10 +1,59 @@
+from functools import partial
+
+from langchain_core.runnables import RunnableConfig
+
 from app.agent.state import AgentState
 from app.agent.prompts.image_prompt import IMAGE_PROMPT_TEMPLATE
+from app.config import settings
 from app.services.llm import llm_completion
+from app.services.image_cache import find_cached_image, remember_image
 from app.services.image_gen import generate_image
+from app.services.image_jobs import attach_image, start_image_job
+from app.utils.hedge import LatencyTracker, hedged_first, timed
+
+# Generation is paid for when it starts, so it only starts once web retrieval has run
+# past its recent p50 (or failed). Bounds in seconds.
+RETRIEVAL_HEDGE_DEFAULT = 8.0
+RETRIEVAL_HEDGE_MIN = 2.0
+RETRIEVAL_HEDGE_MAX = 30.0
+
+_retrieval_latency = LatencyTracker()
+
+
+def _retrieval_hedge_delay() -> float:
+    p50 = _retrieval_latency.percentile(50, default=RETRIEVAL_HEDGE_DEFAULT)
+    return min(max(p50, RETRIEVAL_HEDGE_MIN), RETRIEVAL_HEDGE_MAX)
+
 
+def _succeeded(result: tuple[dict, str]) -> bool:
+    return result[0]["success"]
+
+
+async def _generate_or_retrieve(image_prompt: str, state: AgentState) -> tuple[dict, str]:
+    """Get an image, trying a web image first and hedging with generation. Returns
+    (result, source)."""
+    if not (settings.image_race_web_retrieval and settings.tavily_api_key):
+        return await generate_image(image_prompt), "generated"
+
+    from app.services.tavily_search import retrieve_web_image
+
+    async def retrieved() -> tuple[dict, str]:
+        result = await retrieve_web_image(
+            state.get("draft_content", ""), state.get("content_pillar", "")
+        )
+        return result, "retrieved"
+
+    async def generated() -> tuple[dict, str]:
+        return await generate_image(image_prompt), "generated"
+
+    return await hedged_first(
+        [partial(timed, retrieved, _retrieval_latency, _succeeded), generated],
+        delays=[0.0, _retrieval_hedge_delay()],
+        is_success=_succeeded,
+    )
 
-async def generate_image_node(state: AgentState) -> dict:
+
+async def generate_image_node(state: AgentState, config: RunnableConfig) -> dict:
     # If uploaded images exist, use the first one instead of generating
     uploaded_images = state.get("uploaded_images", [])
     if uploaded_images:
@@ -15,6 +64,44 @@ async def generate_image_node(state: AgentState) -> dict:
             "current_stage": "generate_image",
         }
 
+    post_id = state.get("post_id")
+    if not post_id:
+        return await produce_image(state)
+
+    # Generation takes the better part of a minute, so it runs in the background while
+    # the text goes through optimize/proofread, and attaches itself at review time
+    thread_id = config["configurable"]["thread_id"]
+    start_image_job(post_id, _background_image(dict(state), thread_id))
+    return {
+        "image_prompt": "",
+        "image_url": "",
+        "image_generation_status": "pending",
+        "image_source_decision": "",
+        "image_decision_reasoning": "",
+        "force_image_regeneration": False,
+        "current_stage": "generate_image",
+    }
+
+
+async def _background_image(state: AgentState, thread_id: str) -> dict | None:
+    try:
+        update = await produce_image(state)
+    except Exception as e:
+        update = {
+            "image_prompt": "",
+            "image_url": "",
+            "image_generation_status": f"failed: {e}",
+            "force_image_regeneration": False,
+            "current_stage": "generate_image",
+        }
+    return await attach_image(thread_id, state["post_id"], update)
+
+
+async def produce_image(state: AgentState) -> dict:
+    """Write an image prompt for the draft and get an image for it.
+
+    Returns the generate_image state update.
+    """
     # Generate image prompt from post content
     prompt = IMAGE_PROMPT_TEMPLATE.format(
         post_content=state.get("draft_content", ""),
@@ -22,22 +109,44 @@ async def generate_image_node(state: AgentState) -> dict:
         content_pillar=state.get("content_pillar", ""),
     )
 
-    image_prompt = await llm_completion(prompt, max_tokens=200, temperature=0.5)
+    image_prompt = (await llm_completion(prompt, task="image_prompt")).strip()
+
+    # Reuse an existing image when the visual concept hasn't changed (e.g. text-only revisions)
+    if not state.get("force_image_regeneration"):
+        cached_path = await find_cached_image(image_prompt, state.get("post_id"))
+        if cached_path:
+            return {
+                "image_prompt": image_prompt,
+                "image_url": cached_path,
+                "image_generation_status": "cached",
+                "force_image_regeneration": False,
+                "current_stage": "generate_image",
+            }
 
-    # Generate image
-    result = await generate_image(image_prompt.strip())
+    # Generate image (or take a web image if one is ready first)
+    result, source = await _generate_or_retrieve(image_prompt, state)
 
     if result["success"]:
-        return {
-            "image_prompt": image_prompt.strip(),
+        update = {
+            "image_prompt": image_prompt,
             "image_url": result["file_path"],
             "image_generation_status": "success",
+            "image_source_decision": source,
+            "force_image_regeneration": False,
             "current_stage": "generate_image",
         }
+        if source == "retrieved":
+            update["image_decision_reasoning"] = (
+                f"Web image was ready before generation finished ({result['source_url']})"
+            )
+        else:
+            remember_image(image_prompt, result["file_path"], state.get("post_id"))
+        return update
     else:
         return {
-            "image_prompt": image_prompt.strip(),
+            "image_prompt": image_prompt,
             "image_url": "",
             "image_generation_status": f"failed: {result['error']}",
+            "force_image_regeneration": False,
             "current_stage": "generate_image",
         }
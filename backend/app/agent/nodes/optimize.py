@@ -5,10 +5,13 @@ from app.agent.state import AgentState
 from app.agent.prompts.optimize import build_optimize_prompt
 from app.config import settings
 from app.services.llm import llm_completion
+from app.services.source_index import build_source_index, retrieve_passages
 from app.utils.linkedin import strip_markdown, validate_linkedin_post
 
 logger = logging.getLogger(__name__)
 
+SOURCE_TOKEN_BUDGET = 750
+
 
 async def optimize_node(state: AgentState) -> dict:
     draft_content = state.get("draft_content", "")
@@ -43,9 +46,11 @@ async def optimize_node(state: AgentState) -> dict:
     )
 
     if state.get("uploaded_file_text"):
-        prompt += f"\n\nOriginal source material (verify facts against this):\n{state['uploaded_file_text'][:3000]}"
+        index = state.get("source_index") or build_source_index(state["uploaded_file_text"])
+        passages = retrieve_passages(index, draft_content, max_tokens=SOURCE_TOKEN_BUDGET)
+        prompt += f"\n\nOriginal source material (verify facts against this):\n{passages}"
 
-    result = await llm_completion(prompt)
+    result = await llm_completion(prompt, task="optimize")
 
     # Phase 3: Parse response
     optimized = ""
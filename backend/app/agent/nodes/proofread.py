@@ -11,7 +11,7 @@ async def proofread_node(state: AgentState) -> dict:
         optimized_content=state.get("optimized_content", ""),
     )
 
-    result = await llm_completion(prompt)
+    result = await llm_completion(prompt, task="proofread")
 
     # Parse sections
     proofread = ""
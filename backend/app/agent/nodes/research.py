@@ -3,21 +3,43 @@ import re
 from app.agent.state import AgentState
 from app.agent.prompts.research import RESEARCH_PROMPT
 from app.services.llm import llm_completion
+from app.services.source_index import build_source_index, retrieve_passages
+from app.services.web_research import fetch_trending_topics
+
+SOURCE_TOKEN_BUDGET = 750
+TRENDING_TOPICS_SHOWN = 8
 
 
 async def research_node(state: AgentState) -> dict:
     file_context = ""
     if state.get("uploaded_file_text"):
-        file_context = f"Uploaded file content:\n{state['uploaded_file_text'][:3000]}"
+        index = state.get("source_index") or build_source_index(state["uploaded_file_text"])
+        passages = retrieve_passages(
+            index,
+            f"{state.get('user_input', '')} {state.get('content_pillar', '')}",
+            max_tokens=SOURCE_TOKEN_BUDGET,
+        )
+        file_context = f"Uploaded file content:\n{passages}"
+
+    # Precomputed by the background feed refresh, so this never waits on the network
+    trending_context = ""
+    topics = await fetch_trending_topics()
+    if topics:
+        lines = "\n".join(f"- {t['title']}" for t in topics[:TRENDING_TOPICS_SHOWN])
+        trending_context = (
+            "Currently trending on HackerNews (use only where relevant to the topic):\n"
+            f"{lines}"
+        )
 
     prompt = RESEARCH_PROMPT.format(
         content_pillar=state.get("content_pillar", ""),
         post_format=state.get("post_format", ""),
         user_input=state.get("user_input", ""),
         file_context=file_context,
+        trending_context=trending_context,
     )
 
-    result = await llm_completion(prompt)
+    result = await llm_completion(prompt, task="research")
 
     # Parse trending angles
     angles = []
@@ -10,6 +10,8 @@ User's Topic/Input:
 
 {file_context}
 
+{trending_context}
+
 Tasks:
 1. Identify 3-5 trending angles related to this topic in the AI/enterprise space
 2. Generate 3-5 compelling hook ideas that would work for this format
@@ -7,6 +7,7 @@ class AgentState(TypedDict, total=False):
     content_pillar: str
     post_format: str
     uploaded_file_text: str
+    source_index: dict
     uploaded_images: list[str]
     post_id: str
 
@@ -24,6 +25,7 @@ class AgentState(TypedDict, total=False):
     image_prompt: str
     image_url: str
     image_generation_status: str
+    force_image_regeneration: bool
 
     # Optimize
     optimized_content: str
@@ -1,4 +1,5 @@
 import os
+import time
 import uuid
 import json
 import logging
@@ -14,6 +15,17 @@ from app.models.post import Post, Draft, PostStatus
 from app.models.media_asset import MediaAsset, MediaSource
 from app.agent.graph import build_graph
 from app.agent.checkpointer import get_checkpointer
+from app.services.agent_runs import cancel_run, run_cancellable, thread_lock
+from app.services.image_jobs import (
+    DELIVERY_TIMEOUT,
+    cancel_image_job,
+    collect_image_job,
+    has_image_job,
+    record_image_asset,
+)
+from app.services.model_routing import routing_profile
+from app.services.source_index import build_source_index
+from app.utils import metrics
 from app.schemas.agent import (
     AgentRunRequest,
     AgentRunResponse,
@@ -33,6 +45,40 @@ def _disk_path_to_url(disk_path: str) -> str:
     return f"/api/uploads/file/{filename}"
 
 
+def _record_pipeline(kind: str, started: float) -> None:
+    """Time from a run (or revision) starting to the post awaiting review, per routing profile."""
+    prefix = f"pipeline.{routing_profile()}.{kind}"
+    metrics.incr(f"{prefix}.runs")
+    metrics.incr(f"{prefix}.seconds", time.monotonic() - started)
+
+
+async def _deliver_pending_image(
+    compiled, config: dict, post: Post, timeout: float = DELIVERY_TIMEOUT
+) -> dict | None:
+    """Wait for a thread's background image once it's paused for review.
+
+    The job itself writes the image into the checkpointed state and records its
+    MediaAsset; this only reports it. Returns the `image_ready` event data, or None if
+    nothing was delivered.
+    """
+    post_id = str(post.id)
+    if not has_image_job(post_id):
+        return None
+    snapshot = await compiled.aget_state(config)
+    if "approve" not in snapshot.next:
+        return None
+
+    update = await collect_image_job(post_id, timeout)
+    if update is None:
+        return None
+
+    event_data = _build_event_data("generate_image", update)
+    event_data["image_generation_status"] = update.get("image_generation_status", "")
+    if update.get("image_url"):
+        event_data["image_url"] = _disk_path_to_url(update["image_url"])
+    return event_data
+
+
 def _build_event_data(node_name: str, node_output: dict) -> dict:
     """Build enriched SSE event data with stage descriptions and content previews."""
     event_data: dict = {
@@ -59,6 +105,12 @@ def _build_event_data(node_name: str, node_output: dict) -> dict:
         status = node_output.get("image_generation_status", "")
         if status == "skipped_no_key":
             event_data["description"] = "Image generation skipped (no API key)"
+        elif status == "pending":
+            event_data["description"] = "Image generating in the background"
+        elif status == "cached":
+            event_data["description"] = "Reused existing image (concept unchanged)"
+        elif node_output.get("image_source_decision") == "retrieved":
+            event_data["description"] = "Relevant web image found"
         elif node_output.get("image_url"):
             event_data["description"] = "Image generated successfully"
         else:
@@ -109,6 +161,7 @@ async def run_agent(request: AgentRunRequest, db: AsyncSession = Depends(get_db)
         post.user_input = request.user_input
     if request.uploaded_file_text:
         post.uploaded_file_text = request.uploaded_file_text
+        post.uploaded_file_index = build_source_index(request.uploaded_file_text)
     await db.commit()
 
     return AgentRunResponse(
@@ -121,6 +174,7 @@ async def run_agent(request: AgentRunRequest, db: AsyncSession = Depends(get_db)
 @router.get("/stream/{thread_id}")
 async def stream_agent(thread_id: str, db: AsyncSession = Depends(get_db)):
     async def event_generator():
+        started = time.monotonic()
         try:
             checkpointer = await get_checkpointer()
             graph = build_graph()
@@ -138,195 +192,44 @@ async def stream_agent(thread_id: str, db: AsyncSession = Depends(get_db)):
             # Query extracted images for this post
             uploaded_images = []
             img_result = await db.execute(
-                select(MediaAsset).where(
+                select(MediaAsset)
+                .where(
                     MediaAsset.post_id == post.id,
                     MediaAsset.source == MediaSource.EXTRACTED,
                 )
+                .order_by(MediaAsset.extraction_rank.asc().nulls_last(), MediaAsset.created_at)
             )
             for asset in img_result.scalars().all():
                 uploaded_images.append(asset.file_path)
 
+            # Posts created before the index existed get one built on first run
+            source_index = post.uploaded_file_index
+            if post.uploaded_file_text and not source_index:
+                source_index = build_source_index(post.uploaded_file_text)
+                post.uploaded_file_index = source_index
+                await db.commit()
+
             initial_state = {
                 "user_input": post.user_input or post.title,
                 "content_pillar": post.content_pillar,
                 "post_format": post.post_format,
                 "post_id": str(post.id),
                 "uploaded_file_text": post.uploaded_file_text or "",
+                "source_index": source_index or {},
                 "uploaded_images": uploaded_images,
                 "revision_count": 0,
             }
 
-            async for event in compiled.astream(initial_state, config, stream_mode="updates"):
-                for node_name, node_output in event.items():
-                    if node_name == "__interrupt__":
-                        # Mark post as in_review so the editor unlocks
-                        post.status = PostStatus.IN_REVIEW
-                        await db.commit()
-
-                        # Convert image_url from disk path to HTTP URL
-                        interrupt_value = node_output[0].value if node_output else {}
-                        if isinstance(interrupt_value, dict):
-                            if interrupt_value.get("image_url"):
-                                interrupt_value["image_url"] = _disk_path_to_url(
-                                    interrupt_value["image_url"]
-                                )
-                            if interrupt_value.get("original_image_url"):
-                                interrupt_value["original_image_url"] = _disk_path_to_url(
-                                    interrupt_value["original_image_url"]
-                                )
-                        yield {
-                            "event": "interrupt",
-                            "data": json.dumps(interrupt_value),
-                        }
-                    else:
-                        event_data = _build_event_data(node_name, node_output)
-
-                        # Handle image generation completion
-                        if node_name == "generate_image" and node_output.get("image_url"):
-                            disk_path = node_output["image_url"]
-                            http_url = _disk_path_to_url(disk_path)
-                            event_data["image_url"] = http_url
-
-                            # Create MediaAsset record for generated image
-                            if os.path.exists(disk_path):
-                                img_asset = MediaAsset(
-                                    post_id=post.id,
-                                    filename=os.path.basename(disk_path),
-                                    file_path=disk_path,
-                                    content_type="image/png",
-                                    file_size=os.path.getsize(disk_path),
-                                    source=MediaSource.GENERATED,
-                                    prompt_used=node_output.get("image_prompt", ""),
-                                )
-                                db.add(img_asset)
-                                await db.commit()
-
-                        # Handle optimize node fact-check info
-                        if node_name == "optimize":
-                            if node_output.get("fact_check_performed"):
-                                event_data["fact_check_performed"] = True
-                                event_data["claims_checked"] = len(
-                                    node_output.get("fact_check_results", [])
-                                )
-
-                        yield {
-                            "event": "node_complete",
-                            "data": json.dumps(event_data),
-                        }
-
-                        # Save draft if draft node completed
-                        if node_name == "draft" and node_output.get("draft_content"):
-                            max_ver = await db.execute(
-                                select(func.coalesce(func.max(Draft.version), 0)).where(
-                                    Draft.post_id == post.id
-                                )
-                            )
-                            next_version = max_ver.scalar() + 1
-                            draft = Draft(
-                                post_id=post.id,
-                                version=next_version,
-                                content=node_output["draft_content"],
-                                hook=node_output.get("draft_hook"),
-                                cta=node_output.get("draft_cta"),
-                                stage="draft",
-                            )
-                            db.add(draft)
-                            await db.commit()
-
-                        # Save draft for optimize stage
-                        if node_name == "optimize" and node_output.get("optimized_content"):
-                            max_ver = await db.execute(
-                                select(func.coalesce(func.max(Draft.version), 0)).where(
-                                    Draft.post_id == post.id
-                                )
-                            )
-                            next_version = max_ver.scalar() + 1
-                            hashtags = node_output.get("suggested_hashtags", [])
-                            draft = Draft(
-                                post_id=post.id,
-                                version=next_version,
-                                content=node_output["optimized_content"],
-                                hashtags=", ".join(hashtags) if hashtags else None,
-                                stage="optimize",
-                            )
-                            db.add(draft)
-                            await db.commit()
-
-                        # Save draft for proofread stage
-                        if node_name == "proofread" and node_output.get("proofread_content"):
-                            max_ver = await db.execute(
-                                select(func.coalesce(func.max(Draft.version), 0)).where(
-                                    Draft.post_id == post.id
-                                )
-                            )
-                            next_version = max_ver.scalar() + 1
-                            draft = Draft(
-                                post_id=post.id,
-                                version=next_version,
-                                content=node_output["proofread_content"],
-                                stage="proofread",
-                            )
-                            db.add(draft)
-                            await db.commit()
-
-            # Check final state
-            state = await compiled.aget_state(config)
-            final = state.values
-            if final.get("approval_status") == "approved":
-                post.status = PostStatus.APPROVED
-                post.final_content = final.get("proofread_content", "")
-                post.revision_count = final.get("revision_count", 0)
-                await db.commit()
-                yield {
-                    "event": "complete",
-                    "data": json.dumps({"status": "approved", "post_id": str(post.id)}),
-                }
-            else:
-                yield {
-                    "event": "paused",
-                    "data": json.dumps({"status": "awaiting_approval"}),
-                }
-
-        except Exception as e:
-            logger.error(f"Agent stream error: {e}", exc_info=True)
-            yield {"event": "error", "data": json.dumps({"error": str(e)})}
-
-    return EventSourceResponse(event_generator())
-
-
-@router.post("/resume/{thread_id}")
-async def resume_agent(
-    thread_id: str, request: AgentResumeRequest, db: AsyncSession = Depends(get_db)
-):
-    try:
-        checkpointer = await get_checkpointer()
-        graph = build_graph()
-        compiled = graph.compile(checkpointer=checkpointer)
-        config = {"configurable": {"thread_id": thread_id}}
-
-        # Set status back to drafting while the pipeline runs
-        result = await db.execute(select(Post).where(Post.thread_id == thread_id))
-        resume_post = result.scalar_one_or_none()
-        if resume_post:
-            resume_post.status = PostStatus.DRAFTING
-            await db.commit()
-
-        # Resume with user's decision
-        command = Command(resume={"status": request.status, "feedback": request.feedback or ""})
-
-        async def event_generator():
-            try:
-                result = await db.execute(select(Post).where(Post.thread_id == thread_id))
-                post = result.scalar_one_or_none()
-
-                async for event in compiled.astream(command, config, stream_mode="updates"):
+            async with thread_lock(thread_id):
+                async for event in compiled.astream(initial_state, config, stream_mode="updates"):
                     for node_name, node_output in event.items():
                         if node_name == "__interrupt__":
+                            _record_pipeline("run", started)
                             # Mark post as in_review so the editor unlocks
-                            if post:
-                                post.status = PostStatus.IN_REVIEW
-                                await db.commit()
+                            post.status = PostStatus.IN_REVIEW
+                            await db.commit()
 
+                            # Convert image_url from disk path to HTTP URL
                             interrupt_value = node_output[0].value if node_output else {}
                             if isinstance(interrupt_value, dict):
                                 if interrupt_value.get("image_url"):
@@ -346,25 +249,13 @@ async def resume_agent(
 
                             # Handle image generation completion
                             if node_name == "generate_image" and node_output.get("image_url"):
-                                disk_path = node_output["image_url"]
-                                http_url = _disk_path_to_url(disk_path)
-                                event_data["image_url"] = http_url
-
-                                if post and os.path.exists(disk_path):
-                                    img_asset = MediaAsset(
-                                        post_id=post.id,
-                                        filename=os.path.basename(disk_path),
-                                        file_path=disk_path,
-                                        content_type="image/png",
-                                        file_size=os.path.getsize(disk_path),
-                                        source=MediaSource.GENERATED,
-                                        prompt_used=node_output.get("image_prompt", ""),
-                                    )
-                                    db.add(img_asset)
-                                    await db.commit()
+                                event_data["image_url"] = _disk_path_to_url(
+                                    node_output["image_url"]
+                                )
+                                await record_image_asset(db, post, node_output)
 
                             # Handle optimize node fact-check info
-                            if node_name == "optimize" and post:
+                            if node_name == "optimize":
                                 if node_output.get("fact_check_performed"):
                                     event_data["fact_check_performed"] = True
                                     event_data["claims_checked"] = len(
@@ -377,7 +268,7 @@ async def resume_agent(
                             }
 
                             # Save draft if draft node completed
-                            if post and node_name == "draft" and node_output.get("draft_content"):
+                            if node_name == "draft" and node_output.get("draft_content"):
                                 max_ver = await db.execute(
                                     select(func.coalesce(func.max(Draft.version), 0)).where(
                                         Draft.post_id == post.id
@@ -396,11 +287,7 @@ async def resume_agent(
                                 await db.commit()
 
                             # Save draft for optimize stage
-                            if (
-                                post
-                                and node_name == "optimize"
-                                and node_output.get("optimized_content")
-                            ):
+                            if node_name == "optimize" and node_output.get("optimized_content"):
                                 max_ver = await db.execute(
                                     select(func.coalesce(func.max(Draft.version), 0)).where(
                                         Draft.post_id == post.id
@@ -419,11 +306,7 @@ async def resume_agent(
                                 await db.commit()
 
                             # Save draft for proofread stage
-                            if (
-                                post
-                                and node_name == "proofread"
-                                and node_output.get("proofread_content")
-                            ):
+                            if node_name == "proofread" and node_output.get("proofread_content"):
                                 max_ver = await db.execute(
                                     select(func.coalesce(func.max(Draft.version), 0)).where(
                                         Draft.post_id == post.id
@@ -439,6 +322,200 @@ async def resume_agent(
                                 db.add(draft)
                                 await db.commit()
 
+            # Hand over the background image before pausing for review
+            image_ready = await _deliver_pending_image(compiled, config, post)
+            if image_ready:
+                yield {"event": "image_ready", "data": json.dumps(image_ready)}
+
+            # Check final state
+            state = await compiled.aget_state(config)
+            final = state.values
+            if final.get("approval_status") == "approved":
+                post.status = PostStatus.APPROVED
+                post.final_content = final.get("proofread_content", "")
+                post.revision_count = final.get("revision_count", 0)
+                await db.commit()
+                yield {
+                    "event": "complete",
+                    "data": json.dumps({"status": "approved", "post_id": str(post.id)}),
+                }
+            else:
+                yield {
+                    "event": "paused",
+                    "data": json.dumps({"status": "awaiting_approval"}),
+                }
+
+        except Exception as e:
+            logger.error(f"Agent stream error: {e}", exc_info=True)
+            yield {"event": "error", "data": json.dumps({"error": str(e)})}
+
+    return EventSourceResponse(run_cancellable(thread_id, event_generator()))
+
+
+@router.post("/resume/{thread_id}")
+async def resume_agent(
+    thread_id: str, request: AgentResumeRequest, db: AsyncSession = Depends(get_db)
+):
+    try:
+        checkpointer = await get_checkpointer()
+        graph = build_graph()
+        compiled = graph.compile(checkpointer=checkpointer)
+        config = {"configurable": {"thread_id": thread_id}}
+
+        # Set status back to drafting while the pipeline runs
+        result = await db.execute(select(Post).where(Post.thread_id == thread_id))
+        resume_post = result.scalar_one_or_none()
+        if resume_post:
+            resume_post.status = PostStatus.DRAFTING
+            await db.commit()
+
+        # Resume with user's decision
+        command = Command(
+            resume={
+                "status": request.status,
+                "feedback": request.feedback or "",
+                "regenerate_image": request.regenerate_image,
+            }
+        )
+
+        async def event_generator():
+            started = time.monotonic()
+            try:
+                result = await db.execute(select(Post).where(Post.thread_id == thread_id))
+                post = result.scalar_one_or_none()
+
+                # An approval needs the image in the final state; a revision only takes it
+                # if it's already done, since the redraft may change the concept anyway
+                if post:
+                    image_ready = await _deliver_pending_image(
+                        compiled,
+                        config,
+                        post,
+                        timeout=DELIVERY_TIMEOUT if request.status == "approved" else 0,
+                    )
+                    if image_ready:
+                        yield {"event": "image_ready", "data": json.dumps(image_ready)}
+
+                async with thread_lock(thread_id):
+                    async for event in compiled.astream(command, config, stream_mode="updates"):
+                        for node_name, node_output in event.items():
+                            if node_name == "__interrupt__":
+                                _record_pipeline("revision", started)
+                                # Mark post as in_review so the editor unlocks
+                                if post:
+                                    post.status = PostStatus.IN_REVIEW
+                                    await db.commit()
+
+                                interrupt_value = node_output[0].value if node_output else {}
+                                if isinstance(interrupt_value, dict):
+                                    if interrupt_value.get("image_url"):
+                                        interrupt_value["image_url"] = _disk_path_to_url(
+                                            interrupt_value["image_url"]
+                                        )
+                                    if interrupt_value.get("original_image_url"):
+                                        interrupt_value["original_image_url"] = _disk_path_to_url(
+                                            interrupt_value["original_image_url"]
+                                        )
+                                yield {
+                                    "event": "interrupt",
+                                    "data": json.dumps(interrupt_value),
+                                }
+                            else:
+                                event_data = _build_event_data(node_name, node_output)
+
+                                # Handle image generation completion
+                                if node_name == "generate_image" and node_output.get("image_url"):
+                                    event_data["image_url"] = _disk_path_to_url(
+                                        node_output["image_url"]
+                                    )
+                                    if post:
+                                        await record_image_asset(db, post, node_output)
+
+                                # Handle optimize node fact-check info
+                                if node_name == "optimize" and post:
+                                    if node_output.get("fact_check_performed"):
+                                        event_data["fact_check_performed"] = True
+                                        event_data["claims_checked"] = len(
+                                            node_output.get("fact_check_results", [])
+                                        )
+
+                                yield {
+                                    "event": "node_complete",
+                                    "data": json.dumps(event_data),
+                                }
+
+                                # Save draft if draft node completed
+                                if (
+                                    post
+                                    and node_name == "draft"
+                                    and node_output.get("draft_content")
+                                ):
+                                    max_ver = await db.execute(
+                                        select(func.coalesce(func.max(Draft.version), 0)).where(
+                                            Draft.post_id == post.id
+                                        )
+                                    )
+                                    next_version = max_ver.scalar() + 1
+                                    draft = Draft(
+                                        post_id=post.id,
+                                        version=next_version,
+                                        content=node_output["draft_content"],
+                                        hook=node_output.get("draft_hook"),
+                                        cta=node_output.get("draft_cta"),
+                                        stage="draft",
+                                    )
+                                    db.add(draft)
+                                    await db.commit()
+
+                                # Save draft for optimize stage
+                                if (
+                                    post
+                                    and node_name == "optimize"
+                                    and node_output.get("optimized_content")
+                                ):
+                                    max_ver = await db.execute(
+                                        select(func.coalesce(func.max(Draft.version), 0)).where(
+                                            Draft.post_id == post.id
+                                        )
+                                    )
+                                    next_version = max_ver.scalar() + 1
+                                    hashtags = node_output.get("suggested_hashtags", [])
+                                    draft = Draft(
+                                        post_id=post.id,
+                                        version=next_version,
+                                        content=node_output["optimized_content"],
+                                        hashtags=", ".join(hashtags) if hashtags else None,
+                                        stage="optimize",
+                                    )
+                                    db.add(draft)
+                                    await db.commit()
+
+                                # Save draft for proofread stage
+                                if (
+                                    post
+                                    and node_name == "proofread"
+                                    and node_output.get("proofread_content")
+                                ):
+                                    max_ver = await db.execute(
+                                        select(func.coalesce(func.max(Draft.version), 0)).where(
+                                            Draft.post_id == post.id
+                                        )
+                                    )
+                                    next_version = max_ver.scalar() + 1
+                                    draft = Draft(
+                                        post_id=post.id,
+                                        version=next_version,
+                                        content=node_output["proofread_content"],
+                                        stage="proofread",
+                                    )
+                                    db.add(draft)
+                                    await db.commit()
+
+                if post:
+                    image_ready = await _deliver_pending_image(compiled, config, post)
+                    if image_ready:
+                        yield {"event": "image_ready", "data": json.dumps(image_ready)}
+
                 # Check final state
                 state = await compiled.aget_state(config)
                 final = state.values
@@ -467,12 +544,28 @@ async def resume_agent(
                 logger.error(f"Agent resume error: {e}", exc_info=True)
                 yield {"event": "error", "data": json.dumps({"error": str(e)})}
 
-        return EventSourceResponse(event_generator())
+        return EventSourceResponse(run_cancellable(thread_id, event_generator()))
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/cancel/{thread_id}")
+async def cancel_agent(thread_id: str, db: AsyncSession = Depends(get_db)):
+    """Stop a thread's running pipeline, including its background image job.
+
+    The post stays in drafting, so the run can be resumed or restarted later.
+    """
+    cancelled = cancel_run(thread_id)
+    result = await db.execute(select(Post.id).where(Post.thread_id == thread_id))
+    post_id = result.scalar_one_or_none()
+    if post_id is not None and cancel_image_job(str(post_id)):
+        cancelled = True
+    if not cancelled:
+        raise HTTPException(status_code=404, detail="No active run for this thread")
+    return {"thread_id": thread_id, "status": "cancelled"}
+
+
 @router.get("/status/{thread_id}", response_model=AgentStatusResponse)
 async def agent_status(thread_id: str):
     try:
@@ -3,6 +3,9 @@ from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.dependencies import get_db
+from app.services.http_clients import connection_stats
+from app.services.llm import provider_health
+from app.utils import metrics
 
 router = APIRouter()
 
@@ -16,3 +19,31 @@ async def health_check(db: AsyncSession = Depends(get_db)):
         db_status = "disconnected"
 
     return {"status": "ok", "database": db_status}
+
+
+def _pipeline_latency(counters: dict[str, float]) -> dict[str, dict]:
+    """Mean seconds to reach review, by routing profile and run kind."""
+    latency: dict[str, dict] = {}
+    for name, runs in counters.items():
+        parts = name.split(".")
+        if len(parts) != 4 or parts[0] != "pipeline" or parts[3] != "runs" or not runs:
+            continue
+        _, profile, kind, _ = parts
+        seconds = counters.get(f"pipeline.{profile}.{kind}.seconds", 0.0)
+        latency.setdefault(profile, {})[kind] = {
+            "runs": int(runs),
+            "mean_seconds": round(seconds / runs, 2),
+        }
+    return latency
+
+
+@router.get("/metrics")
+async def get_metrics():
+    """Process-local counters for this worker."""
+    counters = metrics.snapshot()
+    return {
+        "counters": counters,
+        "pipeline_latency": _pipeline_latency(counters),
+        "llm_providers": provider_health(),
+        "http_connections": connection_stats(),
+    }
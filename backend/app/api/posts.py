@@ -6,12 +6,14 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.config import settings
 from app.dependencies import get_db
 from app.models.post import Post, Draft
 from app.models.media_asset import MediaAsset, MediaSource
 from app.schemas.post import PostCreate, PostUpdate, PostResponse, PostWithDrafts, DraftResponse
 from app.schemas.media import MediaAssetResponse
+from app.services.media_variants import delete_variants, schedule_variants
+from app.services.source_index import build_source_index
+from app.services.storage import get_storage
 
 router = APIRouter(prefix="/posts", tags=["posts"])
 
@@ -43,6 +45,8 @@ async def list_posts(
 @router.post("", response_model=PostResponse, status_code=201)
 async def create_post(data: PostCreate, db: AsyncSession = Depends(get_db)):
     post = Post(**data.model_dump())
+    if post.uploaded_file_text:
+        post.uploaded_file_index = build_source_index(post.uploaded_file_text)
     db.add(post)
     await db.commit()
     await db.refresh(post)
@@ -118,12 +122,8 @@ async def upload_post_media(
     file_id = str(uuid_mod.uuid4())
     ext = os.path.splitext(file.filename or "file")[1]
     filename = f"{file_id}{ext}"
-    file_path = os.path.join(settings.upload_dir, filename)
-
-    os.makedirs(settings.upload_dir, exist_ok=True)
     content = await file.read()
-    with open(file_path, "wb") as f:
-        f.write(content)
+    file_path = await get_storage().save(filename, content, file.content_type)
 
     asset = MediaAsset(
         post_id=post_id,
@@ -136,6 +136,7 @@ async def upload_post_media(
     db.add(asset)
     await db.commit()
     await db.refresh(asset)
+    schedule_variants(asset.file_path, asset.content_type)
     return asset
 
 
@@ -155,9 +156,9 @@ async def delete_post_media(
     if not asset:
         raise HTTPException(status_code=404, detail="Media asset not found")
 
-    # Delete file from disk
-    if os.path.exists(asset.file_path):
-        os.remove(asset.file_path)
+    # Delete file and its variants from storage
+    await get_storage().delete(asset.file_path)
+    await delete_variants(asset.file_path)
 
     await db.delete(asset)
     await db.commit()
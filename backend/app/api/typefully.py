@@ -1,23 +1,39 @@
+import asyncio
+import hashlib
+import hmac
+import json
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, HTTPException, Request, WebSocket, WebSocketDisconnect
+from pydantic import BaseModel, Field
 from sqlalchemy import select
+from sqlalchemy.orm import selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.dependencies import get_db
+from app.models.media_asset import MediaAsset
 from app.models.post import Post
 from app.services import typefully as typefully_service
-from app.utils.linkedin import validate_linkedin_post
+from app.services import typefully_sync
+from app.utils.linkedin import LinkedInDocument, validate_linkedin_post, validate_linkedin_posts
 from app.config import settings
 
 router = APIRouter(prefix="/typefully", tags=["typefully"])
 
+MAX_VALIDATE_BATCH = 200
+# Far above LinkedIn's limit; just bounds what one live session can hold
+MAX_LIVE_DOCUMENT = 50_000
+
 
 class ValidateRequest(BaseModel):
     content: str
 
 
+class BatchValidateRequest(BaseModel):
+    contents: list[str] = Field(default_factory=list, max_length=MAX_VALIDATE_BATCH)
+    post_ids: list[UUID] = Field(default_factory=list, max_length=MAX_VALIDATE_BATCH)
+
+
 class DraftRequest(BaseModel):
     post_id: UUID
 
@@ -27,6 +43,19 @@ class ScheduleRequest(BaseModel):
     publish_at: str
 
 
+class BulkScheduleRequest(BaseModel):
+    items: list[ScheduleRequest]
+
+
+def _latest_hashtags(post: Post) -> list[str]:
+    if not post.drafts:
+        return []
+    latest_draft = sorted(post.drafts, key=lambda d: d.version, reverse=True)[0]
+    if not latest_draft.hashtags:
+        return []
+    return [h.strip() for h in latest_draft.hashtags.split(",") if h.strip()]
+
+
 @router.get("/profile")
 async def get_typefully_profile():
     """Get LinkedIn profile info from the connected Typefully social set."""
@@ -35,7 +64,7 @@ async def get_typefully_profile():
     if not settings.typefully_social_set_id:
         raise HTTPException(status_code=400, detail="Typefully social set ID not configured")
     try:
-        return await typefully_service.get_linkedin_profile()
+        return await typefully_sync.get_profile()
     except Exception as e:
         raise HTTPException(status_code=502, detail=f"Failed to fetch profile: {e}")
 
@@ -46,6 +75,84 @@ async def validate_content(body: ValidateRequest):
     return validate_linkedin_post(body.content)
 
 
+@router.post("/validate/batch")
+async def validate_contents(
+    body: BatchValidateRequest,
+    db: AsyncSession = Depends(get_db),
+):
+    """Validate many texts and/or posts' final content in one request.
+
+    `results` follows the order of `contents`; `posts` maps post id to its result and
+    leaves out posts without final content.
+    """
+    rows = []
+    if body.post_ids:
+        result = await db.execute(
+            select(Post.id, Post.final_content).where(
+                Post.id.in_(body.post_ids), Post.final_content.is_not(None)
+            )
+        )
+        rows = result.all()
+
+    # Grapheme counting is pure Python — keep a large batch off the event loop
+    validations = await asyncio.to_thread(
+        validate_linkedin_posts, body.contents + [content for _, content in rows]
+    )
+    split = len(body.contents)
+    return {
+        "results": validations[:split],
+        "posts": {str(post_id): v for (post_id, _), v in zip(rows, validations[split:])},
+    }
+
+
+@router.websocket("/validate/live")
+async def validate_live(websocket: WebSocket):
+    """Validate a post as it is edited, one small delta at a time.
+
+    Client messages: `{"type": "reset", "text"}` loads the whole text, and
+    `{"type": "edit", "offset", "delete", "insert"}` replaces `delete` code points at
+    `offset`. Each is answered with the validation of the resulting text, echoing any
+    `version` sent. A rejected edit is answered with `{"type": "error"}` and the client
+    should reset.
+    """
+    await websocket.accept()
+    document = LinkedInDocument()
+    try:
+        while True:
+            try:
+                message = await websocket.receive_json()
+            except (KeyError, ValueError):
+                # Not JSON, or a binary frame — the connection itself is still fine
+                await websocket.send_json(
+                    {"type": "error", "version": None, "detail": "Malformed message"}
+                )
+                continue
+            if not isinstance(message, dict):
+                message = {}
+            try:
+                if message.get("type") == "reset":
+                    text = str(message.get("text", ""))
+                    if len(text) > MAX_LIVE_DOCUMENT:
+                        raise ValueError("Document too large")
+                    document.reset(text)
+                else:
+                    offset, delete = int(message["offset"]), int(message.get("delete", 0))
+                    insert = str(message.get("insert", ""))
+                    if len(document) - delete + len(insert) > MAX_LIVE_DOCUMENT:
+                        raise ValueError("Document too large")
+                    document.apply_edit(offset, delete, insert)
+            except (KeyError, TypeError, ValueError) as e:
+                await websocket.send_json(
+                    {"type": "error", "version": message.get("version"), "detail": str(e)}
+                )
+                continue
+            await websocket.send_json(
+                {"type": "validation", "version": message.get("version"), **document.validate()}
+            )
+    except WebSocketDisconnect:
+        pass
+
+
 @router.post("/draft")
 async def create_typefully_draft(
     body: DraftRequest,
@@ -62,20 +169,14 @@ async def create_typefully_draft(
     if not post.final_content:
         raise HTTPException(status_code=400, detail="Post has no final content")
 
-    # Get hashtags from the latest draft
-    hashtags: list[str] = []
-    if post.drafts:
-        latest_draft = sorted(post.drafts, key=lambda d: d.version, reverse=True)[0]
-        if latest_draft.hashtags:
-            hashtags = [h.strip() for h in latest_draft.hashtags.split(",") if h.strip()]
-
     draft = await typefully_service.create_draft(
         text=post.final_content,
-        hashtags=hashtags or None,
+        hashtags=_latest_hashtags(post) or None,
     )
 
     draft_id = draft.get("id", "")
     post.typefully_draft_id = str(draft_id)
+    await typefully_sync.apply_draft_status(db, post, draft)
     await db.commit()
 
     return {"draft_id": draft_id}
@@ -105,30 +206,98 @@ async def schedule_typefully_draft(
         )
     else:
         # Create new draft with schedule
-        hashtags: list[str] = []
-        if post.drafts:
-            latest_draft = sorted(post.drafts, key=lambda d: d.version, reverse=True)[0]
-            if latest_draft.hashtags:
-                hashtags = [h.strip() for h in latest_draft.hashtags.split(",") if h.strip()]
-
         draft = await typefully_service.create_draft(
             text=post.final_content,
-            hashtags=hashtags or None,
+            hashtags=_latest_hashtags(post) or None,
             publish_at=body.publish_at,
         )
         draft_id = draft.get("id", "")
         post.typefully_draft_id = str(draft_id)
-        await db.commit()
+
+    await typefully_sync.apply_draft_status(db, post, draft)
+    await db.commit()
 
     return {"draft_id": post.typefully_draft_id}
 
 
+@router.post("/schedule/bulk")
+async def schedule_typefully_drafts(
+    body: BulkScheduleRequest,
+    db: AsyncSession = Depends(get_db),
+):
+    """Schedule many posts at once, each with its current image attached.
+
+    Posts are pushed concurrently under the Typefully rate limit; one failure doesn't
+    stop the rest. Returns a result per requested post.
+    """
+    if not settings.typefully_api_key:
+        raise HTTPException(status_code=400, detail="Typefully API key not configured")
+
+    publish_at = {item.post_id: item.publish_at for item in body.items}
+    result = await db.execute(
+        select(Post).where(Post.id.in_(publish_at.keys())).options(selectinload(Post.drafts))
+    )
+    posts = {post.id: post for post in result.scalars().all()}
+
+    results: dict[UUID, dict] = {}
+    items: list[typefully_service.ScheduleItem] = []
+    for post_id, when in publish_at.items():
+        post = posts.get(post_id)
+        if not post or not post.final_content:
+            error = "Post not found" if not post else "Post has no final content"
+            results[post_id] = {"success": False, "draft_id": None, "error": error}
+            continue
+
+        media: list[tuple[str, str]] = []
+        if not post.typefully_draft_id:
+            img_result = await db.execute(
+                select(MediaAsset)
+                .where(MediaAsset.post_id == post.id, MediaAsset.content_type.like("image/%"))
+                .order_by(MediaAsset.created_at.desc())
+                .limit(1)
+            )
+            image = img_result.scalar_one_or_none()
+            if image:
+                media.append((image.file_path, image.content_type))
+
+        items.append(
+            typefully_service.ScheduleItem(
+                key=str(post.id),
+                text=post.final_content,
+                publish_at=when,
+                hashtags=_latest_hashtags(post) or None,
+                draft_id=post.typefully_draft_id,
+                media=media,
+            )
+        )
+
+    for outcome in await typefully_service.schedule_many(items):
+        post_id = UUID(outcome.pop("key"))
+        results[post_id] = outcome
+        if outcome["success"]:
+            posts[post_id].typefully_draft_id = outcome["draft_id"]
+            await typefully_sync.apply_draft_status(
+                db, posts[post_id], {"status": "scheduled", "publish_at": publish_at[post_id]}
+            )
+    await db.commit()
+
+    return {
+        "results": [{"post_id": str(post_id), **results[post_id]} for post_id in publish_at],
+        "scheduled": sum(r["success"] for r in results.values()),
+        "failed": sum(not r["success"] for r in results.values()),
+    }
+
+
 @router.get("/draft/{post_id}")
 async def get_typefully_draft_status(
     post_id: UUID,
+    refresh: bool = False,
     db: AsyncSession = Depends(get_db),
 ):
-    """Get the Typefully draft status for a post."""
+    """Get the Typefully draft status for a post.
+
+    Served from the locally synced state; `refresh=true` fetches it live first.
+    """
     if not settings.typefully_api_key:
         raise HTTPException(status_code=400, detail="Typefully API key not configured")
 
@@ -139,5 +308,54 @@ async def get_typefully_draft_status(
     if not post.typefully_draft_id:
         raise HTTPException(status_code=404, detail="No Typefully draft for this post")
 
-    draft = await typefully_service.get_draft(post.typefully_draft_id)
-    return {"status": draft.get("status", "unknown"), "draft": draft}
+    if refresh or post.typefully_synced_at is None:
+        draft = await typefully_service.get_draft(post.typefully_draft_id)
+        await typefully_sync.apply_draft_status(db, post, draft)
+        await db.commit()
+
+    return {
+        "status": post.typefully_status or "unknown",
+        "publish_at": post.typefully_publish_at,
+        "synced_at": post.typefully_synced_at,
+        "post_status": post.status,
+    }
+
+
+@router.post("/webhook")
+async def typefully_webhook(request: Request, db: AsyncSession = Depends(get_db)):
+    """Receive draft status changes pushed by Typefully, ahead of the next poll.
+
+    The body must be signed with TYPEFULLY_WEBHOOK_SECRET (hex HMAC-SHA256 in
+    X-Typefully-Signature); without a secret configured the endpoint is disabled.
+    """
+    if not settings.typefully_webhook_secret:
+        raise HTTPException(status_code=403, detail="Typefully webhook secret not configured")
+    body = await request.body()
+    signature = request.headers.get("x-typefully-signature", "").removeprefix("sha256=")
+    expected = hmac.new(
+        settings.typefully_webhook_secret.encode(), body, hashlib.sha256
+    ).hexdigest()
+    if not hmac.compare_digest(signature, expected):
+        raise HTTPException(status_code=401, detail="Invalid signature")
+
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid JSON")
+    if not isinstance(payload, dict):
+        raise HTTPException(status_code=400, detail="No draft in payload")
+    draft = payload.get("data") or payload.get("draft") or payload
+    if not isinstance(draft, dict) or not draft.get("id"):
+        raise HTTPException(status_code=400, detail="No draft in payload")
+
+    result = await db.execute(select(Post).where(Post.typefully_draft_id == str(draft["id"])))
+    post = result.scalar_one_or_none()
+    if not post:
+        return {"matched": False}
+
+    if "status" not in draft:
+        # Event without the draft body — fetch the current state
+        draft = await typefully_service.get_draft(post.typefully_draft_id)
+    await typefully_sync.apply_draft_status(db, post, draft)
+    await db.commit()
+    return {"matched": True, "status": post.typefully_status}
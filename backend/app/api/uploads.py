@@ -1,16 +1,16 @@
 import os
 import uuid
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, UploadFile, File
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.config import settings
 from app.dependencies import get_db
 from app.models.media_asset import MediaAsset, MediaSource
 from app.schemas.media import MediaAssetResponse, FileUploadResponse
 from app.services.file_parser import parse_file
+from app.services.media_variants import pick_variant, schedule_variants
+from app.services.storage import get_storage
 
 router = APIRouter(prefix="/uploads", tags=["uploads"])
 
@@ -40,12 +40,8 @@ async def upload_file(
     file_id = str(uuid.uuid4())
     ext = os.path.splitext(file.filename or "file")[1]
     filename = f"{file_id}{ext}"
-    file_path = os.path.join(settings.upload_dir, filename)
-
-    os.makedirs(settings.upload_dir, exist_ok=True)
     content = await file.read()
-    with open(file_path, "wb") as f:
-        f.write(content)
+    file_path = await get_storage().save(filename, content, file.content_type)
 
     asset = MediaAsset(
         filename=file.filename or filename,
@@ -57,6 +53,7 @@ async def upload_file(
     db.add(asset)
     await db.commit()
     await db.refresh(asset)
+    schedule_variants(asset.file_path, asset.content_type)
 
     # Parse document types for text and image extraction
     extracted_text = None
@@ -66,15 +63,16 @@ async def upload_file(
         parse_result = await parse_file(content, file.content_type)
         extracted_text = parse_result.text or None
 
-        # Create MediaAsset records for each extracted image
-        for img_info in parse_result.images:
+        # Create MediaAsset records for each extracted image (already filtered and ranked)
+        for rank, img_info in enumerate(parse_result.images):
             img_asset = MediaAsset(
                 post_id=asset.post_id,
                 filename=img_info["filename"],
                 file_path=img_info["file_path"],
                 content_type=img_info["content_type"],
-                file_size=os.path.getsize(img_info["file_path"]),
+                file_size=img_info["file_size"],
                 source=MediaSource.EXTRACTED,
+                extraction_rank=rank,
             )
             db.add(img_asset)
             extracted_images.append(img_asset)
@@ -83,6 +81,7 @@ async def upload_file(
             await db.commit()
             for img_asset in extracted_images:
                 await db.refresh(img_asset)
+                schedule_variants(img_asset.file_path, img_asset.content_type)
 
     return FileUploadResponse(
         asset=MediaAssetResponse.model_validate(asset),
@@ -92,41 +91,48 @@ async def upload_file(
 
 
 @router.get("/file/{filename}")
-async def serve_file(filename: str):
+async def serve_file(
+    filename: str,
+    request: Request,
+    w: int | None = Query(None, ge=1, description="Serve the nearest precomputed width"),
+):
+    storage = get_storage()
     # Sanitize filename to prevent path traversal
     safe_filename = os.path.basename(filename)
-    file_path = os.path.join(settings.upload_dir, safe_filename)
-
-    # Verify the resolved path is within upload_dir
-    resolved = os.path.realpath(file_path)
-    upload_dir_resolved = os.path.realpath(settings.upload_dir)
-    if not resolved.startswith(upload_dir_resolved):
+    file_path = storage.path_for(safe_filename)
+
+    # Storage verifies the resolved path is within its root
+    try:
+        response = None
+        if w is not None:
+            variant = pick_variant(file_path, w, request.headers.get("accept", ""))
+            if variant:
+                response = await storage.serve(request, variant)
+        fallback = w is not None and response is None
+        if response is None:
+            response = await storage.serve(request, file_path)
+    except PermissionError:
         raise HTTPException(status_code=403, detail="Access denied")
-
-    if not os.path.exists(resolved):
+    if response is None:
         raise HTTPException(status_code=404, detail="File not found")
 
-    # Determine media type from extension
-    ext = os.path.splitext(safe_filename)[1].lower()
-    media_types = {
-        ".png": "image/png",
-        ".jpg": "image/jpeg",
-        ".jpeg": "image/jpeg",
-        ".gif": "image/gif",
-        ".webp": "image/webp",
-        ".pdf": "application/pdf",
-    }
-    media_type = media_types.get(ext, "application/octet-stream")
-
-    return FileResponse(resolved, media_type=media_type)
+    if w is not None:
+        response.headers["Vary"] = "Accept"
+    if fallback:
+        # The variant may not have been generated yet; only a real one is immutable
+        response.headers["Cache-Control"] = "no-cache"
+    return response
 
 
 @router.get("/{asset_id}")
-async def get_upload(asset_id: uuid.UUID, db: AsyncSession = Depends(get_db)):
+async def get_upload(asset_id: uuid.UUID, request: Request, db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(MediaAsset).where(MediaAsset.id == asset_id))
     asset = result.scalar_one_or_none()
     if not asset:
         raise HTTPException(status_code=404, detail="Asset not found")
-    if not os.path.exists(asset.file_path):
+    response = await get_storage().serve(
+        request, asset.file_path, media_type=asset.content_type, filename=asset.filename
+    )
+    if response is None:
         raise HTTPException(status_code=404, detail="File not found on disk")
-    return FileResponse(asset.file_path, media_type=asset.content_type, filename=asset.filename)
+    return response
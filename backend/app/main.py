@@ -6,13 +6,26 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
 from app.api.router import api_router
 from app.agent.checkpointer import init_checkpointer, close_checkpointer
+from app.services.http_clients import close_http_clients, init_http_clients
+from app.services.image_jobs import cancel_image_jobs
+from app.services.media_variants import shutdown_variant_pool
+from app.services.typefully_sync import start_typefully_sync, stop_typefully_sync
+from app.services.web_research import start_trending_refresh, stop_trending_refresh
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await init_checkpointer()
+    init_http_clients()
+    start_trending_refresh()
+    start_typefully_sync()
     yield
+    await stop_typefully_sync()
+    await stop_trending_refresh()
+    await cancel_image_jobs()
     await close_checkpointer()
+    await close_http_clients()
+    shutdown_variant_pool()
 
 
 app = FastAPI(
@@ -2,5 +2,6 @@ from app.models.post import Post, Draft
 from app.models.calendar_entry import CalendarEntry
 from app.models.media_asset import MediaAsset
 from app.models.user_settings import UserSettings
+from app.models.cache_entry import CacheEntry
 
-__all__ = ["Post", "Draft", "CalendarEntry", "MediaAsset", "UserSettings"]
+__all__ = ["Post", "Draft", "CalendarEntry", "MediaAsset", "UserSettings", "CacheEntry"]
@@ -31,4 +31,6 @@ class MediaAsset(Base):
         String(20), default=MediaSource.UPLOADED, nullable=False, server_default="uploaded"
     )
     prompt_used: Mapped[str | None] = mapped_column(String(1000), nullable=True)
+    # Best-first order of images extracted from one document (0 = best candidate)
+    extraction_rank: Mapped[int | None] = mapped_column(Integer, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
@@ -2,7 +2,7 @@ import uuid
 from datetime import datetime
 
 from sqlalchemy import DateTime, Enum, ForeignKey, Integer, String, Text, func
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -55,8 +55,17 @@ class Post(Base):
     thread_id: Mapped[str | None] = mapped_column(String(255), nullable=True)
     user_input: Mapped[str | None] = mapped_column(Text, nullable=True)
     uploaded_file_text: Mapped[str | None] = mapped_column(Text, nullable=True)
+    uploaded_file_index: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
     revision_count: Mapped[int] = mapped_column(Integer, default=0)
     typefully_draft_id: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    # Last known Typefully state of the draft, kept current by the sync engine
+    typefully_status: Mapped[str | None] = mapped_column(String(30), nullable=True)
+    typefully_publish_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    typefully_synced_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
     )
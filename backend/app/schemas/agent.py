@@ -19,6 +19,7 @@ class AgentResumeRequest(BaseModel):
     status: str  # "approved" or "edit_requested"
     feedback: str | None = None
     content_override: str | None = None
+    regenerate_image: bool = False
 
 
 class AgentStatusResponse(BaseModel):
@@ -45,6 +45,8 @@ class PostResponse(BaseModel):
     uploaded_file_text: str | None
     revision_count: int
     typefully_draft_id: str | None = None
+    typefully_status: str | None = None
+    typefully_publish_at: datetime | None = None
     created_at: datetime
     updated_at: datetime
 
@@ -0,0 +1,79 @@
+import asyncio
+import json
+import logging
+import weakref
+from collections.abc import AsyncIterator
+
+from app.utils import metrics
+
+logger = logging.getLogger(__name__)
+
+# thread_id -> tasks driving that thread's open streams (two tabs can stream one thread)
+_runs: dict[str, set[asyncio.Task]] = {}
+# thread_id -> lock serializing writes to that thread's checkpointed state; an entry lives
+# only as long as someone holds or waits on it
+_locks: weakref.WeakValueDictionary[str, asyncio.Lock] = weakref.WeakValueDictionary()
+
+
+def thread_lock(thread_id: str) -> asyncio.Lock:
+    """The lock a stream holds while it advances a thread's graph, and a background job
+    takes to write into the thread's paused state."""
+    lock = _locks.get(thread_id)
+    if lock is None:
+        lock = _locks[thread_id] = asyncio.Lock()
+    return lock
+
+
+def _forget(thread_id: str, task: asyncio.Task) -> None:
+    tasks = _runs.get(thread_id)
+    if tasks is not None:
+        tasks.discard(task)
+        if not tasks:
+            del _runs[thread_id]
+
+
+async def run_cancellable(thread_id: str, events: AsyncIterator[dict]) -> AsyncIterator[dict]:
+    """Drive a run's SSE `events` in a task of its own and relay them.
+
+    The task is what gets cancelled when the client disconnects or cancel_run is called,
+    so cancellation reaches whatever the run is awaiting: Claude CLI subprocesses are
+    killed and HTTP requests aborted instead of running to completion. An explicit cancel
+    ends the stream with a `cancelled` event.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def pump() -> None:
+        try:
+            async for event in events:
+                queue.put_nowait(event)
+        except asyncio.CancelledError:
+            queue.put_nowait({"event": "cancelled", "data": json.dumps({"thread_id": thread_id})})
+            raise
+        finally:
+            queue.put_nowait(None)
+
+    task = asyncio.create_task(pump())
+    _runs.setdefault(thread_id, set()).add(task)
+    task.add_done_callback(lambda _: _forget(thread_id, task))
+    try:
+        while (event := await queue.get()) is not None:
+            yield event
+        await asyncio.wait({task})
+        if not task.cancelled() and task.exception() is not None:
+            raise task.exception()
+    finally:
+        if not task.done():
+            # The client went away mid-run; nothing is waiting on the result any more
+            metrics.incr("agent.runs.abandoned")
+            task.cancel()
+
+
+def cancel_run(thread_id: str) -> bool:
+    """Cancel every open stream of a thread. Returns whether anything was running."""
+    tasks = [task for task in _runs.get(thread_id, ()) if not task.done()]
+    for task in tasks:
+        task.cancel()
+    if tasks:
+        metrics.incr("agent.runs.cancelled")
+        logger.info(f"Cancelled agent run for thread {thread_id}")
+    return bool(tasks)
@@ -0,0 +1,131 @@
+import re
+
+# Local, rule-based alternative to the claim-extraction LLM call in fact_check_search.
+# Sentences are scored on the things fact-checkers look for — figures, dates, money,
+# named organisations, comparisons and attributions — and the best few are returned.
+
+MAX_CLAIMS = 4
+# A sentence needs at least this score to be worth a web search
+MIN_SCORE = 2.0
+MIN_WORDS = 5
+
+_PERCENT_RE = re.compile(r"\d(?:[\d,.]*\d)?\s*(?:%|percent\b|per cent\b|pct\b)", re.IGNORECASE)
+_CURRENCY_RE = re.compile(
+    r"[$€£¥]\s?\d|\b\d[\d,.]*\s?(?:usd|eur|gbp|dollars|euros)\b", re.IGNORECASE
+)
+_MAGNITUDE_RE = re.compile(
+    r"\b\d[\d,.]*\s?(?:x|k|m|bn|b|thousand|million|billion|trillion)\b", re.IGNORECASE
+)
+_YEAR_RE = re.compile(r"\b(?:19|20)\d{2}s?\b")
+_NUMBER_RE = re.compile(r"\b\d[\d,.]*\b")
+_ACRONYM_RE = re.compile(r"\b[A-Z][A-Z0-9&]{1,5}s?\b")
+_ORG_SUFFIX_RE = re.compile(
+    r"\b[A-Z][\w&.-]*\s+(?:Inc|Corp|Corporation|Labs?|Research|Institute|University|"
+    r"Group|Foundation|Capital|Partners)\b"
+)
+_CAPITALIZED_RE = re.compile(r"\b[A-Z][a-z]+(?:[A-Z][a-z]+)*\b|\b[a-z]+[A-Z]\w*\b")
+_COMPARATIVE_RE = re.compile(
+    r"\b(?:more|less|fewer|faster|slower|cheaper|higher|lower|larger|smaller|better|worse|"
+    r"than|most|least|largest|biggest|fastest|first|only|doubled|tripled|halved|"
+    r"outperform\w*|increas\w*|decreas\w*|grew|grow\w*|declin\w*|dropped|rose|fell|"
+    r"surged|cut|reduc\w*)\b",
+    re.IGNORECASE,
+)
+_ATTRIBUTION_RE = re.compile(
+    r"\b(?:according to|study|studies|survey\w*|report\w*|research\w*|found|data|"
+    r"analysis|benchmark\w*|paper|announced|released|launched)\b",
+    re.IGNORECASE,
+)
+_OPINION_RE = re.compile(
+    r"\b(?:i think|i believe|i feel|in my (?:view|opinion|experience)|imo|my take)\b",
+    re.IGNORECASE,
+)
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])[\"')\]]*\s+(?=[\"'(\[]?[A-Z0-9])")
+_BULLET_RE = re.compile(r"^\s*(?:[-*•→✅❌👉]|\d+[.)])\s*")
+_MARKUP_RE = re.compile(r"[*_`#]+")
+
+# Acronyms too generic in this domain to signal a named organisation
+_GENERIC_ACRONYMS = frozenset(
+    "AI ML LLM LLMs API APIs CEO CTO CIO CFO VP ROI KPI KPIs RAG GPU GPUs CPU SaaS B2B "
+    "B2C UX UI PR OK TL DR FAQ TBD IT HR QA".split()
+)
+_KNOWN_ORGS = frozenset(
+    "openai anthropic google deepmind microsoft meta amazon aws apple nvidia ibm oracle "
+    "salesforce gartner mckinsey deloitte accenture forrester idc bcg pwc kpmg mit "
+    "stanford harvard berkeley databricks snowflake mistral cohere huggingface intel "
+    "amd tesla netflix uber linkedin github".split()
+)
+
+
+def split_sentences(text: str) -> list[str]:
+    """Split post text into sentences, treating each line (and bullet) separately."""
+    sentences = []
+    for line in text.splitlines():
+        line = _MARKUP_RE.sub("", _BULLET_RE.sub("", line)).strip()
+        if not line:
+            continue
+        sentences.extend(s.strip() for s in _SENTENCE_END_RE.split(line) if s.strip())
+    return sentences
+
+
+def _org_mentions(sentence: str) -> int:
+    mentions = {m.group(0) for m in _ORG_SUFFIX_RE.finditer(sentence)}
+    mentions |= {
+        m.group(0) for m in _ACRONYM_RE.finditer(sentence)
+        if m.group(0) not in _GENERIC_ACRONYMS
+    }
+    for m in _CAPITALIZED_RE.finditer(sentence):
+        word = m.group(0)
+        # Any capitalised word that doesn't start the sentence is likely a proper noun
+        if word.lower() in _KNOWN_ORGS or (m.start() > 0 and word != "I"):
+            mentions.add(word)
+    return len(mentions)
+
+
+def score_sentence(sentence: str) -> float:
+    """How much a sentence reads like a checkable factual claim (0 = not at all)."""
+    if len(sentence.split()) < MIN_WORDS:
+        return 0.0
+
+    score = 0.0
+    figures = False
+    if _PERCENT_RE.search(sentence):
+        score += 3.0
+        figures = True
+    if _CURRENCY_RE.search(sentence):
+        score += 3.0
+        figures = True
+    if _MAGNITUDE_RE.search(sentence):
+        score += 2.5
+        figures = True
+    if _YEAR_RE.search(sentence):
+        score += 1.5
+    elif not figures and _NUMBER_RE.search(sentence):
+        score += 1.0
+
+    score += 1.5 * min(_org_mentions(sentence), 2)
+    score += 1.0 * min(len(_COMPARATIVE_RE.findall(sentence)), 2)
+    if _ATTRIBUTION_RE.search(sentence):
+        score += 1.0
+
+    if sentence.rstrip().endswith("?"):
+        score *= 0.3
+    if _OPINION_RE.search(sentence):
+        score *= 0.5
+    return score
+
+
+def extract_claims(text: str, limit: int = MAX_CLAIMS) -> list[str]:
+    """Return up to `limit` of the most checkable sentences, strongest first."""
+    scored = []
+    seen = set()
+    for position, sentence in enumerate(split_sentences(text)):
+        key = sentence.lower()
+        if key in seen:
+            continue
+        seen.add(key)
+        score = score_sentence(sentence)
+        if score >= MIN_SCORE:
+            scored.append((-score, position, sentence))
+    scored.sort()
+    return [sentence for _, _, sentence in scored[:limit]]
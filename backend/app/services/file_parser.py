@@ -1,13 +1,22 @@
+import asyncio
 import io
 import os
 import uuid
 import logging
 from dataclasses import dataclass, field
 
-from app.config import settings
+from app.services.storage import get_storage
 
 logger = logging.getLogger(__name__)
 
+# Embedded images smaller than this on either side are spacers, bullets or icons
+MIN_IMAGE_SIDE = 64
+MIN_IMAGE_AREA = 150 * 150
+# Max Hamming distance between 64-bit dHashes for two images to count as the same picture
+DUPLICATE_HASH_DISTANCE = 6
+# Banners and rules — anything more elongated than this is decoration
+MAX_ASPECT_RATIO = 5.0
+
 
 @dataclass
 class ParseResult:
@@ -16,12 +25,15 @@ class ParseResult:
 
 
 async def parse_file(content: bytes, content_type: str) -> ParseResult:
-    """Extract text and images from uploaded files."""
+    """Extract text and images from uploaded files.
+
+    Parsing runs in a worker thread; extracted images are then written to storage.
+    """
     try:
         if content_type == "application/pdf":
-            return _parse_pdf(content)
+            result = await asyncio.to_thread(_parse_pdf, content)
         elif content_type == "application/vnd.openxmlformats-officedocument.presentationml.presentation":
-            return _parse_pptx(content)
+            result = await asyncio.to_thread(_parse_pptx, content)
         elif content_type == "text/plain":
             return ParseResult(text=content.decode("utf-8", errors="replace"))
         else:
@@ -30,6 +42,20 @@ async def parse_file(content: bytes, content_type: str) -> ParseResult:
         logger.error(f"File parsing failed: {e}")
         return ParseResult()
 
+    storage = get_storage()
+    saved = []
+    for img in result.images:
+        data = img.pop("data")
+        try:
+            img["file_path"] = await storage.save(img["filename"], data, img["content_type"])
+        except Exception as e:
+            logger.warning(f"Failed to save extracted image {img['filename']}: {e}")
+            continue
+        img["file_size"] = len(data)
+        saved.append(img)
+    result.images = saved
+    return result
+
 
 def _parse_pdf(content: bytes) -> ParseResult:
     from pypdf import PdfReader
@@ -38,8 +64,6 @@ def _parse_pdf(content: bytes) -> ParseResult:
     texts = []
     images = []
 
-    os.makedirs(settings.upload_dir, exist_ok=True)
-
     for page_num, page in enumerate(reader.pages):
         text = page.extract_text()
         if text:
@@ -49,19 +73,16 @@ def _parse_pdf(content: bytes) -> ParseResult:
         try:
             for image in page.images:
                 img_filename = f"{uuid.uuid4()}{os.path.splitext(image.name)[1] or '.png'}"
-                img_path = os.path.join(settings.upload_dir, img_filename)
-                with open(img_path, "wb") as f:
-                    f.write(image.data)
                 images.append({
                     "filename": img_filename,
-                    "file_path": img_path,
+                    "data": image.data,
                     "content_type": f"image/{os.path.splitext(image.name)[1].lstrip('.') or 'png'}",
                     "source_page": page_num + 1,
                 })
         except Exception as e:
             logger.warning(f"Failed to extract images from PDF page {page_num + 1}: {e}")
 
-    return ParseResult(text="\n\n".join(texts), images=images)
+    return ParseResult(text="\n\n".join(texts), images=_filter_images(images))
 
 
 def _parse_pptx(content: bytes) -> ParseResult:
@@ -71,8 +92,6 @@ def _parse_pptx(content: bytes) -> ParseResult:
     texts = []
     images = []
 
-    os.makedirs(settings.upload_dir, exist_ok=True)
-
     for slide_num, slide in enumerate(prs.slides):
         for shape in slide.shapes:
             if shape.has_text_frame:
@@ -87,16 +106,76 @@ def _parse_pptx(content: bytes) -> ParseResult:
                     if ext == "jpeg":
                         ext = "jpg"
                     img_filename = f"{uuid.uuid4()}.{ext}"
-                    img_path = os.path.join(settings.upload_dir, img_filename)
-                    with open(img_path, "wb") as f:
-                        f.write(img_blob)
                     images.append({
                         "filename": img_filename,
-                        "file_path": img_path,
+                        "data": img_blob,
                         "content_type": img_ct,
                         "source_page": slide_num + 1,
                     })
                 except Exception as e:
                     logger.warning(f"Failed to extract image from slide {slide_num + 1}: {e}")
 
-    return ParseResult(text="\n\n".join(texts), images=images)
+    return ParseResult(text="\n\n".join(texts), images=_filter_images(images))
+
+
+def _dhash(img) -> int:
+    """64-bit difference hash — robust to rescaling and recompression."""
+    small = img.convert("L").resize((9, 8))
+    pixels = list(small.getdata())
+    bits = 0
+    for row in range(8):
+        for col in range(8):
+            left = pixels[row * 9 + col]
+            right = pixels[row * 9 + col + 1]
+            bits = (bits << 1) | (left > right)
+    return bits
+
+
+def _filter_images(images: list[dict]) -> list[dict]:
+    """Drop trivial images, collapse duplicates and rank the rest best-first.
+
+    Images that repeat across pages (logos, footers, backgrounds) collapse into one entry
+    and are ranked down by how often they repeat. Ranking otherwise favours large
+    images that appear early in the document.
+    """
+    from PIL import Image
+
+    kept: list[dict] = []
+    for img in images:
+        try:
+            with Image.open(io.BytesIO(img["data"])) as pil:
+                width, height = pil.size
+                if min(width, height) < MIN_IMAGE_SIDE or width * height < MIN_IMAGE_AREA:
+                    continue
+                if max(width, height) / min(width, height) > MAX_ASPECT_RATIO:
+                    continue
+                phash = _dhash(pil)
+        except Exception as e:
+            logger.debug(f"Skipping undecodable image {img['filename']}: {e}")
+            continue
+
+        img.update(width=width, height=height)
+        for existing in kept:
+            if bin(existing["_hash"] ^ phash).count("1") <= DUPLICATE_HASH_DISTANCE:
+                existing["_repeats"] += 1
+                # Keep the highest-resolution copy, but remember where it first appeared
+                if width * height > existing["width"] * existing["height"]:
+                    img.update(
+                        _hash=phash,
+                        _repeats=existing["_repeats"],
+                        source_page=min(existing["source_page"], img["source_page"]),
+                    )
+                    kept[kept.index(existing)] = img
+                break
+        else:
+            img.update(_hash=phash, _repeats=1)
+            kept.append(img)
+
+    def score(img: dict) -> float:
+        page_weight = 1.0 / (1 + 0.1 * (img["source_page"] - 1))
+        return img["width"] * img["height"] * page_weight / img["_repeats"]
+
+    kept.sort(key=score, reverse=True)
+    for img in kept:
+        del img["_hash"], img["_repeats"]
+    return kept
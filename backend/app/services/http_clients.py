@@ -0,0 +1,128 @@
+import logging
+
+import httpx
+from openai import AsyncOpenAI
+from tavily import AsyncTavilyClient
+
+from app.config import settings
+from app.utils import metrics
+
+logger = logging.getLogger(__name__)
+
+# Read timeout (seconds) per outbound service; connect timeout comes from settings
+CLIENT_TIMEOUTS: dict[str, float] = {
+    "typefully": 30.0,
+    "openrouter": 90.0,
+    "images": 15.0,
+    "hackernews": 10.0,
+    "openai": 120.0,
+}
+
+_clients: dict[str, httpx.AsyncClient] = {}
+_openai: AsyncOpenAI | None = None
+_tavily: AsyncTavilyClient | None = None
+_gemini = None
+
+
+def _tracer(name: str):
+    """httpcore trace hook: a new TCP connect means the pool had nothing to reuse."""
+
+    async def trace(event: str, info: dict) -> None:
+        if event == "connection.connect_tcp.complete":
+            metrics.incr(f"http.{name}.connections_opened")
+
+    return trace
+
+
+def _make_client(name: str) -> httpx.AsyncClient:
+    trace = _tracer(name)
+
+    async def on_request(request: httpx.Request) -> None:
+        metrics.incr(f"http.{name}.requests")
+        request.extensions["trace"] = trace
+
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(
+            CLIENT_TIMEOUTS.get(name, 30.0), connect=settings.http_connect_timeout
+        ),
+        limits=httpx.Limits(
+            max_connections=settings.http_max_connections_per_host,
+            max_keepalive_connections=settings.http_max_connections_per_host,
+            keepalive_expiry=settings.http_keepalive_expiry,
+        ),
+        http2=settings.http2_enabled,
+        event_hooks={"request": [on_request]},
+    )
+
+
+def get_http_client(name: str) -> httpx.AsyncClient:
+    """Long-lived, keep-alive client for one outbound service.
+
+    Clients are created in the app lifespan; anything running outside it (scripts)
+    gets one lazily.
+    """
+    client = _clients.get(name)
+    if client is None or client.is_closed:
+        client = _clients[name] = _make_client(name)
+    return client
+
+
+def get_openai_client() -> AsyncOpenAI:
+    global _openai
+    if _openai is None:
+        _openai = AsyncOpenAI(
+            api_key=settings.openai_api_key, http_client=get_http_client("openai")
+        )
+    return _openai
+
+
+def get_tavily_client() -> AsyncTavilyClient:
+    global _tavily
+    if _tavily is None:
+        _tavily = AsyncTavilyClient(api_key=settings.tavily_api_key)
+    return _tavily
+
+
+def get_gemini_client():
+    """Shared google-genai client. Callers use its `.aio` surface so requests never block
+    the event loop."""
+    global _gemini
+    if _gemini is None:
+        from google import genai
+
+        _gemini = genai.Client(api_key=settings.gemini_api_key)
+    return _gemini
+
+
+def init_http_clients() -> None:
+    for name in CLIENT_TIMEOUTS:
+        get_http_client(name)
+
+
+async def close_http_clients() -> None:
+    global _openai, _tavily, _gemini
+    for client in _clients.values():
+        await client.aclose()
+    _clients.clear()
+    if _tavily is not None and hasattr(_tavily, "close"):
+        await _tavily.close()
+    if _gemini is not None and hasattr(_gemini.aio, "aclose"):
+        await _gemini.aio.aclose()
+    _openai = None
+    _tavily = None
+    _gemini = None
+
+
+def connection_stats() -> dict[str, dict]:
+    """Requests vs. new connections per client; reuse_ratio is the share served warm."""
+    counters = metrics.snapshot()
+    stats = {}
+    for name in sorted(set(CLIENT_TIMEOUTS) | set(_clients)):
+        requests = counters.get(f"http.{name}.requests", 0)
+        opened = counters.get(f"http.{name}.connections_opened", 0)
+        stats[name] = {
+            "requests": int(requests),
+            "connections_opened": int(opened),
+            "reuse_ratio": round(1 - opened / requests, 3) if requests else None,
+        }
+    return stats
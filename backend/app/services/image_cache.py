@@ -0,0 +1,101 @@
+import logging
+import re
+import uuid
+from collections import OrderedDict
+
+from sqlalchemy import select
+
+from app.db.session import async_session
+from app.models.media_asset import MediaAsset, MediaSource
+from app.services.storage import get_storage
+
+logger = logging.getLogger(__name__)
+
+# Token-set Jaccard similarity above which two prompts describe the same visual concept
+SIMILARITY_THRESHOLD = 0.6
+# How many of a post's previous generated images are compared against
+RECENT_PER_POST = 10
+_MAX_ENTRIES = 512
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and as at be by for from in into is it of on or that the this to with "
+    "image visual showing shows depicting".split()
+)
+
+# (post_id, normalized prompt) -> file_path. Per post, since a reused file is reported
+# as "cached" and gets no MediaAsset of its own
+_by_prompt: OrderedDict[tuple[str | None, str], str] = OrderedDict()
+
+
+def normalize_prompt(prompt: str) -> str:
+    return " ".join(_WORD_RE.findall(prompt.lower()))
+
+
+def _token_set(prompt: str) -> set[str]:
+    return {t for t in _WORD_RE.findall(prompt.lower()) if t not in _STOPWORDS}
+
+
+def prompt_similarity(a: str, b: str) -> float:
+    ta, tb = _token_set(a), _token_set(b)
+    if not ta or not tb:
+        return 0.0
+    return len(ta & tb) / len(ta | tb)
+
+
+async def _still_stored(file_path: str) -> bool:
+    try:
+        return await get_storage().size(file_path) is not None
+    except Exception:
+        return False
+
+
+async def find_cached_image(prompt: str, post_id: str | None = None) -> str | None:
+    """Return the file_path of an existing image of this post for this prompt, if any.
+
+    Checks an exact match on the normalized prompt first, then the post's recent
+    generated images for a near-duplicate prompt.
+    """
+    key = (post_id, normalize_prompt(prompt))
+    cached = _by_prompt.get(key)
+    if cached and await _still_stored(cached):
+        _by_prompt.move_to_end(key)
+        return cached
+
+    if not post_id:
+        return None
+
+    try:
+        async with async_session() as db:
+            result = await db.execute(
+                select(MediaAsset.file_path, MediaAsset.prompt_used)
+                .where(
+                    MediaAsset.post_id == uuid.UUID(post_id),
+                    MediaAsset.source == MediaSource.GENERATED,
+                    MediaAsset.prompt_used.is_not(None),
+                )
+                .order_by(MediaAsset.created_at.desc())
+                .limit(RECENT_PER_POST)
+            )
+            candidates = result.all()
+    except Exception as e:
+        logger.warning(f"Image cache lookup failed: {e}")
+        return None
+
+    best_path, best_score = None, 0.0
+    for file_path, prompt_used in candidates:
+        score = prompt_similarity(prompt, prompt_used)
+        if score > best_score:
+            best_path, best_score = file_path, score
+
+    if best_path and best_score >= SIMILARITY_THRESHOLD and await _still_stored(best_path):
+        return best_path
+    return None
+
+
+def remember_image(prompt: str, file_path: str, post_id: str | None = None) -> None:
+    key = (post_id, normalize_prompt(prompt))
+    _by_prompt[key] = file_path
+    _by_prompt.move_to_end(key)
+    if len(_by_prompt) > _MAX_ENTRIES:
+        _by_prompt.popitem(last=False)
@@ -1,32 +1,54 @@
+import asyncio
 import base64
-import os
 import uuid
 import logging
-
-import httpx
+from functools import partial
 
 from app.config import settings
+from app.services.http_clients import get_gemini_client, get_http_client
+from app.services.storage import get_storage
+from app.utils.hedge import LatencyTracker, hedged_first, timed
 
 logger = logging.getLogger(__name__)
 
 OPENROUTER_MODEL = "google/gemini-2.5-flash-image"
+GEMINI_MODEL = "gemini-2.5-flash-image"
+GEMINI_TIMEOUT = 90.0
+
+
+# Hedge delay bounds (seconds) around the primary provider's observed p50
+HEDGE_DELAY_DEFAULT = 20.0
+HEDGE_DELAY_MIN = 5.0
+HEDGE_DELAY_MAX = 60.0
+
+_latency = {"openrouter": LatencyTracker(), "gemini": LatencyTracker()}
+
+
+def _hedge_delay(provider: str) -> float:
+    p50 = _latency[provider].percentile(50, default=HEDGE_DELAY_DEFAULT)
+    return min(max(p50, HEDGE_DELAY_MIN), HEDGE_DELAY_MAX)
 
 
-async def generate_image(prompt: str, save_dir: str | None = None) -> dict:
-    """Generate an image using Gemini via OpenRouter and save to disk.
+def _succeeded(result: dict) -> bool:
+    return result["success"]
 
-    Falls back to the direct Gemini API if no OpenRouter key is configured.
+
+async def generate_image(prompt: str) -> dict:
+    """Generate an image using Gemini via OpenRouter and save it to storage.
+
+    Falls back to the direct Gemini API if no OpenRouter key is configured. With both
+    keys, the request is hedged: if OpenRouter hasn't answered within its recent p50
+    (or fails), Gemini is started too and whichever succeeds first wins.
 
     Returns dict with keys: file_path, filename, success, error
     """
-    save_dir = save_dir or settings.upload_dir
-    os.makedirs(save_dir, exist_ok=True)
-
+    providers = []
     if settings.openrouter_api_key:
-        return await _generate_via_openrouter(prompt, save_dir)
-    elif settings.gemini_api_key:
-        return await _generate_via_gemini(prompt, save_dir)
-    else:
+        providers.append(("openrouter", _generate_via_openrouter))
+    if settings.gemini_api_key:
+        providers.append(("gemini", _generate_via_gemini))
+
+    if not providers:
         return {
             "file_path": None,
             "filename": None,
@@ -34,34 +56,44 @@ async def generate_image(prompt: str, save_dir: str | None = None) -> dict:
             "error": "No image generation API key configured",
         }
 
+    calls = [
+        partial(timed, partial(generate, prompt), _latency[name], _succeeded)
+        for name, generate in providers
+    ]
+    if len(calls) == 1:
+        return await calls[0]()
+
+    primary = providers[0][0]
+    return await hedged_first(calls, delays=[0.0, _hedge_delay(primary)], is_success=_succeeded)
+
 
-async def _generate_via_openrouter(prompt: str, save_dir: str) -> dict:
+async def _generate_via_openrouter(prompt: str) -> dict:
     """Generate image using Gemini model via OpenRouter API.
 
     Uses httpx directly because OpenRouter returns images in a `message.images`
     field that the OpenAI SDK doesn't parse.
     """
     try:
-        async with httpx.AsyncClient(timeout=90.0) as client:
-            resp = await client.post(
-                "https://openrouter.ai/api/v1/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {settings.openrouter_api_key}",
-                    "Content-Type": "application/json",
-                },
-                json={
-                    "model": OPENROUTER_MODEL,
-                    "modalities": ["text", "image"],
-                    "messages": [
-                        {
-                            "role": "user",
-                            "content": [{"type": "text", "text": prompt}],
-                        }
-                    ],
-                },
-            )
-            resp.raise_for_status()
-            data = resp.json()
+        client = get_http_client("openrouter")
+        resp = await client.post(
+            "https://openrouter.ai/api/v1/chat/completions",
+            headers={
+                "Authorization": f"Bearer {settings.openrouter_api_key}",
+                "Content-Type": "application/json",
+            },
+            json={
+                "model": OPENROUTER_MODEL,
+                "modalities": ["text", "image"],
+                "messages": [
+                    {
+                        "role": "user",
+                        "content": [{"type": "text", "text": prompt}],
+                    }
+                ],
+            },
+        )
+        resp.raise_for_status()
+        data = resp.json()
 
         # Images are in message.images (not in content)
         for choice in data.get("choices", []):
@@ -71,7 +103,7 @@ async def _generate_via_openrouter(prompt: str, save_dir: str) -> dict:
                 if img.get("type") == "image_url":
                     data_url = img.get("image_url", {}).get("url", "")
                     if data_url:
-                        return _save_base64_image(data_url, save_dir)
+                        return await _save_base64_image(data_url)
 
         return {
             "file_path": None,
@@ -90,8 +122,8 @@ async def _generate_via_openrouter(prompt: str, save_dir: str) -> dict:
         }
 
 
-def _save_base64_image(data_url: str, save_dir: str) -> dict:
-    """Save a base64-encoded image (data URL or raw base64) to disk."""
+async def _save_base64_image(data_url: str) -> dict:
+    """Save a base64-encoded image (data URL or raw base64) to storage."""
     try:
         if data_url.startswith("data:"):
             header, b64_data = data_url.split(",", 1)
@@ -109,10 +141,7 @@ def _save_base64_image(data_url: str, save_dir: str) -> dict:
 
         image_bytes = base64.b64decode(b64_data)
         filename = f"{uuid.uuid4()}{ext}"
-        file_path = os.path.join(save_dir, filename)
-
-        with open(file_path, "wb") as f:
-            f.write(image_bytes)
+        file_path = await get_storage().save(filename, image_bytes)
 
         return {
             "file_path": file_path,
@@ -130,26 +159,29 @@ def _save_base64_image(data_url: str, save_dir: str) -> dict:
         }
 
 
-async def _generate_via_gemini(prompt: str, save_dir: str) -> dict:
-    """Generate image using the direct Gemini API (legacy fallback)."""
+async def _generate_via_gemini(prompt: str) -> dict:
+    """Generate image using the direct Gemini API (legacy fallback).
+
+    Uses the SDK's async client, so the event loop keeps serving other requests and a
+    cancelled caller aborts the in-flight request.
+    """
     try:
-        from google import genai
-
-        client = genai.Client(api_key=settings.gemini_api_key)
-        response = client.models.generate_content(
-            model="gemini-2.5-flash-image",
-            contents=prompt,
-            config=genai.types.GenerateContentConfig(
-                response_modalities=["IMAGE", "TEXT"],
-            ),
-        )
+        from google.genai import types
+
+        client = get_gemini_client()
+        async with asyncio.timeout(GEMINI_TIMEOUT):
+            response = await client.aio.models.generate_content(
+                model=GEMINI_MODEL,
+                contents=prompt,
+                config=types.GenerateContentConfig(
+                    response_modalities=["IMAGE", "TEXT"],
+                ),
+            )
 
         for part in response.candidates[0].content.parts:
             if part.inline_data is not None:
                 filename = f"{uuid.uuid4()}.png"
-                file_path = os.path.join(save_dir, filename)
-                with open(file_path, "wb") as f:
-                    f.write(part.inline_data.data)
+                file_path = await get_storage().save(filename, part.inline_data.data)
                 return {
                     "file_path": file_path,
                     "filename": filename,
@@ -164,6 +196,14 @@ async def _generate_via_gemini(prompt: str, save_dir: str) -> dict:
             "error": "No image generated in response",
         }
 
+    except TimeoutError:
+        logger.error("Gemini image generation timed out")
+        return {
+            "file_path": None,
+            "filename": None,
+            "success": False,
+            "error": "Gemini image generation timed out",
+        }
     except Exception as e:
         logger.error(f"Gemini image generation failed: {e}")
         return {
@@ -0,0 +1,162 @@
+import asyncio
+import logging
+import os
+import time
+import uuid
+from collections.abc import Coroutine
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import async_session
+from app.models.media_asset import MediaAsset, MediaSource
+from app.models.post import Post
+from app.services.agent_runs import thread_lock
+from app.services.media_variants import schedule_variants
+from app.services.storage import get_storage
+from app.utils.http_cache import media_type_for
+
+logger = logging.getLogger(__name__)
+
+# How long a review stream waits for a background image before pausing without it
+DELIVERY_TIMEOUT = 180.0
+# A finished image waits for its thread to pause for review, checking every
+# ATTACH_POLL seconds for up to ATTACH_WAIT
+ATTACH_POLL = 1.0
+ATTACH_WAIT = 900.0
+
+# post_id -> in-flight image job, whose result is the generate_image state update it
+# attached to the thread (None if it attached nothing)
+_jobs: dict[str, asyncio.Task] = {}
+
+
+def _checkpoint_id(snapshot) -> str | None:
+    return snapshot.config["configurable"].get("checkpoint_id")
+
+
+def _image_asset_source(node_output: dict) -> MediaSource:
+    if node_output.get("image_source_decision") == "retrieved":
+        return MediaSource.WEB_RETRIEVED
+    return MediaSource.GENERATED
+
+
+async def record_image_asset(db: AsyncSession, post: Post, node_output: dict) -> None:
+    """Create the MediaAsset for a new generated image (reused ones already have one)."""
+    disk_path = node_output["image_url"]
+    if node_output.get("image_generation_status") == "cached":
+        return
+    file_size = await get_storage().size(disk_path)
+    if file_size is None:
+        return
+    img_asset = MediaAsset(
+        post_id=post.id,
+        filename=os.path.basename(disk_path),
+        file_path=disk_path,
+        # Generated and retrieved files are named by their actual format
+        content_type=media_type_for(disk_path),
+        file_size=file_size,
+        source=_image_asset_source(node_output),
+        prompt_used=node_output.get("image_prompt", ""),
+    )
+    db.add(img_asset)
+    await db.commit()
+    schedule_variants(disk_path, img_asset.content_type)
+
+
+async def attach_image(thread_id: str, post_id: str, update: dict) -> dict | None:
+    """Write a finished background image into its thread once the thread pauses for review.
+
+    Writes the update into the checkpointed state as if it had been there when proofread
+    finished, so the approval step re-runs with it, and records the post's MediaAsset.
+    Runs as part of the job, so the image is kept even if no stream is around to collect
+    it. The write happens under the thread's lock and only onto the paused checkpoint, so
+    it can't race a resume. Returns the update, or None if the thread didn't pause for
+    review in time or moved on first.
+    """
+    # Imported here: the graph's nodes start these jobs
+    from app.agent.checkpointer import get_checkpointer
+    from app.agent.graph import build_graph
+
+    compiled = build_graph().compile(checkpointer=await get_checkpointer())
+    config = {"configurable": {"thread_id": thread_id}}
+    deadline = time.monotonic() + ATTACH_WAIT
+    # The text stages are usually still running when the image is done
+    while "approve" not in (snapshot := await compiled.aget_state(config)).next:
+        if not snapshot.next or time.monotonic() > deadline:
+            logger.info(f"Thread {thread_id} never paused for review; dropping its image")
+            return None
+        await asyncio.sleep(ATTACH_POLL)
+
+    update = {k: v for k, v in update.items() if k != "current_stage"}
+    async with thread_lock(thread_id):
+        # A resume may have advanced the thread since it paused; writing then would fork
+        # the checkpoint and re-enter approval on a post that has moved on
+        current = await compiled.aget_state(config)
+        if _checkpoint_id(current) != _checkpoint_id(snapshot):
+            logger.info(f"Thread {thread_id} moved on before its image was ready; dropping it")
+            return None
+        await compiled.aupdate_state(config, update, as_node="proofread")
+    if update.get("image_url"):
+        async with async_session() as db:
+            post = await db.get(Post, uuid.UUID(post_id))
+            if post is not None:
+                await record_image_asset(db, post, update)
+    return update
+
+
+def start_image_job(post_id: str, coro: Coroutine) -> None:
+    """Run image work for a post in the background, superseding any earlier job."""
+    previous = _jobs.pop(post_id, None)
+    if previous and not previous.done():
+        previous.cancel()
+    _jobs[post_id] = asyncio.create_task(coro)
+
+
+def has_image_job(post_id: str) -> bool:
+    return post_id in _jobs
+
+
+async def collect_image_job(post_id: str, timeout: float = DELIVERY_TIMEOUT) -> dict | None:
+    """Wait up to `timeout` seconds for a post's image job and take the update it attached.
+
+    Returns None when there is no job, it failed, was superseded or attached nothing, or
+    it is still running at the deadline — in which case it stays registered for the next
+    caller.
+    """
+    task = _jobs.get(post_id)
+    if task is None:
+        return None
+
+    try:
+        update = await asyncio.wait_for(asyncio.shield(task), timeout)
+    except TimeoutError:
+        return None
+    except asyncio.CancelledError:
+        if not task.cancelled():
+            # The caller (e.g. a disconnected SSE client) was cancelled, not the job
+            raise
+        update = None
+    except Exception as e:
+        logger.error(f"Background image job for post {post_id} failed: {e}")
+        update = None
+
+    if _jobs.get(post_id) is task:
+        del _jobs[post_id]
+    return update
+
+
+def cancel_image_job(post_id: str) -> bool:
+    """Cancel a post's in-flight job. Returns whether one was running."""
+    task = _jobs.pop(post_id, None)
+    if task is None or task.done():
+        return False
+    task.cancel()
+    return True
+
+
+async def cancel_image_jobs() -> None:
+    """Cancel every in-flight job; called on shutdown."""
+    tasks = list(_jobs.values())
+    _jobs.clear()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
@@ -1,17 +1,75 @@
 import asyncio
+import hashlib
+import json
 import logging
 import os
-import subprocess
-
-from openai import AsyncOpenAI
+import signal
+import time
+from functools import partial
 
 from app.config import settings
+from app.services.http_clients import get_openai_client
+from app.services.model_routing import (
+    REASONING_TOKEN_ALLOWANCE,
+    claude_model_for,
+    get_route,
+    is_reasoning_model,
+    openai_model_for,
+    routing_profile,
+)
+from app.utils import metrics
+from app.utils.hedge import LatencyTracker, hedged_first, timed
+from app.utils.singleflight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
+# Providers failing at least this share of recent calls are tried last, until they've
+# gone this long without a failure
+UNHEALTHY_ERROR_RATE = 0.5
+UNHEALTHY_COOLDOWN = 300.0
+# Assumed p50 for a provider with too few samples
+DEFAULT_P50 = 30.0
+# Hedge delay bounds (seconds) around the first provider's observed p95
+HEDGE_DELAY_DEFAULT = 60.0
+HEDGE_DELAY_MIN = 15.0
+HEDGE_DELAY_MAX = 110.0
+# Claude CLI limits (seconds): overall timeout, and how long it gets to exit on SIGTERM
+# before it's sent SIGKILL
+CLI_TIMEOUT = 120.0
+CLI_KILL_GRACE = 5.0
+
+_latency = {"claude": LatencyTracker(), "openai": LatencyTracker()}
+# Identical requests in flight at the same time share one completion
+_inflight = SingleFlight("llm")
 
-def _call_claude(prompt: str, system: str = "", model: str = "") -> str:
-    """Call the Claude CLI subprocess. Requires `claude` to be installed and authenticated."""
+
+def _signal_group(proc: asyncio.subprocess.Process, sig: int) -> None:
+    try:
+        os.killpg(proc.pid, sig)
+    except ProcessLookupError:
+        pass
+
+
+async def _stop_process(proc: asyncio.subprocess.Process) -> None:
+    """SIGTERM the CLI's process group, then SIGKILL it if the CLI is still running after
+    CLI_KILL_GRACE. The whole group, so nothing it spawned keeps running (or holds the
+    output pipes open)."""
+    if proc.returncode is not None:
+        return
+    _signal_group(proc, signal.SIGTERM)
+    try:
+        await asyncio.wait_for(proc.wait(), CLI_KILL_GRACE)
+    except TimeoutError:
+        _signal_group(proc, signal.SIGKILL)
+        metrics.incr("llm.cli.killed")
+        await proc.wait()
+
+
+async def _call_claude(prompt: str, system: str = "", model: str = "", max_tokens: int = 0) -> str:
+    """Call the Claude CLI subprocess. Requires `claude` to be installed and authenticated.
+
+    The process is stopped if the call times out or the awaiting task is cancelled.
+    """
     model = model or settings.claude_model
     cmd = ["claude", "-p", "--model", model, "--no-session-persistence"]
     if system:
@@ -19,31 +77,57 @@ def _call_claude(prompt: str, system: str = "", model: str = "") -> str:
 
     # Strip CLAUDECODE env var so the CLI doesn't think it's nested
     env = {k: v for k, v in os.environ.items() if k != "CLAUDECODE"}
+    if max_tokens:
+        # The CLI has no flag for the output budget, only this variable
+        env["CLAUDE_CODE_MAX_OUTPUT_TOKENS"] = str(max_tokens)
 
-    result = subprocess.run(
-        cmd, input=prompt, capture_output=True, text=True, timeout=120, env=env
+    proc = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        env=env,
+        start_new_session=True,
     )
-    if result.returncode != 0:
-        raise RuntimeError(f"Claude CLI error: {result.stderr.strip()}")
-    return result.stdout.strip()
+    try:
+        stdout, stderr = await asyncio.wait_for(proc.communicate(prompt.encode()), CLI_TIMEOUT)
+    except BaseException:
+        # Shielded so a second cancellation can't leave the process running
+        await asyncio.shield(_stop_process(proc))
+        raise
+    if proc.returncode != 0:
+        raise RuntimeError(f"Claude CLI error: {stderr.decode().strip()}")
+    return stdout.decode().strip()
 
 
-async def llm_completion(
+def _record(task: str | None, start: float) -> None:
+    name = task or "other"
+    metrics.incr(f"llm.{name}.calls")
+    metrics.incr(f"llm.{name}.seconds", time.monotonic() - start)
+
+
+async def claude_completion(
     prompt: str,
     system: str | None = None,
     model: str | None = None,
-    max_tokens: int = 2000,
-    temperature: float = 0.7,
+    max_tokens: int | None = None,
+    temperature: float | None = None,
+    task: str | None = None,
 ) -> str:
-    """Async wrapper around the Claude CLI. Runs the subprocess in a thread pool."""
+    """Async wrapper around the Claude CLI subprocess.
+
+    `task` picks the model and output budget from the routing table; explicit arguments
+    override it. The CLI offers no temperature control, so `temperature` is ignored.
+    """
+    route = get_route(task)
     try:
-        return await asyncio.to_thread(
-            _call_claude,
+        return await _call_claude(
             prompt,
             system or "",
-            model or "",
+            model or claude_model_for(route.tier),
+            max_tokens or route.max_tokens,
         )
-    except subprocess.TimeoutExpired:
+    except TimeoutError:
         logger.error("Claude CLI timed out")
         raise RuntimeError("LLM request timed out")
     except FileNotFoundError:
@@ -56,24 +140,156 @@ async def openai_completion(
     prompt: str,
     system: str | None = None,
     model: str | None = None,
-    max_tokens: int = 2000,
-    temperature: float = 0.7,
+    max_tokens: int | None = None,
+    temperature: float | None = None,
+    task: str | None = None,
 ) -> str:
-    """Call OpenAI via the official SDK."""
+    """Call OpenAI via the official SDK. `task` routes it like claude_completion."""
     api_key = settings.openai_api_key
     if not api_key:
         raise RuntimeError("OPENAI_API_KEY is not configured")
 
-    client = AsyncOpenAI(api_key=api_key)
+    client = get_openai_client()
     messages: list[dict] = []
     if system:
         messages.append({"role": "system", "content": system})
     messages.append({"role": "user", "content": prompt})
 
-    response = await client.chat.completions.create(
-        model=model or settings.openai_model,
-        messages=messages,
-        max_completion_tokens=max_tokens,
-        temperature=temperature,
+    route = get_route(task)
+    model = model or openai_model_for(route.tier)
+    params: dict = {"max_completion_tokens": max_tokens or route.max_tokens}
+    if is_reasoning_model(model):
+        params["max_completion_tokens"] += REASONING_TOKEN_ALLOWANCE
+        if route.tier == "fast":
+            # Fast-tier tasks are short and mechanical; don't let them think at length
+            params["reasoning_effort"] = "low"
+    else:
+        params["temperature"] = route.temperature if temperature is None else temperature
+    response = await client.chat.completions.create(model=model, messages=messages, **params)
+    # None when the budget ran out during reasoning; empty text fails over to the next provider
+    return (response.choices[0].message.content or "").strip()
+
+
+_PROVIDERS = {"claude": claude_completion, "openai": openai_completion}
+
+
+def _available_providers() -> list[str]:
+    names = [name.strip() for name in settings.llm_providers.split(",")]
+    return [
+        name for name in names
+        if name in _PROVIDERS and (name != "openai" or settings.openai_api_key)
+    ]
+
+
+def _unhealthy(tracker: LatencyTracker) -> bool:
+    return (
+        tracker.error_rate >= UNHEALTHY_ERROR_RATE
+        and tracker.last_failure is not None
+        and time.monotonic() - tracker.last_failure < UNHEALTHY_COOLDOWN
     )
-    return response.choices[0].message.content.strip()
+
+
+def rank_providers(names: list[str]) -> list[str]:
+    """Healthy providers first, in configured order.
+
+    Latency only sets the hedge delay, not the order: a provider that falls behind
+    rarely wins a hedged race, so it would never record the samples to move back up.
+    """
+    return sorted(names, key=lambda name: (_unhealthy(_latency[name]), names.index(name)))
+
+
+def _hedge_delay(provider: str) -> float:
+    p95 = _latency[provider].percentile(95, default=HEDGE_DELAY_DEFAULT)
+    return min(max(p95, HEDGE_DELAY_MIN), HEDGE_DELAY_MAX)
+
+
+def _answered(text: str) -> bool:
+    return bool(text)
+
+
+async def _attempt(name: str, **kwargs) -> str:
+    metrics.incr(f"llm.provider.{name}.calls")
+    start = time.monotonic()
+    try:
+        return await timed(partial(_PROVIDERS[name], **kwargs), _latency[name], _answered)
+    except asyncio.CancelledError:
+        # Abandoned run or losing hedge: credit the rest of a typical call as compute saved
+        expected = _latency[name].percentile(50, default=DEFAULT_P50)
+        metrics.incr("llm.cancelled.calls")
+        avoided = max(expected - (time.monotonic() - start), 0.0)
+        metrics.incr("llm.cancelled.seconds_avoided", avoided)
+        raise
+    except Exception as e:
+        metrics.incr(f"llm.provider.{name}.errors")
+        logger.warning(f"LLM provider {name} failed: {e}")
+        raise
+
+
+async def llm_completion(
+    prompt: str,
+    system: str | None = None,
+    model: str | None = None,
+    max_tokens: int | None = None,
+    temperature: float | None = None,
+    task: str | None = None,
+) -> str:
+    """Complete `prompt` on the healthiest configured provider, failing over to the next.
+
+    Providers are tried in LLM_PROVIDERS order, recently failing ones last. One that raises
+    (including the CLI's timeout) or returns nothing hands over to the next one. With
+    `llm_hedge_enabled`, the next one is also started once the first has run past its
+    recent p95, and whichever answers first wins. `model` only applies to the Claude CLI.
+
+    Concurrent calls with identical arguments share a single completion.
+    """
+    request = [prompt, system, model, max_tokens, temperature, task, routing_profile()]
+    key = hashlib.sha256(json.dumps(request).encode()).hexdigest()
+    return await _inflight.do(
+        key,
+        partial(_routed_completion, prompt, system, model, max_tokens, temperature, task),
+    )
+
+
+async def _routed_completion(
+    prompt: str,
+    system: str | None,
+    model: str | None,
+    max_tokens: int | None,
+    temperature: float | None,
+    task: str | None,
+) -> str:
+    providers = rank_providers(_available_providers())
+    if not providers:
+        raise RuntimeError("No LLM provider configured")
+
+    common = dict(
+        prompt=prompt, system=system, max_tokens=max_tokens, temperature=temperature, task=task
+    )
+    calls = [
+        partial(_attempt, name, model=model if name == "claude" else None, **common)
+        for name in providers
+    ]
+    if settings.llm_hedge_enabled:
+        delays = [0.0] + [_hedge_delay(name) for name in providers[:-1]]
+    else:
+        # No delay: the next provider only starts once the previous one has failed
+        delays = [0.0] + [None] * (len(providers) - 1)
+
+    start = time.monotonic()
+    try:
+        return await hedged_first(calls, delays=delays, is_success=_answered)
+    finally:
+        _record(task, start)
+
+
+def provider_health() -> dict[str, dict]:
+    """Rolling latency and error rate per LLM provider, for /metrics."""
+    return {
+        name: {
+            "samples": tracker.samples,
+            "p50_seconds": round(tracker.percentile(50, default=0.0), 2),
+            "p95_seconds": round(tracker.percentile(95, default=0.0), 2),
+            "error_rate": round(tracker.error_rate, 3),
+        }
+        for name, tracker in _latency.items()
+    }
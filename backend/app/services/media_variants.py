@@ -0,0 +1,109 @@
+import asyncio
+import io
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from app.config import settings
+from app.services.storage import get_storage
+
+logger = logging.getLogger(__name__)
+
+# Thumbnail for galleries, medium for the review/preview pane
+VARIANT_WIDTHS = (320, 768)
+VARIANT_FORMATS = {"webp": "WEBP", "jpg": "JPEG"}
+VARIANT_SOURCE_TYPES = {"image/png", "image/jpeg", "image/jpg", "image/webp", "image/gif"}
+
+_pool: ProcessPoolExecutor | None = None
+_pending: set[asyncio.Task] = set()
+
+
+def _variant_name(file_path: str, width: int, fmt: str) -> str:
+    stem = os.path.splitext(os.path.basename(file_path))[0]
+    return f"variants/{stem}_w{width}.{fmt}"
+
+
+def variant_path(file_path: str, width: int, fmt: str) -> str:
+    """Storage location of a derivative, keyed by (asset file, width, format)."""
+    return get_storage().path_for(_variant_name(file_path, width, fmt))
+
+
+def pick_variant(file_path: str, width: int, accept: str = "") -> str | None:
+    """Return the path of the smallest variant at least `width` wide.
+
+    Prefers WebP when the client accepts it. Returns None when no configured width is
+    large enough; the variant may not exist yet, in which case callers serve the original.
+    """
+    fmt = "webp" if "image/webp" in accept else "jpg"
+    for variant_width in VARIANT_WIDTHS:
+        if variant_width >= width:
+            return variant_path(file_path, variant_width, fmt)
+    return None
+
+
+def _render_variants(data: bytes) -> dict[tuple[int, str], bytes]:
+    """Resize an image into every configured width/format. Runs in a worker process."""
+    from PIL import Image
+
+    rendered = {}
+    with Image.open(io.BytesIO(data)) as img:
+        img.load()
+        for width in VARIANT_WIDTHS:
+            # Never upscale — requests above the original width fall through to it
+            if width >= img.width:
+                break
+            height = max(1, round(img.height * width / img.width))
+            resized = img.resize((width, height), Image.Resampling.LANCZOS)
+            for ext, pil_format in VARIANT_FORMATS.items():
+                out = resized
+                if pil_format == "JPEG" and out.mode not in ("RGB", "L"):
+                    out = out.convert("RGB")
+                elif out.mode == "P":
+                    out = out.convert("RGBA")
+                buf = io.BytesIO()
+                out.save(buf, pil_format, quality=80, optimize=True)
+                rendered[(width, ext)] = buf.getvalue()
+
+    return rendered
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=settings.media_variant_workers)
+    return _pool
+
+
+async def _generate_variants(file_path: str) -> None:
+    storage = get_storage()
+    try:
+        data = await storage.read(file_path)
+        loop = asyncio.get_running_loop()
+        rendered = await loop.run_in_executor(_get_pool(), _render_variants, data)
+        for (width, ext), variant in rendered.items():
+            await storage.save(_variant_name(file_path, width, ext), variant)
+    except Exception as e:
+        logger.warning(f"Media variant generation failed for {file_path}: {e}")
+
+
+def schedule_variants(file_path: str, content_type: str) -> None:
+    """Queue thumbnail/medium rendering for a new image asset without waiting on it."""
+    if content_type not in VARIANT_SOURCE_TYPES:
+        return
+    task = asyncio.create_task(_generate_variants(file_path))
+    _pending.add(task)
+    task.add_done_callback(_pending.discard)
+
+
+async def delete_variants(file_path: str) -> None:
+    storage = get_storage()
+    for width in VARIANT_WIDTHS:
+        for ext in VARIANT_FORMATS:
+            await storage.delete(variant_path(file_path, width, ext))
+
+
+def shutdown_variant_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+    _pool = None
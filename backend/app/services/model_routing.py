@@ -0,0 +1,61 @@
+from dataclasses import dataclass, replace
+
+from app.config import settings
+
+PROFILES = ("quality", "balanced", "fast")
+DEFAULT_PROFILE = "balanced"
+
+
+@dataclass(frozen=True)
+class Route:
+    tier: str  # "fast" | "standard"
+    max_tokens: int
+    temperature: float
+
+
+DEFAULT_ROUTE = Route("standard", 4000, 0.7)
+
+# OpenAI reasoning models (gpt-5 family, o-series) take no temperature, and their hidden
+# reasoning tokens come out of max_completion_tokens — a budget sized for the visible
+# answer alone can be spent entirely on reasoning, leaving no content
+REASONING_MODEL_PREFIXES = ("gpt-5", "o1", "o3", "o4")
+REASONING_TOKEN_ALLOWANCE = 4000
+
+# Model tier and generation budget per LLM task (the agent nodes plus the smaller calls
+# made inside them), as used by the "balanced" profile. "quality" puts every task on the
+# standard tier and "fast" every task on the fast tier, keeping the budgets.
+ROUTES: dict[str, Route] = {
+    "research": DEFAULT_ROUTE,
+    "draft": DEFAULT_ROUTE,
+    "optimize": DEFAULT_ROUTE,
+    "proofread": DEFAULT_ROUTE,
+    "image_prompt": Route("fast", 200, 0.5),
+    "claim_extraction": Route("fast", 300, 0.2),
+}
+
+
+def routing_profile() -> str:
+    profile = settings.model_routing_profile
+    return profile if profile in PROFILES else DEFAULT_PROFILE
+
+
+def get_route(task: str | None) -> Route:
+    route = ROUTES.get(task, DEFAULT_ROUTE) if task else DEFAULT_ROUTE
+    profile = routing_profile()
+    if profile == "quality":
+        return replace(route, tier="standard")
+    if profile == "fast":
+        return replace(route, tier="fast")
+    return route
+
+
+def claude_model_for(tier: str) -> str:
+    return settings.claude_fast_model if tier == "fast" else settings.claude_model
+
+
+def openai_model_for(tier: str) -> str:
+    return settings.openai_fast_model if tier == "fast" else settings.openai_model
+
+
+def is_reasoning_model(model: str) -> bool:
+    return model.startswith(REASONING_MODEL_PREFIXES)
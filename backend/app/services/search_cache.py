@@ -0,0 +1,162 @@
+import hashlib
+import logging
+import re
+import unicodedata
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+
+from app.db.session import async_session
+from app.models.cache_entry import CacheEntry
+from app.utils import metrics
+
+logger = logging.getLogger(__name__)
+
+# Facts move slowly; image results churn and are cheap to redo
+TTLS = {
+    "fact_check": timedelta(days=7),
+    "images": timedelta(days=1),
+}
+DEFAULT_TTL = timedelta(hours=12)
+# Token-set Jaccard similarity at or above which two claims are the same search
+DUPLICATE_CLAIM_SIMILARITY = 0.8
+# Expired rows are swept once every this many writes per worker
+_PURGE_EVERY = 200
+
+_MAGNITUDES = {
+    "k": 10**3,
+    "thousand": 10**3,
+    "m": 10**6,
+    "mm": 10**6,
+    "million": 10**6,
+    "b": 10**9,
+    "bn": 10**9,
+    "billion": 10**9,
+    "t": 10**12,
+    "tn": 10**12,
+    "trillion": 10**12,
+}
+_THOUSANDS_RE = re.compile(r"(?<=\d),(?=\d{3}\b)")
+_MAGNITUDE_RE = re.compile(
+    r"(\d+(?:\.\d+)?)\s*(" + "|".join(sorted(_MAGNITUDES, key=len, reverse=True)) + r")\b"
+)
+_PERCENT_RE = re.compile(r"(\d)\s*(?:%|percent\b|per cent\b|pct\b)")
+_TRAILING_ZEROS_RE = re.compile(r"\b(\d+)\.0+\b")
+_PUNCT_RE = re.compile(r"[^\w%$.\s]|(?<!\d)\.|\.(?!\d)")
+_WS_RE = re.compile(r"\s+")
+
+_writes = 0
+
+
+def _expand_magnitude(match: re.Match) -> str:
+    value = float(match.group(1)) * _MAGNITUDES[match.group(2)]
+    return str(int(value)) if value.is_integer() else str(value)
+
+
+def normalize_query(text: str) -> str:
+    """Fold case, whitespace, punctuation and number formats so equivalent queries match.
+
+    "Revenue grew 1,500,000 (12.0%)" and "revenue grew 1.5M 12 percent" normalize alike.
+    """
+    text = unicodedata.normalize("NFKC", text).lower()
+    text = _THOUSANDS_RE.sub("", text)
+    text = _MAGNITUDE_RE.sub(_expand_magnitude, text)
+    text = _PERCENT_RE.sub(r"\1%", text)
+    text = _TRAILING_ZEROS_RE.sub(r"\1", text)
+    text = _PUNCT_RE.sub(" ", text)
+    return _WS_RE.sub(" ", text).strip()
+
+
+def cache_key(query: str) -> str:
+    return hashlib.sha256(normalize_query(query).encode()).hexdigest()
+
+
+def _similarity(a: set[str], b: set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def dedupe_claims(claims: list[str]) -> list[str]:
+    """Drop claims that are near-duplicates of an earlier one, keeping the first wording."""
+    kept: list[tuple[str, set[str]]] = []
+    for claim in claims:
+        tokens = set(normalize_query(claim).split())
+        if any(_similarity(tokens, seen) >= DUPLICATE_CLAIM_SIMILARITY for _, seen in kept):
+            continue
+        kept.append((claim, tokens))
+    return [claim for claim, _ in kept]
+
+
+async def get_entry(namespace: str, key: str) -> Any | None:
+    """Read an entry by its exact key (at most 64 chars), with no query normalization."""
+    try:
+        async with async_session() as db:
+            result = await db.execute(
+                select(CacheEntry.value).where(
+                    CacheEntry.namespace == namespace,
+                    CacheEntry.key == key,
+                    CacheEntry.expires_at > datetime.now(timezone.utc),
+                )
+            )
+            return result.scalar_one_or_none()
+    except Exception as e:
+        logger.warning(f"Search cache read failed: {e}")
+        return None
+
+
+async def get_cached(namespace: str, query: str) -> Any | None:
+    return await get_entry(namespace, cache_key(query))
+
+
+async def set_entry(namespace: str, key: str, value: Any, ttl: timedelta | None = None) -> None:
+    """Write an entry under its exact key (at most 64 chars)."""
+    global _writes
+    expires_at = datetime.now(timezone.utc) + (ttl or TTLS.get(namespace, DEFAULT_TTL))
+    stmt = insert(CacheEntry).values(
+        namespace=namespace, key=key, value=value, expires_at=expires_at
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[CacheEntry.namespace, CacheEntry.key],
+        set_={"value": stmt.excluded.value, "expires_at": stmt.excluded.expires_at},
+    )
+    try:
+        async with async_session() as db:
+            await db.execute(stmt)
+            _writes += 1
+            if _writes % _PURGE_EVERY == 0:
+                await db.execute(
+                    delete(CacheEntry).where(CacheEntry.expires_at <= datetime.now(timezone.utc))
+                )
+            await db.commit()
+    except Exception as e:
+        logger.warning(f"Search cache write failed: {e}")
+
+
+async def set_cached(namespace: str, query: str, value: Any, ttl: timedelta | None = None) -> None:
+    await set_entry(namespace, cache_key(query), value, ttl)
+
+
+async def cached_call(
+    namespace: str,
+    query: str,
+    call: Callable[[], Awaitable[Any]],
+    ttl: timedelta | None = None,
+) -> Any:
+    """Return the cached result for `query`, or await `call` and cache what it returns.
+
+    Exceptions from `call` propagate and nothing is cached; neither are empty results.
+    """
+    cached = await get_cached(namespace, query)
+    if cached is not None:
+        metrics.incr(f"search_cache.{namespace}.hits")
+        return cached
+
+    metrics.incr(f"search_cache.{namespace}.misses")
+    value = await call()
+    if value:
+        await set_cached(namespace, query, value, ttl)
+    return value
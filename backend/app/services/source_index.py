@@ -0,0 +1,141 @@
+import math
+import re
+from collections import Counter
+
+# Passages are packed from paragraphs up to this many characters
+CHUNK_CHARS = 800
+# Rough chars-per-token ratio used to turn a token budget into a char budget
+CHARS_PER_TOKEN = 4
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:[.'][a-z0-9]+)*")
+_PARAGRAPH_RE = re.compile(r"\n\s*\n")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+_STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have how i in into is it its of on or our "
+    "so that the their them there these they this to was we were what when which who why "
+    "will with you your".split()
+)
+
+
+def _tokenize(text: str) -> list[str]:
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in _STOPWORDS]
+
+
+def _split_passages(text: str) -> list[str]:
+    """Pack paragraphs into passages of at most CHUNK_CHARS, splitting long ones by sentence."""
+    pieces: list[str] = []
+    for para in _PARAGRAPH_RE.split(text):
+        para = para.strip()
+        if not para:
+            continue
+        if len(para) <= CHUNK_CHARS:
+            pieces.append(para)
+            continue
+        for sentence in _SENTENCE_RE.split(para):
+            while len(sentence) > CHUNK_CHARS:
+                pieces.append(sentence[:CHUNK_CHARS])
+                sentence = sentence[CHUNK_CHARS:]
+            if sentence.strip():
+                pieces.append(sentence.strip())
+
+    passages: list[str] = []
+    current = ""
+    for piece in pieces:
+        if current and len(current) + len(piece) + 2 > CHUNK_CHARS:
+            passages.append(current)
+            current = piece
+        else:
+            current = f"{current}\n\n{piece}" if current else piece
+    if current:
+        passages.append(current)
+    return passages
+
+
+def build_source_index(text: str) -> dict:
+    """Chunk a source document and precompute BM25 term statistics.
+
+    The result is plain JSON so it can be stored on the post and carried in agent state.
+    """
+    chunks = []
+    df: Counter[str] = Counter()
+    for passage in _split_passages(text or ""):
+        tokens = _tokenize(passage)
+        tf = Counter(tokens)
+        df.update(tf.keys())
+        chunks.append({"text": passage, "tf": dict(tf), "length": len(tokens)})
+
+    total_length = sum(c["length"] for c in chunks)
+    return {
+        "chunks": chunks,
+        "df": dict(df),
+        "avgdl": total_length / len(chunks) if chunks else 0.0,
+    }
+
+
+def _bm25_scores(index: dict, query: str) -> list[float]:
+    chunks = index.get("chunks", [])
+    df = index.get("df", {})
+    avgdl = index.get("avgdl") or 1.0
+    n = len(chunks)
+    terms = set(_tokenize(query))
+
+    scores = []
+    for chunk in chunks:
+        tf = chunk["tf"]
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * chunk["length"] / avgdl)
+        score = 0.0
+        for term in terms:
+            freq = tf.get(term)
+            if not freq:
+                continue
+            idf = math.log(1 + (n - df[term] + 0.5) / (df[term] + 0.5))
+            score += idf * freq * (BM25_K1 + 1) / (freq + norm)
+        scores.append(score)
+    return scores
+
+
+def retrieve_passages(index: dict, query: str, max_tokens: int, top_k: int = 6) -> str:
+    """Return the top-k passages relevant to `query` that fit within `max_tokens`.
+
+    Passages are returned in document order. If nothing matches the query the
+    leading passages are used instead, so short documents still come through whole.
+    """
+    chunks = index.get("chunks", []) if index else []
+    if not chunks:
+        return ""
+
+    budget = max_tokens * CHARS_PER_TOKEN
+    scores = _bm25_scores(index, query)
+    ranked = sorted(
+        (i for i, s in enumerate(scores) if s > 0), key=lambda i: scores[i], reverse=True
+    )
+    if not ranked:
+        ranked = list(range(len(chunks)))
+
+    selected: list[int] = []
+    used = 0
+    for i in ranked:
+        if len(selected) >= top_k:
+            break
+        size = len(chunks[i]["text"])
+        if used + size > budget:
+            continue
+        selected.append(i)
+        used += size
+
+    if not selected:
+        # Budget smaller than the best passage — truncate it rather than return nothing
+        return chunks[ranked[0]]["text"][:budget]
+
+    parts = []
+    prev = None
+    for i in sorted(selected):
+        if prev is not None and i != prev + 1:
+            parts.append("[...]")
+        parts.append(chunks[i]["text"])
+        prev = i
+    return "\n\n".join(parts)
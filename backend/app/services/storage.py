@@ -0,0 +1,351 @@
+import asyncio
+import contextlib
+import logging
+import os
+import uuid
+from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator
+from functools import lru_cache
+
+from fastapi import Request
+from fastapi.responses import Response, StreamingResponse
+
+from app.config import settings
+from app.utils.http_cache import (
+    CACHE_CONTROL,
+    cached_file_response,
+    evict_file,
+    lookup_file,
+    media_type_for,
+)
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+
+
+class Storage(ABC):
+    """Where uploads and generated media live.
+
+    Files are addressed by the `file_path` string returned from `save`, which is what
+    gets stored on `MediaAsset.file_path`. Its basename is always the served filename.
+    """
+
+    @abstractmethod
+    def path_for(self, name: str) -> str:
+        """The file_path a file saved under `name` would have."""
+
+    @abstractmethod
+    async def save(self, name: str, data: bytes, content_type: str | None = None) -> str:
+        ...
+
+    async def save_stream(
+        self, name: str, chunks: AsyncIterator[bytes], content_type: str | None = None
+    ) -> str:
+        """Save a file from an async byte stream.
+
+        If the stream raises (or the caller is cancelled) nothing is left behind.
+        Backends that can't write incrementally buffer the stream and call `save`.
+        """
+        data = b"".join([chunk async for chunk in chunks])
+        return await self.save(name, data, content_type)
+
+    @abstractmethod
+    async def read(self, file_path: str) -> bytes:
+        ...
+
+    async def stream(self, file_path: str) -> AsyncIterator[bytes]:
+        """Read a file as a sequence of chunks. Backends that can't stream yield it whole."""
+        yield await self.read(file_path)
+
+    @abstractmethod
+    async def size(self, file_path: str) -> int | None:
+        """File size in bytes, or None if the file doesn't exist."""
+
+    @abstractmethod
+    async def delete(self, file_path: str) -> None:
+        ...
+
+    @abstractmethod
+    async def serve(
+        self,
+        request: Request,
+        file_path: str,
+        media_type: str | None = None,
+        filename: str | None = None,
+    ) -> Response | None:
+        """Build a cacheable response for a stored file, or None if it doesn't exist.
+
+        Raises PermissionError if `file_path` points outside the storage root.
+        """
+
+
+class LocalStorage(Storage):
+    """Files under `settings.upload_dir`. Blocking I/O runs in the default thread pool;
+    serving goes through FileResponse, which uses the server's pathsend/sendfile support
+    when available."""
+
+    def __init__(self, root: str):
+        self.root = root
+        self._resolved_root = os.path.realpath(root)
+        os.makedirs(root, exist_ok=True)
+
+    def path_for(self, name: str) -> str:
+        return os.path.join(self.root, name)
+
+    @staticmethod
+    def _temp_path(path: str) -> str:
+        # Same directory, so os.replace is an atomic rename
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        return f"{path}.{uuid.uuid4().hex}.tmp"
+
+    @classmethod
+    def _write(cls, path: str, data: bytes) -> None:
+        # Readers (and the stat/ETag cache) only ever see the complete file
+        tmp_path = cls._temp_path(path)
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            # Not there if open() itself failed; keep the original error
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(tmp_path)
+            raise
+
+    @staticmethod
+    def _discard(f, tmp_path: str) -> None:
+        f.close()
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(tmp_path)
+
+    @staticmethod
+    def _read(path: str) -> bytes:
+        with open(path, "rb") as f:
+            return f.read()
+
+    async def save(self, name: str, data: bytes, content_type: str | None = None) -> str:
+        path = self.path_for(name)
+        await asyncio.to_thread(self._write, path, data)
+        return path
+
+    async def save_stream(
+        self, name: str, chunks: AsyncIterator[bytes], content_type: str | None = None
+    ) -> str:
+        path = self.path_for(name)
+        tmp_path = self._temp_path(path)
+        f = await asyncio.to_thread(open, tmp_path, "wb")
+        write: asyncio.Task | None = None
+        try:
+            async for chunk in chunks:
+                # Shielded: cancelling us can't stop a write already running in its thread
+                write = asyncio.ensure_future(asyncio.to_thread(f.write, chunk))
+                await asyncio.shield(write)
+            f.close()
+            os.replace(tmp_path, path)
+        except BaseException:
+            if write is None or write.done():
+                self._discard(f, tmp_path)
+            else:
+
+                def discard(task: asyncio.Task) -> None:
+                    if not task.cancelled():
+                        task.exception()  # retrieved, so it isn't logged as unhandled
+                    self._discard(f, tmp_path)
+
+                # Cancelled mid-write: close and remove the file once the write is finished
+                write.add_done_callback(discard)
+            raise
+        return path
+
+    async def read(self, file_path: str) -> bytes:
+        return await asyncio.to_thread(self._read, file_path)
+
+    async def stream(self, file_path: str) -> AsyncIterator[bytes]:
+        f = await asyncio.to_thread(open, file_path, "rb")
+        try:
+            while chunk := await asyncio.to_thread(f.read, CHUNK_SIZE):
+                yield chunk
+        finally:
+            f.close()
+
+    async def size(self, file_path: str) -> int | None:
+        try:
+            return (await asyncio.to_thread(os.stat, file_path)).st_size
+        except FileNotFoundError:
+            return None
+
+    async def delete(self, file_path: str) -> None:
+        evict_file(file_path)
+        try:
+            await asyncio.to_thread(os.remove, file_path)
+        except FileNotFoundError:
+            pass
+
+    async def serve(
+        self,
+        request: Request,
+        file_path: str,
+        media_type: str | None = None,
+        filename: str | None = None,
+    ) -> Response | None:
+        entry = lookup_file(file_path, media_type=media_type, root=self._resolved_root)
+        if entry is None:
+            return None
+        return cached_file_response(request, entry, filename=filename)
+
+
+class S3Storage(Storage):
+    """S3-compatible object storage (AWS S3, MinIO, R2, ...).
+
+    Objects are proxied through the API so URLs, ETags and range requests behave the
+    same as with local storage. Requires the optional `aioboto3` dependency.
+    """
+
+    SCHEME = "s3://"
+
+    def __init__(
+        self,
+        bucket: str,
+        prefix: str = "",
+        endpoint_url: str | None = None,
+        region: str | None = None,
+        access_key_id: str | None = None,
+        secret_access_key: str | None = None,
+    ):
+        import aioboto3
+
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self._session = aioboto3.Session(
+            aws_access_key_id=access_key_id or None,
+            aws_secret_access_key=secret_access_key or None,
+            region_name=region or None,
+        )
+        self._endpoint_url = endpoint_url or None
+
+    def _client(self):
+        return self._session.client("s3", endpoint_url=self._endpoint_url)
+
+    def path_for(self, name: str) -> str:
+        key = f"{self.prefix}/{name}" if self.prefix else name
+        return f"{self.SCHEME}{self.bucket}/{key}"
+
+    def _key(self, file_path: str) -> str:
+        bucket_prefix = f"{self.SCHEME}{self.bucket}/"
+        if not file_path.startswith(bucket_prefix):
+            raise PermissionError(file_path)
+        return file_path[len(bucket_prefix):]
+
+    async def save(self, name: str, data: bytes, content_type: str | None = None) -> str:
+        path = self.path_for(name)
+        async with self._client() as s3:
+            await s3.put_object(
+                Bucket=self.bucket,
+                Key=self._key(path),
+                Body=data,
+                ContentType=content_type or media_type_for(name),
+            )
+        return path
+
+    async def read(self, file_path: str) -> bytes:
+        async with self._client() as s3:
+            obj = await s3.get_object(Bucket=self.bucket, Key=self._key(file_path))
+            async with obj["Body"] as body:
+                return await body.read()
+
+    async def stream(self, file_path: str) -> AsyncIterator[bytes]:
+        async with self._client() as s3:
+            obj = await s3.get_object(Bucket=self.bucket, Key=self._key(file_path))
+            async with obj["Body"] as body:
+                async for chunk in body.iter_chunks(CHUNK_SIZE):
+                    yield chunk
+
+    async def size(self, file_path: str) -> int | None:
+        from botocore.exceptions import ClientError
+
+        async with self._client() as s3:
+            try:
+                head = await s3.head_object(Bucket=self.bucket, Key=self._key(file_path))
+            except ClientError:
+                return None
+        return head["ContentLength"]
+
+    async def delete(self, file_path: str) -> None:
+        async with self._client() as s3:
+            await s3.delete_object(Bucket=self.bucket, Key=self._key(file_path))
+
+    async def serve(
+        self,
+        request: Request,
+        file_path: str,
+        media_type: str | None = None,
+        filename: str | None = None,
+    ) -> Response | None:
+        from botocore.exceptions import ClientError
+
+        params = {"Bucket": self.bucket, "Key": self._key(file_path)}
+        for header, param in (
+            ("if-none-match", "IfNoneMatch"),
+            ("range", "Range"),
+            ("if-range", "IfRange"),
+        ):
+            if request.headers.get(header):
+                params[param] = request.headers[header]
+
+        client_cm = self._client()
+        s3 = await client_cm.__aenter__()
+        try:
+            obj = await s3.get_object(**params)
+        except ClientError as e:
+            await client_cm.__aexit__(None, None, None)
+            status = int(e.response.get("ResponseMetadata", {}).get("HTTPStatusCode", 0))
+            if status == 304:
+                etag = e.response.get("ResponseMetadata", {}).get("HTTPHeaders", {}).get("etag")
+                headers = {"Cache-Control": CACHE_CONTROL}
+                if etag:
+                    headers["ETag"] = etag
+                return Response(status_code=304, headers=headers)
+            if status in (404, 403):
+                return None
+            raise
+
+        headers = {
+            "Cache-Control": CACHE_CONTROL,
+            "ETag": obj["ETag"],
+            "Accept-Ranges": "bytes",
+            "Content-Length": str(obj["ContentLength"]),
+        }
+        if obj.get("ContentRange"):
+            headers["Content-Range"] = obj["ContentRange"]
+        if filename:
+            headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+
+        async def body_iter():
+            try:
+                async with obj["Body"] as body:
+                    async for chunk in body.iter_chunks(CHUNK_SIZE):
+                        yield chunk
+            finally:
+                await client_cm.__aexit__(None, None, None)
+
+        return StreamingResponse(
+            body_iter(),
+            status_code=206 if obj.get("ContentRange") else 200,
+            media_type=media_type or obj.get("ContentType") or media_type_for(file_path),
+            headers=headers,
+        )
+
+
+@lru_cache(maxsize=1)
+def get_storage() -> Storage:
+    if settings.storage_backend == "s3":
+        return S3Storage(
+            bucket=settings.s3_bucket,
+            prefix=settings.s3_prefix,
+            endpoint_url=settings.s3_endpoint_url,
+            region=settings.s3_region,
+            access_key_id=settings.s3_access_key_id,
+            secret_access_key=settings.s3_secret_access_key,
+        )
+    return LocalStorage(settings.upload_dir)
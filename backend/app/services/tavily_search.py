@@ -1,15 +1,21 @@
-import os
+import asyncio
 import uuid
 import logging
-
-import httpx
-from tavily import AsyncTavilyClient
+from functools import partial
 
 from app.config import settings
+from app.services.claim_extractor import extract_claims
+from app.services.http_clients import get_http_client, get_tavily_client
 from app.services.llm import llm_completion
+from app.services.search_cache import cache_key, cached_call, dedupe_claims
+from app.services.storage import get_storage
+from app.utils import metrics
+from app.utils.singleflight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
+_inflight = SingleFlight("tavily")
+
 CLAIM_EXTRACTION_PROMPT = """Extract the 2-4 most important factual claims from this LinkedIn post draft. Return ONLY the claims as a newline-separated list, nothing else. Focus on statistics, data points, named entities, and specific assertions that can be verified.
 
 Draft:
@@ -18,51 +24,36 @@ Draft:
 Content pillar: {content_pillar}"""
 
 
+async def extract_draft_claims(draft_content: str, content_pillar: str) -> list[str]:
+    """Pick out the draft's checkable claims, per `settings.claim_extraction_mode`."""
+    mode = settings.claim_extraction_mode
+    if mode != "llm":
+        claims = extract_claims(draft_content)
+        if claims or mode == "local":
+            metrics.incr("claim_extraction.local")
+            return claims
+
+    metrics.incr("claim_extraction.llm")
+    prompt = CLAIM_EXTRACTION_PROMPT.format(
+        draft_content=draft_content,
+        content_pillar=content_pillar,
+    )
+    claims_text = await llm_completion(prompt, task="claim_extraction")
+    return [c.strip() for c in claims_text.strip().split("\n") if c.strip()]
+
+
 async def fact_check_search(draft_content: str, content_pillar: str) -> dict:
     """Search the web to fact-check key claims in the draft content."""
     try:
-        # Extract claims using LLM
-        prompt = CLAIM_EXTRACTION_PROMPT.format(
-            draft_content=draft_content,
-            content_pillar=content_pillar,
-        )
-        claims_text = await llm_completion(prompt, max_tokens=300)
-
-        claims = [c.strip() for c in claims_text.strip().split("\n") if c.strip()]
-        claims = claims[:4]  # Cap at 4 claims
+        claims = await extract_draft_claims(draft_content, content_pillar)
+        # Near-identical claims would just burn a second search on the same results
+        claims = dedupe_claims(claims)[:4]  # Cap at 4 claims
 
         if not claims:
             return {"claims_checked": [], "search_performed": False}
 
-        client = AsyncTavilyClient(api_key=settings.tavily_api_key)
-        claims_checked = []
-
-        for claim in claims:
-            try:
-                result = await client.search(
-                    query=claim,
-                    search_depth="advanced",
-                    max_results=3,
-                    include_answer=True,
-                )
-                sources = [
-                    {
-                        "title": r.get("title", ""),
-                        "url": r.get("url", ""),
-                        "snippet": r.get("content", "")[:300],
-                    }
-                    for r in result.get("results", [])
-                ]
-                claims_checked.append(
-                    {
-                        "claim": claim,
-                        "search_answer": result.get("answer", ""),
-                        "sources": sources,
-                    }
-                )
-            except Exception as e:
-                logger.warning(f"Tavily search failed for claim '{claim[:50]}...': {e}")
-                continue
+        results = await asyncio.gather(*(_check_claim(claim) for claim in claims))
+        claims_checked = [r for r in results if r is not None]
 
         return {"claims_checked": claims_checked, "search_performed": True}
 
@@ -71,77 +62,153 @@ async def fact_check_search(draft_content: str, content_pillar: str) -> dict:
         return {"claims_checked": [], "search_performed": False}
 
 
+async def _cached_search(namespace: str, query: str, search):
+    """cached_call, with concurrent searches for the same normalized query sharing one."""
+    return await _inflight.do(
+        f"{namespace}:{cache_key(query)}", partial(cached_call, namespace, query, search)
+    )
+
+
+async def _check_claim(claim: str) -> dict | None:
+    async def search() -> dict:
+        metrics.incr("tavily.searches")
+        result = await get_tavily_client().search(
+            query=claim,
+            search_depth="advanced",
+            max_results=3,
+            include_answer=True,
+        )
+        return {
+            "search_answer": result.get("answer", ""),
+            "sources": [
+                {
+                    "title": r.get("title", ""),
+                    "url": r.get("url", ""),
+                    "snippet": r.get("content", "")[:300],
+                }
+                for r in result.get("results", [])
+            ],
+        }
+
+    try:
+        found = await _cached_search("fact_check", claim, search)
+    except Exception as e:
+        logger.warning(f"Tavily search failed for claim '{claim[:50]}...': {e}")
+        return None
+    return {"claim": claim, **found}
+
+
 async def search_relevant_images(draft_content: str, content_pillar: str) -> list[dict]:
     """Search the web for relevant images (charts, infographics, data tables)."""
     try:
         query = f"{draft_content[:150]} {content_pillar} data chart infographic statistics"
-        client = AsyncTavilyClient(api_key=settings.tavily_api_key)
-
-        result = await client.search(
-            query=query,
-            include_images=True,
-            max_results=5,
-        )
 
-        images = result.get("images", [])
-        candidates = []
-        for img in images[:3]:
-            if isinstance(img, str):
-                candidates.append({"url": img, "description": ""})
-            elif isinstance(img, dict):
-                candidates.append(
-                    {
-                        "url": img.get("url", ""),
-                        "description": img.get("description", ""),
-                    }
-                )
-
-        return candidates
+        async def search() -> list[dict]:
+            metrics.incr("tavily.searches")
+            result = await get_tavily_client().search(
+                query=query,
+                include_images=True,
+                max_results=5,
+            )
+
+            images = result.get("images", [])
+            candidates = []
+            for img in images[:3]:
+                if isinstance(img, str):
+                    candidates.append({"url": img, "description": ""})
+                elif isinstance(img, dict):
+                    candidates.append(
+                        {
+                            "url": img.get("url", ""),
+                            "description": img.get("description", ""),
+                        }
+                    )
+            return candidates
+
+        return await _cached_search("images", query, search)
 
     except Exception as e:
         logger.error(f"Image search failed: {e}")
         return []
 
 
-async def download_image(image_url: str) -> dict:
-    """Download an image from a URL and save it to the uploads directory."""
-    save_dir = settings.upload_dir
-    os.makedirs(save_dir, exist_ok=True)
-
+# Retrieved images are social-post illustrations; anything bigger is not worth the bandwidth
+MAX_IMAGE_BYTES = 10 * 1024 * 1024
+# Enough leading bytes to recognise every accepted format
+_SNIFF_BYTES = 12
+_IMAGE_EXTENSIONS = {
+    "image/png": ".png",
+    "image/jpeg": ".jpg",
+    "image/webp": ".webp",
+    "image/gif": ".gif",
+}
+
+
+def sniff_image_type(head: bytes) -> str | None:
+    """Identify an accepted image format from its magic bytes; None if it's anything else."""
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if head.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+        return "image/gif"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+
+def _download_failure(image_url: str, error: str) -> dict:
+    return {
+        "file_path": None,
+        "filename": None,
+        "success": False,
+        "error": error,
+        "source_url": image_url,
+    }
+
+
+async def download_image(image_url: str, max_bytes: int = MAX_IMAGE_BYTES) -> dict:
+    """Stream an image from a URL into storage.
+
+    The format is taken from the file's leading bytes rather than the Content-Type
+    header; non-images and files over `max_bytes` are abandoned mid-transfer.
+    """
     try:
-        async with httpx.AsyncClient(timeout=15.0) as client:
-            response = await client.get(image_url, follow_redirects=True)
+        client = get_http_client("images")
+        async with client.stream("GET", image_url, follow_redirects=True) as response:
             response.raise_for_status()
 
-        content_type = response.headers.get("content-type", "")
-        valid_types = ("image/png", "image/jpeg", "image/webp", "image/gif")
-        if not any(t in content_type for t in valid_types):
-            return {
-                "file_path": None,
-                "filename": None,
-                "success": False,
-                "error": f"Invalid content type: {content_type}",
-                "source_url": image_url,
-            }
-
-        # Determine extension from content type
-        ext_map = {
-            "image/png": ".png",
-            "image/jpeg": ".jpg",
-            "image/webp": ".webp",
-            "image/gif": ".gif",
-        }
-        ext = ".jpg"
-        for mime, extension in ext_map.items():
-            if mime in content_type:
-                ext = extension
-                break
-
-        filename = f"{uuid.uuid4()}{ext}"
-        file_path = os.path.join(save_dir, filename)
-
-        with open(file_path, "wb") as f:
-            f.write(response.content)
+            declared_type = response.headers.get("content-type", "")
+            if declared_type.startswith(("text/", "application/json")):
+                return _download_failure(image_url, f"Invalid content type: {declared_type}")
+            declared_size = response.headers.get("content-length", "")
+            if declared_size.isdigit() and int(declared_size) > max_bytes:
+                return _download_failure(image_url, f"Image too large: {declared_size} bytes")
+
+            stream = response.aiter_bytes()
+            head = b""
+            async for chunk in stream:
+                head += chunk
+                if len(head) >= _SNIFF_BYTES:
+                    break
+
+            content_type = sniff_image_type(head)
+            if content_type is None:
+                return _download_failure(image_url, f"Not an image (declared {declared_type!r})")
+
+            async def body():
+                received = len(head)
+                if received > max_bytes:
+                    raise ValueError(f"Image exceeds {max_bytes} bytes")
+                yield head
+                async for chunk in stream:
+                    received += len(chunk)
+                    if received > max_bytes:
+                        raise ValueError(f"Image exceeds {max_bytes} bytes")
+                    yield chunk
+
+            filename = f"{uuid.uuid4()}{_IMAGE_EXTENSIONS[content_type]}"
+            file_path = await get_storage().save_stream(filename, body(), content_type)
 
         return {
             "file_path": file_path,
@@ -153,10 +220,35 @@ async def download_image(image_url: str) -> dict:
 
     except Exception as e:
         logger.error(f"Image download failed for {image_url}: {e}")
-        return {
-            "file_path": None,
-            "filename": None,
-            "success": False,
-            "error": str(e),
-            "source_url": image_url,
-        }
+        return _download_failure(image_url, str(e))
+
+
+async def retrieve_web_image(draft_content: str, content_pillar: str) -> dict:
+    """Search for relevant web images and download the candidates concurrently.
+
+    Returns the first download that succeeds; the others are cancelled.
+    """
+    candidates = await search_relevant_images(draft_content, content_pillar)
+    urls = [c["url"] for c in candidates if c.get("url")]
+    if not urls:
+        return _download_failure(None, "No relevant web images found")
+
+    pending = {asyncio.create_task(download_image(url)) for url in urls}
+    result = None
+    try:
+        while pending and not (result and result["success"]):
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if result and result["success"]:
+                    # Lost a same-tick race with the winner — drop its file
+                    if task.result()["success"]:
+                        await get_storage().delete(task.result()["file_path"])
+                    continue
+                result = task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+        for leftover in await asyncio.gather(*pending, return_exceptions=True):
+            if isinstance(leftover, dict) and leftover["success"]:
+                await get_storage().delete(leftover["file_path"])
+    return result
@@ -1,9 +1,135 @@
+import asyncio
+import hashlib
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import timedelta
+from email.utils import parsedate_to_datetime
+
 import httpx
 
 from app.config import settings
+from app.services.http_clients import get_http_client
+from app.services.search_cache import get_entry, set_entry
+from app.services.storage import get_storage
+from app.utils import metrics
+
+logger = logging.getLogger(__name__)
 
 BASE_URL = "https://api.typefully.com"
 
+MAX_ATTEMPTS = 5
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 30.0
+# Longest Retry-After we'll sit out inside a request before giving up
+MAX_RETRY_AFTER = 120.0
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+# Typefully keeps uploaded media around for reuse; re-upload after this to be safe
+MEDIA_ID_TTL = timedelta(days=7)
+MEDIA_CACHE_NAMESPACE = "typefully_media"
+# Posts pushed in parallel by schedule_many; the throttle still paces the actual requests
+BULK_CONCURRENCY = 4
+
+
+class _Throttle:
+    """Spaces requests evenly to stay under the API's rate limit.
+
+    Shared by every caller in the process, so concurrent pushes queue up rather than
+    tripping 429s, and one 429 backs everyone off.
+    """
+
+    def __init__(self, per_minute: int):
+        self.interval = 60.0 / max(per_minute, 1)
+        self._next = 0.0
+
+    async def wait(self) -> None:
+        now = time.monotonic()
+        slot = max(now, self._next)
+        self._next = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    def pause_for(self, seconds: float) -> None:
+        self._next = max(self._next, time.monotonic() + seconds)
+
+
+_throttle = _Throttle(settings.typefully_requests_per_minute)
+
+
+def _retry_after(resp: httpx.Response) -> float | None:
+    """Seconds to wait per Retry-After (delta-seconds or HTTP date), if the header is set."""
+    value = resp.headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def _backoff(attempt: int) -> float:
+    """Full-jitter exponential backoff."""
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2**attempt))
+
+
+async def _request(
+    method: str,
+    url: str,
+    *,
+    retry_unsafe: bool = False,
+    throttle: bool = True,
+    **kwargs,
+) -> httpx.Response:
+    """Send a request with rate-limit pacing and retries, then raise_for_status.
+
+    429s and connection failures are always retried (the request never ran). 5xx
+    responses are retried unless the request is a POST, which could otherwise create
+    a duplicate — pass `retry_unsafe=True` where a repeat is harmless. A streamed body
+    is passed as `content=` a zero-argument callable, so each attempt gets a fresh one.
+    """
+    client = get_http_client("typefully")
+    content = kwargs.pop("content", None)
+    for attempt in range(MAX_ATTEMPTS):
+        if throttle:
+            await _throttle.wait()
+        last = attempt == MAX_ATTEMPTS - 1
+        try:
+            resp = await client.request(
+                method, url, content=content() if callable(content) else content, **kwargs
+            )
+        except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout):
+            if last:
+                raise
+            metrics.incr("typefully.retries")
+            await asyncio.sleep(_backoff(attempt))
+            continue
+
+        retryable = resp.status_code == 429 or (
+            resp.status_code in RETRYABLE_STATUS and (method != "POST" or retry_unsafe)
+        )
+        if not retryable or last:
+            resp.raise_for_status()
+            return resp
+
+        delay = _retry_after(resp)
+        if delay is None:
+            delay = _backoff(attempt)
+        elif delay > MAX_RETRY_AFTER:
+            resp.raise_for_status()
+        if resp.status_code == 429:
+            metrics.incr("typefully.rate_limited")
+            if throttle:
+                _throttle.pause_for(delay)
+        metrics.incr("typefully.retries")
+        logger.info(f"Typefully {method} returned {resp.status_code}, retrying in {delay:.1f}s")
+        await asyncio.sleep(delay)
+    raise AssertionError("unreachable")
+
 
 def _headers() -> dict[str, str]:
     return {
@@ -14,10 +140,8 @@ def _headers() -> dict[str, str]:
 
 async def get_social_sets() -> list[dict]:
     """List available social sets (connected accounts)."""
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(f"{BASE_URL}/v2/social-sets", headers=_headers())
-        resp.raise_for_status()
-        return resp.json()
+    resp = await _request("GET", f"{BASE_URL}/v2/social-sets", headers=_headers())
+    return resp.json()
 
 
 async def get_linkedin_profile() -> dict:
@@ -25,13 +149,12 @@ async def get_linkedin_profile() -> dict:
     social_set_id = settings.typefully_social_set_id
     if not social_set_id:
         return {}
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(
-            f"{BASE_URL}/v2/social-sets/{social_set_id}/",
-            headers=_headers(),
-        )
-        resp.raise_for_status()
-        data = resp.json()
+    resp = await _request(
+        "GET",
+        f"{BASE_URL}/v2/social-sets/{social_set_id}/",
+        headers=_headers(),
+    )
+    data = resp.json()
 
     linkedin = data.get("platforms", {}).get("linkedin", {})
     return {
@@ -75,63 +198,132 @@ async def create_draft(
     if publish_at:
         payload["publish_at"] = publish_at
 
-    async with httpx.AsyncClient() as client:
-        resp = await client.post(
-            f"{BASE_URL}/v2/social-sets/{social_set_id}/drafts",
-            headers=_headers(),
-            json=payload,
-        )
-        resp.raise_for_status()
-        return resp.json()
+    resp = await _request(
+        "POST",
+        f"{BASE_URL}/v2/social-sets/{social_set_id}/drafts",
+        headers=_headers(),
+        json=payload,
+    )
+    return resp.json()
 
 
 async def get_draft(draft_id: str) -> dict:
     """Fetch a draft's current status from Typefully."""
     social_set_id = settings.typefully_social_set_id
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(
-            f"{BASE_URL}/v2/social-sets/{social_set_id}/drafts/{draft_id}",
-            headers=_headers(),
-        )
-        resp.raise_for_status()
-        return resp.json()
+    resp = await _request(
+        "GET",
+        f"{BASE_URL}/v2/social-sets/{social_set_id}/drafts/{draft_id}",
+        headers=_headers(),
+    )
+    return resp.json()
+
+
+async def _content_digest(file_path: str) -> tuple[str, int]:
+    """SHA-256 and size of a stored file, read as a stream."""
+    digest = hashlib.sha256()
+    size = 0
+    async for chunk in get_storage().stream(file_path):
+        digest.update(chunk)
+        size += len(chunk)
+    return digest.hexdigest(), size
 
 
 async def upload_media(file_path: str, content_type: str) -> str:
-    """Upload a media file to Typefully and return the media_id."""
-    social_set_id = settings.typefully_social_set_id
+    """Upload a media file to Typefully and return the media_id.
 
-    async with httpx.AsyncClient() as client:
-        # Get presigned upload URL
-        resp = await client.post(
-            f"{BASE_URL}/v2/social-sets/{social_set_id}/media",
-            headers=_headers(),
-            json={"content_type": content_type},
-        )
-        resp.raise_for_status()
-        upload_data = resp.json()
+    The same content already uploaded to this social set reuses its media_id instead
+    of being uploaded again.
+    """
+    social_set_id = settings.typefully_social_set_id
+    digest, size = await _content_digest(file_path)
+    # Exact key: the query normalization get_cached applies is meant for search text
+    cache_key = hashlib.sha256(f"{social_set_id}:{digest}".encode()).hexdigest()
+    cached = await get_entry(MEDIA_CACHE_NAMESPACE, cache_key)
+    if cached:
+        metrics.incr("typefully.media_reused")
+        return cached["media_id"]
 
-        # Upload file to presigned URL
-        with open(file_path, "rb") as f:
-            file_bytes = f.read()
+    # Get presigned upload URL (an unused one is harmless, so retrying is safe)
+    resp = await _request(
+        "POST",
+        f"{BASE_URL}/v2/social-sets/{social_set_id}/media",
+        retry_unsafe=True,
+        headers=_headers(),
+        json={"content_type": content_type},
+    )
+    upload_data = resp.json()
 
-        await client.put(
-            upload_data["upload_url"],
-            content=file_bytes,
-            headers={"Content-Type": content_type},
-        )
+    # Stream the file to the presigned URL — object storage, not the rate-limited API
+    await _request(
+        "PUT",
+        upload_data["upload_url"],
+        throttle=False,
+        content=lambda: get_storage().stream(file_path),
+        headers={"Content-Type": content_type, "Content-Length": str(size)},
+    )
 
-        return upload_data["media_id"]
+    await set_entry(
+        MEDIA_CACHE_NAMESPACE, cache_key, {"media_id": upload_data["media_id"]}, MEDIA_ID_TTL
+    )
+    return upload_data["media_id"]
 
 
 async def schedule_draft(draft_id: str, publish_at: str) -> dict:
     """Schedule (or reschedule) a Typefully draft."""
     social_set_id = settings.typefully_social_set_id
-    async with httpx.AsyncClient() as client:
-        resp = await client.patch(
-            f"{BASE_URL}/v2/social-sets/{social_set_id}/drafts/{draft_id}",
-            headers=_headers(),
-            json={"publish_at": publish_at},
-        )
-        resp.raise_for_status()
-        return resp.json()
+    resp = await _request(
+        "PATCH",
+        f"{BASE_URL}/v2/social-sets/{social_set_id}/drafts/{draft_id}",
+        headers=_headers(),
+        json={"publish_at": publish_at},
+    )
+    return resp.json()
+
+
+@dataclass
+class ScheduleItem:
+    """One post to push: scheduled in place if it already has a draft, else created."""
+
+    key: str
+    text: str
+    publish_at: str
+    hashtags: list[str] | None = None
+    draft_id: str | None = None
+    media: list[tuple[str, str]] = field(default_factory=list)  # (file_path, content_type)
+
+
+async def _schedule_one(item: ScheduleItem) -> dict:
+    try:
+        if item.draft_id:
+            await schedule_draft(item.draft_id, item.publish_at)
+            draft_id = item.draft_id
+        else:
+            media_ids = [
+                await upload_media(file_path, content_type)
+                for file_path, content_type in item.media
+            ]
+            draft = await create_draft(
+                text=item.text,
+                hashtags=item.hashtags,
+                publish_at=item.publish_at,
+                media_ids=media_ids or None,
+            )
+            draft_id = str(draft.get("id", ""))
+        return {"key": item.key, "success": True, "draft_id": draft_id, "error": None}
+    except Exception as e:
+        logger.error(f"Failed to schedule {item.key} on Typefully: {e}")
+        return {"key": item.key, "success": False, "draft_id": item.draft_id, "error": str(e)}
+
+
+async def schedule_many(items: list[ScheduleItem]) -> list[dict]:
+    """Push many posts (with media) concurrently, paced by the shared rate limiter.
+
+    A failure only affects its own item; results come back in input order.
+    """
+    semaphore = asyncio.Semaphore(BULK_CONCURRENCY)
+
+    async def run(item: ScheduleItem) -> dict:
+        async with semaphore:
+            return await _schedule_one(item)
+
+    return await asyncio.gather(*(run(item) for item in items))
@@ -0,0 +1,198 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.db.session import async_session, engine
+from app.models.calendar_entry import CalendarEntry, CalendarStatus
+from app.models.post import Post, PostStatus
+from app.services import typefully as typefully_service
+from app.services.search_cache import get_cached, set_cached
+
+logger = logging.getLogger(__name__)
+
+TICK_SECONDS = 60
+# Poll interval by how close the draft is to its publish time: (within, poll every)
+POLL_SCHEDULE = [
+    (timedelta(minutes=15), timedelta(minutes=1)),
+    (timedelta(hours=2), timedelta(minutes=5)),
+    (timedelta(hours=24), timedelta(minutes=15)),
+]
+IDLE_POLL_INTERVAL = timedelta(hours=1)
+POLL_CONCURRENCY = 4
+PROFILE_TTL = timedelta(hours=6)
+
+_PROFILE_NAMESPACE = "typefully_profile"
+# Postgres advisory lock id held by whichever worker is polling, so each tick polls once
+_SYNC_LOCK_ID = 0x7479_7065_6675_6C6C  # "typefull"
+_sync_task: asyncio.Task | None = None
+
+
+def _parse_time(value) -> datetime | None:
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def poll_interval(publish_at: datetime | None, now: datetime) -> timedelta:
+    """How often to poll a draft: tightly around its publish time, rarely otherwise."""
+    if publish_at is None:
+        return IDLE_POLL_INTERVAL
+    # Past-due drafts stay on the tightest interval until they report published
+    distance = max(publish_at - now, timedelta(0))
+    for within, interval in POLL_SCHEDULE:
+        if distance <= within:
+            return interval
+    return IDLE_POLL_INTERVAL
+
+
+async def apply_draft_status(db: AsyncSession, post: Post, draft: dict) -> None:
+    """Record a Typefully draft's state on the post and its calendar entries.
+
+    Doesn't commit. Published is final; a draft that lost its schedule moves the post
+    back to approved.
+    """
+    status = str(draft.get("status") or "").lower() or None
+    post.typefully_status = status
+    post.typefully_publish_at = _parse_time(draft.get("publish_at") or draft.get("scheduled_date"))
+    post.typefully_synced_at = datetime.now(timezone.utc)
+
+    if post.status == PostStatus.PUBLISHED:
+        return
+    if status == "published":
+        post_status, calendar_status = PostStatus.PUBLISHED, CalendarStatus.PUBLISHED
+    elif status in ("scheduled", "publishing"):
+        post_status, calendar_status = PostStatus.SCHEDULED, CalendarStatus.SCHEDULED
+    elif status == "draft" and post.status == PostStatus.SCHEDULED:
+        post_status, calendar_status = PostStatus.APPROVED, CalendarStatus.DRAFT_READY
+    else:
+        return
+
+    if post.status != post_status:
+        logger.info(f"Post {post.id} is now {post_status.value} on Typefully")
+    post.status = post_status
+    await db.execute(
+        update(CalendarEntry)
+        .where(
+            CalendarEntry.post_id == post.id,
+            CalendarEntry.status != CalendarStatus.PUBLISHED,
+        )
+        .values(status=calendar_status)
+    )
+
+
+async def sync_outstanding(force: bool = False) -> int:
+    """Poll every outstanding draft that is due and write back changes. Returns polls made.
+
+    Every worker runs the sync loop; one holding the lock (for the whole tick) does the
+    polling and the others skip the tick. No transaction stays open across the Typefully
+    calls: the due list is read first, and the results are written in a short transaction
+    of their own against freshly loaded posts.
+    """
+    async with engine.connect() as lock_conn:
+        locked = await lock_conn.scalar(select(func.pg_try_advisory_lock(_SYNC_LOCK_ID)))
+        # End the implicit transaction; the session-level lock outlives it
+        await lock_conn.commit()
+        if not locked:
+            return 0
+        try:
+            return await _poll_due(force)
+        finally:
+            await lock_conn.execute(select(func.pg_advisory_unlock(_SYNC_LOCK_ID)))
+            await lock_conn.commit()
+
+
+async def _poll_due(force: bool) -> int:
+    now = datetime.now(timezone.utc)
+    async with async_session() as db:
+        result = await db.execute(
+            select(
+                Post.id,
+                Post.typefully_draft_id,
+                Post.typefully_synced_at,
+                Post.typefully_publish_at,
+            ).where(
+                Post.typefully_draft_id.is_not(None),
+                or_(Post.typefully_status.is_(None), Post.typefully_status != "published"),
+            )
+        )
+        due = [
+            (post_id, draft_id)
+            for post_id, draft_id, synced_at, publish_at in result.all()
+            if force or synced_at is None or now - synced_at >= poll_interval(publish_at, now)
+        ]
+    if not due:
+        return 0
+
+    semaphore = asyncio.Semaphore(POLL_CONCURRENCY)
+
+    async def fetch(post_id, draft_id: str) -> dict | None:
+        async with semaphore:
+            try:
+                return await typefully_service.get_draft(draft_id)
+            except Exception as e:
+                logger.warning(f"Typefully status poll failed for post {post_id}: {e}")
+                return None
+
+    drafts = await asyncio.gather(*(fetch(post_id, draft_id) for post_id, draft_id in due))
+    fetched = {
+        post_id: (draft_id, draft)
+        for (post_id, draft_id), draft in zip(due, drafts)
+        if draft is not None
+    }
+    if fetched:
+        async with async_session() as db:
+            result = await db.execute(select(Post).where(Post.id.in_(fetched.keys())))
+            for post in result.scalars().all():
+                draft_id, draft = fetched[post.id]
+                # Skip posts pushed to a new draft while this one was being fetched
+                if post.typefully_draft_id == draft_id:
+                    await apply_draft_status(db, post, draft)
+            await db.commit()
+    return len(due)
+
+
+async def get_profile(refresh: bool = False) -> dict:
+    """LinkedIn profile of the configured social set, cached for PROFILE_TTL."""
+    key = settings.typefully_social_set_id
+    if not refresh:
+        cached = await get_cached(_PROFILE_NAMESPACE, key)
+        if cached:
+            return cached
+    profile = await typefully_service.get_linkedin_profile()
+    if profile:
+        await set_cached(_PROFILE_NAMESPACE, key, profile, PROFILE_TTL)
+    return profile
+
+
+async def _sync_loop() -> None:
+    while True:
+        try:
+            await sync_outstanding()
+        except Exception as e:
+            logger.error(f"Typefully sync failed: {e}")
+        await asyncio.sleep(TICK_SECONDS)
+
+
+def start_typefully_sync() -> None:
+    global _sync_task
+    if settings.typefully_api_key and settings.typefully_social_set_id and _sync_task is None:
+        _sync_task = asyncio.create_task(_sync_loop())
+
+
+async def stop_typefully_sync() -> None:
+    global _sync_task
+    if _sync_task is not None:
+        _sync_task.cancel()
+        try:
+            await _sync_task
+        except asyncio.CancelledError:
+            pass
+        _sync_task = None
@@ -1,50 +1,129 @@
+import asyncio
 import logging
 import time
+from datetime import timedelta
 
-import httpx
+from app.config import settings
+from app.services.http_clients import get_http_client
+from app.services.search_cache import get_cached, set_cached
 
 logger = logging.getLogger(__name__)
 
-_cache: dict[str, tuple[float, list[dict]]] = {}
-CACHE_TTL = 3600  # 1 hour
+HN_API = "https://hacker-news.firebaseio.com/v0"
+TOPIC_KEYWORDS = ["ai", "llm", "agent", "model", "gpt", "inference", "ml"]
+STORIES_SCANNED = 15
+FETCH_CONCURRENCY = 5
 
+# The feed is refreshed in the background once it is this old...
+REFRESH_AFTER = 45 * 60
+# ...and readers keep getting the last good copy for up to this long if refreshes fail
+MAX_STALENESS = timedelta(hours=24)
+_REFRESH_CHECK_INTERVAL = 5 * 60
 
-async def fetch_trending_topics() -> list[dict]:
-    """Fetch trending AI topics from HackerNews."""
-    cache_key = "hn_ai_topics"
-    now = time.time()
+_CACHE_NAMESPACE = "trending"
+_CACHE_KEY = "hn_ai_topics"
 
-    if cache_key in _cache:
-        cached_time, cached_data = _cache[cache_key]
-        if now - cached_time < CACHE_TTL:
-            return cached_data
+_refresh_task: asyncio.Task | None = None
+_background: set[asyncio.Task] = set()
 
-    try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            resp = await client.get(
-                "https://hacker-news.firebaseio.com/v0/topstories.json"
-            )
-            story_ids = resp.json()[:30]
-
-            topics = []
-            for story_id in story_ids[:15]:
-                resp = await client.get(
-                    f"https://hacker-news.firebaseio.com/v0/item/{story_id}.json"
-                )
-                story = resp.json()
-                if story and any(
-                    kw in (story.get("title", "") or "").lower()
-                    for kw in ["ai", "llm", "agent", "model", "gpt", "inference", "ml"]
-                ):
-                    topics.append({
-                        "title": story.get("title", ""),
-                        "url": story.get("url", ""),
-                        "score": story.get("score", 0),
-                    })
-
-            _cache[cache_key] = (now, topics)
-            return topics
 
+async def _fetch_story(client, story_id: int, semaphore: asyncio.Semaphore) -> dict | None:
+    async with semaphore:
+        try:
+            resp = await client.get(f"{HN_API}/item/{story_id}.json")
+            return resp.json()
+        except Exception as e:
+            logger.warning(f"Failed to fetch HackerNews item {story_id}: {e}")
+            return None
+
+
+async def _crawl_trending_topics() -> list[dict]:
+    """Fetch the top HackerNews stories and keep the AI-related ones, in rank order."""
+    client = get_http_client("hackernews")
+    resp = await client.get(f"{HN_API}/topstories.json")
+    story_ids = resp.json()[:STORIES_SCANNED]
+
+    semaphore = asyncio.Semaphore(FETCH_CONCURRENCY)
+    stories = await asyncio.gather(
+        *(_fetch_story(client, story_id, semaphore) for story_id in story_ids)
+    )
+
+    topics = []
+    for story in stories:
+        if story and any(
+            kw in (story.get("title", "") or "").lower() for kw in TOPIC_KEYWORDS
+        ):
+            topics.append({
+                "title": story.get("title", ""),
+                "url": story.get("url", ""),
+                "score": story.get("score", 0),
+            })
+    return topics
+
+
+async def refresh_trending_topics(force: bool = False) -> None:
+    """Recrawl the feed into the shared cache unless another worker did so recently."""
+    if not force:
+        cached = await get_cached(_CACHE_NAMESPACE, _CACHE_KEY)
+        if cached and time.time() - cached["fetched_at"] < REFRESH_AFTER:
+            return
+
+    try:
+        topics = await _crawl_trending_topics()
     except Exception as e:
         logger.error(f"Failed to fetch trending topics: {e}")
-        return []
+        return
+
+    await set_cached(
+        _CACHE_NAMESPACE,
+        _CACHE_KEY,
+        {"fetched_at": time.time(), "topics": topics},
+        ttl=MAX_STALENESS,
+    )
+
+
+async def fetch_trending_topics() -> list[dict]:
+    """Trending AI topics from HackerNews, served from the shared cache.
+
+    Never waits on HackerNews: an empty list is returned until the background refresh
+    has populated the cache.
+    """
+    cached = await get_cached(_CACHE_NAMESPACE, _CACHE_KEY)
+    if cached:
+        return cached["topics"]
+    if _refresh_task is None and settings.trending_topics_enabled:
+        # No refresh loop in this process (e.g. a script) — fill the cache for next time
+        _spawn(refresh_trending_topics(force=True))
+    return []
+
+
+def _spawn(coro) -> None:
+    task = asyncio.create_task(coro)
+    _background.add(task)
+    task.add_done_callback(_background.discard)
+
+
+async def _refresh_loop() -> None:
+    while True:
+        try:
+            await refresh_trending_topics()
+        except Exception as e:
+            logger.error(f"Trending topics refresh failed: {e}")
+        await asyncio.sleep(_REFRESH_CHECK_INTERVAL)
+
+
+def start_trending_refresh() -> None:
+    global _refresh_task
+    if settings.trending_topics_enabled and _refresh_task is None:
+        _refresh_task = asyncio.create_task(_refresh_loop())
+
+
+async def stop_trending_refresh() -> None:
+    global _refresh_task
+    if _refresh_task is not None:
+        _refresh_task.cancel()
+        try:
+            await _refresh_task
+        except asyncio.CancelledError:
+            pass
+        _refresh_task = None
@@ -0,0 +1,106 @@
+import asyncio
+import statistics
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+
+class LatencyTracker:
+    """Rolling window of call durations and outcomes for one provider."""
+
+    def __init__(self, window: int = 50):
+        self._durations: deque[float] = deque(maxlen=window)
+        self._outcomes: deque[bool] = deque(maxlen=window)
+        self.last_failure: float | None = None  # time.monotonic() of the latest failure
+
+    def record(self, seconds: float, ok: bool = True) -> None:
+        self._outcomes.append(ok)
+        if ok:
+            self._durations.append(seconds)
+        else:
+            self.last_failure = time.monotonic()
+
+    @property
+    def samples(self) -> int:
+        return len(self._durations)
+
+    def percentile(self, q: float, default: float) -> float:
+        if len(self._durations) < 5:
+            return default
+        return statistics.quantiles(self._durations, n=100, method="inclusive")[int(q) - 1]
+
+    @property
+    def error_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return self._outcomes.count(False) / len(self._outcomes)
+
+
+async def hedged_first(
+    calls: list[Callable[[], Awaitable[Any]]],
+    delays: list[float],
+    is_success: Callable[[Any], bool] = lambda _: True,
+) -> Any:
+    """Run `calls` as a hedged race and return the first successful result.
+
+    calls[0] starts immediately; calls[i] starts `delays[i]` seconds after the previous
+    one, or right away once everything already running has failed. The first result
+    accepted by `is_success` wins and the others are cancelled. A call fails by raising
+    or by returning something `is_success` rejects. If every call fails, the last
+    failure is returned (or re-raised).
+    """
+    running: set[asyncio.Task] = set()
+    next_index = 0
+    last_failure: Any = None
+    last_error: BaseException | None = None
+
+    def launch() -> None:
+        nonlocal next_index
+        running.add(asyncio.create_task(calls[next_index]()))
+        next_index += 1
+
+    launch()
+    try:
+        while running:
+            timeout = delays[next_index] if next_index < len(calls) else None
+            done, _ = await asyncio.wait(
+                running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+            if not done:
+                launch()
+                continue
+
+            for task in done:
+                running.discard(task)
+                if task.exception() is not None:
+                    last_error, last_failure = task.exception(), None
+                    continue
+                result = task.result()
+                if is_success(result):
+                    return result
+                last_error, last_failure = None, result
+
+            if not running and next_index < len(calls):
+                launch()
+    finally:
+        for task in running:
+            task.cancel()
+
+    if last_error is not None:
+        raise last_error
+    return last_failure
+
+
+async def timed(call: Callable[[], Awaitable[Any]], tracker: LatencyTracker, is_success=None):
+    """Await `call`, recording its duration and outcome on `tracker`."""
+    start = time.monotonic()
+    try:
+        result = await call()
+    except asyncio.CancelledError:
+        raise
+    except Exception:
+        tracker.record(time.monotonic() - start, ok=False)
+        raise
+    tracker.record(time.monotonic() - start, ok=is_success(result) if is_success else True)
+    return result
@@ -0,0 +1,121 @@
+import hashlib
+import os
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from fastapi import Request
+from fastapi.responses import FileResponse, Response
+
+# Uploaded and generated files are UUID-named and never rewritten, so clients may cache forever
+CACHE_MAX_AGE = 31536000
+CACHE_CONTROL = f"public, max-age={CACHE_MAX_AGE}, immutable"
+_MAX_ENTRIES = 2048
+
+MEDIA_TYPES = {
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".gif": "image/gif",
+    ".webp": "image/webp",
+    ".pdf": "application/pdf",
+}
+
+
+@dataclass(frozen=True)
+class CachedFile:
+    path: str
+    stat: os.stat_result
+    media_type: str
+    etag: str
+
+
+# (path, root, media_type) -> entry, so a lookup with another root is checked against it
+_entries: OrderedDict[tuple[str, str | None, str | None], CachedFile] = OrderedDict()
+
+
+def media_type_for(filename: str) -> str:
+    return MEDIA_TYPES.get(os.path.splitext(filename)[1].lower(), "application/octet-stream")
+
+
+def _same_file(a: os.stat_result, b: os.stat_result) -> bool:
+    return (a.st_size, a.st_mtime_ns, a.st_ino) == (b.st_size, b.st_mtime_ns, b.st_ino)
+
+
+def lookup_file(
+    path: str, media_type: str | None = None, root: str | None = None
+) -> CachedFile | None:
+    """Resolve and stat a file, remembering its resolved path and headers.
+
+    Returns None if the file doesn't exist. If `root` is given, raises PermissionError
+    when the resolved path escapes it. Repeat lookups skip realpath and the root check but
+    still stat the file, so one deleted or replaced elsewhere (e.g. by another worker)
+    isn't served from a stale entry.
+    """
+    key = (path, root, media_type)
+    entry = _entries.get(key)
+    if entry is not None:
+        resolved = entry.path
+    else:
+        resolved = os.path.realpath(path)
+        if root is not None and not resolved.startswith(root + os.sep):
+            raise PermissionError(path)
+
+    try:
+        st = os.stat(resolved)
+    except (FileNotFoundError, NotADirectoryError):
+        _entries.pop(key, None)
+        return None
+
+    if entry is not None and _same_file(st, entry.stat):
+        _entries.move_to_end(key)
+        return entry
+
+    digest = hashlib.md5(
+        f"{os.path.basename(path)}:{st.st_size}:{st.st_mtime_ns}".encode(),
+        usedforsecurity=False,
+    ).hexdigest()
+    entry = CachedFile(
+        path=resolved,
+        stat=st,
+        media_type=media_type or media_type_for(path),
+        etag=f'"{digest}"',
+    )
+    _entries[key] = entry
+    _entries.move_to_end(key)
+    if len(_entries) > _MAX_ENTRIES:
+        _entries.popitem(last=False)
+    return entry
+
+
+def evict_file(path: str) -> None:
+    """Drop a file's cached entries — call when a file is deleted or replaced."""
+    for key in [key for key in _entries if key[0] == path]:
+        del _entries[key]
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return etag in candidates
+
+
+def cached_file_response(
+    request: Request, entry: CachedFile, filename: str | None = None
+) -> Response:
+    """Serve a file with a strong ETag and immutable caching.
+
+    Answers `If-None-Match` with 304; byte ranges (and `If-Range`) are handled by FileResponse.
+    """
+    headers = {"Cache-Control": CACHE_CONTROL, "ETag": entry.etag}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, entry.etag):
+        return Response(status_code=304, headers=headers)
+
+    return FileResponse(
+        entry.path,
+        media_type=entry.media_type,
+        filename=filename,
+        stat_result=entry.stat,
+        headers=headers,
+    )
@@ -1,12 +1,22 @@
+import hashlib
+import json
+import logging
+import os
 import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache, partial
+from typing import NamedTuple
 
 import grapheme
 
+logger = logging.getLogger(__name__)
 
 LINKEDIN_CHAR_LIMIT = 3000
 LINKEDIN_HOOK_CUTOFF = 140
 RECOMMENDED_MIN = 1300
 RECOMMENDED_MAX = 2000
+_VALIDATION_CACHE_SIZE = 1024
 
 # Markdown patterns to strip — ordered by precedence
 _CODE_FENCE_RE = re.compile(r"```[\s\S]*?```")
@@ -21,6 +31,101 @@ _HEADER_RE = re.compile(r"^#{1,6}\s+", re.MULTILINE)
 _LIST_RE = re.compile(r"^[-*]\s+", re.MULTILINE)
 _NUMBERED_LIST_RE = re.compile(r"^\d+\.\s+", re.MULTILINE)
 _LINK_RE = re.compile(r"\[([^\]]+)\]\([^)]+\)")
+# Where an _ITALIC_UNDER_RE match can start and end
+_UNDER_OPENER_RE = re.compile(r"(?<!\w)_")
+_UNDER_CLOSER_RE = re.compile(r"_(?!\w)")
+
+
+def _strip_italic_underscores(text: str) -> str:
+    r"""`_ITALIC_UNDER_RE.sub(r"\1", text)` in linear time.
+
+    The regex rescans the rest of the line from every opening `_` that has no closer,
+    which is quadratic on text like "x _a x _a ...". Here both ends are found in one
+    pass: a match from an opener ends at the first closer at least two characters on,
+    provided no newline comes first.
+    """
+    closers = [m.start() for m in _UNDER_CLOSER_RE.finditer(text)]
+    parts: list[str] = []
+    pos = 0
+    nearest = 0  # index into closers; openers only move forward, so this does too
+    line_end = -1
+    for opener in _UNDER_OPENER_RE.finditer(text):
+        start = opener.start()
+        if start < pos:
+            continue
+        while nearest < len(closers) and closers[nearest] < start + 2:
+            nearest += 1
+        if nearest == len(closers):
+            break
+        if line_end < start:
+            line_end = text.find("\n", start)
+            if line_end == -1:
+                line_end = len(text)
+        end = closers[nearest]
+        if end < line_end:
+            parts += (text[pos:start], text[start + 1:end])
+            pos = end + 1
+    parts.append(text[pos:])
+    return "".join(parts)
+
+
+def _strip_links(text: str) -> str:
+    r"""`_LINK_RE.sub(r"\1", text)` in linear time.
+
+    The regex retries from every `[` and rescans to the next `]`, which is quadratic on
+    text with many unclosed brackets. A match from a `[` can only end at the first `]`
+    after it, so when it fails every `[` before that `]` fails the same way.
+    """
+    parts: list[str] = []
+    pos = 0
+    start = text.find("[")
+    while start != -1:
+        close = text.find("]", start + 1)
+        if close == -1:
+            break
+        if close > start + 1 and text.startswith("(", close + 1):
+            end = text.find(")", close + 2)
+            if end == -1:
+                break
+            if end > close + 2:
+                parts += (text[pos:start], text[start + 1:close])
+                pos = end + 1
+                start = text.find("[", pos)
+                continue
+        start = text.find("[", close + 1)
+    parts.append(text[pos:])
+    return "".join(parts)
+
+
+# (markers — any match contains at least one of them, strip function), in precedence
+# order
+_STRIP_RULES = [
+    # 1. Code fences (remove entirely — content inside is raw)
+    (("```",), partial(_CODE_FENCE_RE.sub, "")),
+    # 2. Inline code (keep inner text)
+    (("`",), partial(_INLINE_CODE_RE.sub, r"\1")),
+    # 3. Bold-italic (3 stars)
+    (("***",), partial(_BOLD_ITALIC_RE.sub, r"\1")),
+    # 4. Bold (2 stars)
+    (("**",), partial(_BOLD_RE.sub, r"\1")),
+    # 5. Bold underscore
+    (("__",), partial(_BOLD_UNDER_RE.sub, r"\1")),
+    # 6. Italic star
+    (("*",), partial(_ITALIC_STAR_RE.sub, r"\1")),
+    # 7. Italic underscore
+    (("_",), _strip_italic_underscores),
+    # 8. Strikethrough
+    (("~~",), partial(_STRIKETHROUGH_RE.sub, r"\1")),
+    # 9. Headers
+    (("#",), partial(_HEADER_RE.sub, "")),
+    # 10. Unordered lists
+    (("-", "*"), partial(_LIST_RE.sub, "")),
+    # 11. Numbered lists
+    ((".",), partial(_NUMBERED_LIST_RE.sub, "")),
+    # 12. Links
+    (("](",), _strip_links),
+]
+_STRIP_MARKERS = frozenset("`*_~#-.[")
 
 # Orphaned markers at word boundaries
 _ORPHAN_STARS_RE = re.compile(r"(?<!\S)\*{1,3}(?=\S)|(?<=\S)\*{1,3}(?!\S)")
@@ -41,53 +146,126 @@ _MARKDOWN_DETECT_RE = re.compile(
     re.MULTILINE,
 )
 
+# Grapheme break properties that can join a code point to its neighbours. Between two
+# code points with any other property the only non-break is CR LF, and the segmenter's
+# state after such a code point doesn't depend on what came before it.
+_JOINING_PROPERTIES = ("Prepend", "Extend", "SpacingMark", "ZWJ", "Regional_Indicator", "L", "V", "T")
+
+
+def _class_re(properties: dict, names: tuple[str, ...], loose: bool = False) -> str:
+    """Regex matching one code point with any of these grapheme break properties.
+
+    `loose` also matches every astral code point, which is cheaper to test for.
+    """
+    ranges = []
+    for name in names:
+        ranges.extend((c, c) for c in properties[name]["single_chars"])
+        ranges.extend((lo, hi) for lo, hi in properties[name]["ranges"])
+
+    def body(ranges):
+        return "".join(
+            f"\\U{lo:08x}" if lo == hi else f"\\U{lo:08x}-\\U{hi:08x}" for lo, hi in sorted(ranges)
+        )
+
+    bmp = body((lo, min(hi, 0xFFFF)) for lo, hi in ranges if lo <= 0xFFFF)
+    astral = body((max(lo, 0x10000), hi) for lo, hi in ranges if hi > 0xFFFF)
+    if loose:
+        return f"(?:[{bmp}]|[\\U00010000-\\U0010ffff])"
+    if not astral:
+        return f"[{bmp}]"
+    # Check astral ranges only once a code point is known to be astral
+    return f"(?:[{bmp}]|[\\U00010000-\\U0010ffff](?<=[{astral}]))"
+
+
+def _joining_patterns() -> tuple[re.Pattern, ...] | tuple[None, ...]:
+    """A quick test for text that may contain joining code points, a pattern for the
+    runs of them, together with a control or LF between two runs, and one for a single
+    Prepend code point.
+
+    grapheme.length's state after a control or LF that follows a Prepend differs from a
+    fresh start, so such runs are counted together. Built from the grapheme package's
+    own property table so the fast path tracks the Unicode version it uses. Astral
+    joiners are tested only after a cheap astral match, which keeps the common BMP class
+    a bitmap re checks in one step.
+    """
+    path = os.path.join(os.path.dirname(grapheme.__file__), "data", "grapheme_break_property.json")
+    try:
+        with open(path) as f:
+            properties = json.load(f)
+        maybe_joining = _class_re(properties, _JOINING_PROPERTIES, loose=True)
+        joining = _class_re(properties, _JOINING_PROPERTIES)
+        breaking = _class_re(properties, ("Control", "LF"))
+        prepend = _class_re(properties, ("Prepend",))
+    except (OSError, KeyError, TypeError, ValueError) as e:
+        logger.warning(f"Grapheme property table unavailable, counting without a fast path: {e}")
+        return None, None, None
+    return (
+        re.compile(maybe_joining),
+        re.compile(f"{joining}+(?:{breaking}{joining}+)*"),
+        re.compile(prepend),
+    )
+
+
+_MAYBE_JOINING_RE, _JOINING_SPANS_RE, _PREPEND_RE = _joining_patterns()
+
+
+@lru_cache(maxsize=4096)
+def _span_length(span: str) -> int:
+    # Spans are short and repeat a lot (the same emoji sequences)
+    return grapheme.length(span)
+
+
+# sha256 of text -> validation result, shared by the API and the agent nodes
+_validation_cache: OrderedDict[str, dict] = OrderedDict()
+_validation_lock = threading.Lock()
+
 
 def count_linkedin_chars(text: str) -> int:
-    """Count characters using grapheme clusters for accurate emoji/compound char counting."""
-    return grapheme.length(text)
+    """Count characters using grapheme clusters for accurate emoji/compound char counting.
+
+    Same result as grapheme.length, but its state machine only runs over the spans
+    around joining code points (combining marks, ZWJ sequences, flags, Hangul jamo).
+    Every other code point is its own cluster, bar CR LF.
+    """
+    if _JOINING_SPANS_RE is None:
+        return grapheme.length(text)
+    count = len(text) - text.count("\r\n")
+    if text.isascii() or not _MAYBE_JOINING_RE.search(text):
+        return count
+    for match in _JOINING_SPANS_RE.finditer(text):
+        # Include a neighbour either side: it may join the span, and its own state is
+        # independent of anything further out
+        span = text[max(match.start() - 1, 0):match.end() + 1]
+        count -= len(span) - _span_length(span)
+    return count
 
 
 def strip_markdown(text: str) -> str:
     """Remove markdown formatting, converting to plain text suitable for LinkedIn.
 
     Processes patterns in correct precedence order and loops up to 3 passes
-    to handle nested patterns.
+    to handle nested patterns. A pattern only runs while its markers are still
+    in the text, so plain prose costs a single scan, and every pattern runs in
+    linear time, so large pasted documents stay cheap.
     """
     result = text
 
     for _ in range(3):
+        if _STRIP_MARKERS.isdisjoint(result):
+            break
         prev = result
-        # 1. Code fences (remove entirely — content inside is raw)
-        result = _CODE_FENCE_RE.sub("", result)
-        # 2. Inline code (keep inner text)
-        result = _INLINE_CODE_RE.sub(r"\1", result)
-        # 3. Bold-italic (3 stars)
-        result = _BOLD_ITALIC_RE.sub(r"\1", result)
-        # 4. Bold (2 stars)
-        result = _BOLD_RE.sub(r"\1", result)
-        # 5. Bold underscore
-        result = _BOLD_UNDER_RE.sub(r"\1", result)
-        # 6. Italic star
-        result = _ITALIC_STAR_RE.sub(r"\1", result)
-        # 7. Italic underscore
-        result = _ITALIC_UNDER_RE.sub(r"\1", result)
-        # 8. Strikethrough
-        result = _STRIKETHROUGH_RE.sub(r"\1", result)
-        # 9. Headers
-        result = _HEADER_RE.sub("", result)
-        # 10. Unordered lists
-        result = _LIST_RE.sub("", result)
-        # 11. Numbered lists
-        result = _NUMBERED_LIST_RE.sub("", result)
-        # 12. Links
-        result = _LINK_RE.sub(r"\1", result)
+        for markers, strip in _STRIP_RULES:
+            if any(marker in result for marker in markers):
+                result = strip(result)
 
         if result == prev:
             break
 
     # Final cleanup: remove orphaned * and ` at word boundaries
-    result = _ORPHAN_STARS_RE.sub("", result)
-    result = _ORPHAN_BACKTICKS_RE.sub("", result)
+    if "*" in result:
+        result = _ORPHAN_STARS_RE.sub("", result)
+    if "`" in result:
+        result = _ORPHAN_BACKTICKS_RE.sub("", result)
 
     return result
 
@@ -102,14 +280,9 @@ def estimate_see_more_cutoff(text: str) -> str:
     return preview
 
 
-def validate_linkedin_post(text: str) -> dict:
-    """Validate text against LinkedIn formatting constraints.
-
-    Returns a dict with validation results and warnings.
-    """
-    char_count = count_linkedin_chars(text)
-    word_count = len(text.split())
-    hook_preview = estimate_see_more_cutoff(text)
+def _report(
+    char_count: int, hook_len: int, hook_preview: str, has_markdown: bool, word_count: int
+) -> dict:
     warnings: list[str] = []
 
     if char_count > LINKEDIN_CHAR_LIMIT:
@@ -118,14 +291,13 @@ def validate_linkedin_post(text: str) -> dict:
             f"({char_count} characters)"
         )
 
-    hook_len = count_linkedin_chars(hook_preview)
     if hook_len > LINKEDIN_HOOK_CUTOFF:
         warnings.append(
             f"Hook is {hook_len} characters — may be cut off before 'see more' "
             f"(recommended: under {LINKEDIN_HOOK_CUTOFF})"
         )
 
-    if _MARKDOWN_DETECT_RE.search(text):
+    if has_markdown:
         warnings.append(
             "Markdown formatting detected — LinkedIn renders plain text only"
         )
@@ -142,9 +314,187 @@ def validate_linkedin_post(text: str) -> dict:
         )
 
     return {
-        "valid": char_count <= LINKEDIN_CHAR_LIMIT and not _MARKDOWN_DETECT_RE.search(text),
+        "valid": char_count <= LINKEDIN_CHAR_LIMIT and not has_markdown,
         "char_count": char_count,
         "word_count": word_count,
         "hook_preview": hook_preview,
         "warnings": warnings,
     }
+
+
+def _validate(text: str) -> dict:
+    hook_preview = estimate_see_more_cutoff(text)
+    return _report(
+        count_linkedin_chars(text),
+        count_linkedin_chars(hook_preview),
+        hook_preview,
+        _MARKDOWN_DETECT_RE.search(text) is not None,
+        len(text.split()),
+    )
+
+
+def validate_linkedin_post(text: str) -> dict:
+    """Validate text against LinkedIn formatting constraints.
+
+    Returns a dict with validation results and warnings. Results are cached by a hash
+    of the text, so revalidating an unchanged post is a lookup.
+    """
+    key = hashlib.sha256(text.encode()).hexdigest()
+    with _validation_lock:
+        cached = _validation_cache.get(key)
+        if cached is not None:
+            _validation_cache.move_to_end(key)
+    if cached is None:
+        cached = _validate(text)
+        with _validation_lock:
+            _validation_cache[key] = cached
+            if len(_validation_cache) > _VALIDATION_CACHE_SIZE:
+                _validation_cache.popitem(last=False)
+    return {**cached, "warnings": list(cached["warnings"])}
+
+
+def validate_linkedin_posts(texts: list[str]) -> list[dict]:
+    """Validate many texts, in order. Repeats are only analysed once."""
+    return [validate_linkedin_post(text) for text in texts]
+
+
+class _LineStats(NamedTuple):
+    chars: int
+    words: int
+    # Markdown found with the line followed by a newline, and as the final line
+    markdown: bool
+    markdown_last: bool
+    ends_with_cr: bool
+    ends_with_prepend: bool
+
+
+def _ends_with_prepend(line: str) -> bool:
+    if _PREPEND_RE is None:
+        # Without the property table, assume it might and measure the boundary (CR LF is
+        # corrected for separately)
+        return bool(line) and not line.endswith("\r")
+    return _PREPEND_RE.fullmatch(line[-1:]) is not None
+
+
+def _line_stats(line: str) -> _LineStats:
+    return _LineStats(
+        chars=count_linkedin_chars(line),
+        words=len(line.split()),
+        markdown=_MARKDOWN_DETECT_RE.search(line + "\n") is not None,
+        markdown_last=_MARKDOWN_DETECT_RE.search(line) is not None,
+        ends_with_cr=line.endswith("\r"),
+        ends_with_prepend=_ends_with_prepend(line),
+    )
+
+
+def _join_correction(line: str, stats: _LineStats, next_line: str, next_stats: _LineStats) -> int:
+    """Clusters lost across the newline between two lines, versus counting them apart.
+
+    grapheme.length doesn't reset after a Prepend followed by a newline, so the newline
+    joins the marks that start the next line (count_linkedin_chars follows it there).
+    """
+    if not stats.ends_with_prepend:
+        return 0
+    return stats.chars + 1 + next_stats.chars - count_linkedin_chars(f"{line}\n{next_line}")
+
+
+class LinkedInDocument:
+    """A post being edited, validated edit by edit instead of from scratch.
+
+    The text is kept as lines with per-line stats and running totals. Grapheme clusters,
+    words and markdown matches never span a newline, bar CR LF and a Prepend at the end
+    of a line (both corrected for), so an edit only rescans the lines it touches and
+    their neighbours' boundaries. Offsets are in code points.
+    """
+
+    def __init__(self, text: str = ""):
+        self.reset(text)
+
+    def reset(self, text: str) -> None:
+        self._lines = text.split("\n")
+        self._stats = [_line_stats(line) for line in self._lines]
+        self._length = len(text)
+        self._chars = sum(s.chars for s in self._stats)
+        self._words = sum(s.words for s in self._stats)
+        self._markdown_lines = sum(s.markdown for s in self._stats)
+        self._cr_lines = sum(s.ends_with_cr for s in self._stats)
+        # Per newline, the clusters it joins across (see _join_correction)
+        self._joins = [self._join(i) for i in range(len(self._lines) - 1)]
+        self._joined = sum(self._joins)
+        self._hook_len = count_linkedin_chars(self._lines[0][:LINKEDIN_HOOK_CUTOFF])
+
+    def _join(self, index: int) -> int:
+        return _join_correction(
+            self._lines[index], self._stats[index], self._lines[index + 1], self._stats[index + 1]
+        )
+
+    def __len__(self) -> int:
+        return self._length
+
+    @property
+    def text(self) -> str:
+        return "\n".join(self._lines)
+
+    def _locate(self, offset: int, start_line: int = 0, line_start: int = 0) -> tuple[int, int, int]:
+        """Line index, column and line start offset of `offset`, searching from `start_line`."""
+        for index in range(start_line, len(self._lines)):
+            line_end = line_start + len(self._lines[index])
+            if offset <= line_end:
+                return index, offset - line_start, line_start
+            line_start = line_end + 1
+        raise ValueError(f"Offset {offset} is past the end of the document")
+
+    def apply_edit(self, offset: int, delete: int, insert: str) -> None:
+        """Replace `delete` code points at `offset` with `insert`."""
+        if offset < 0 or delete < 0 or offset + delete > self._length:
+            raise ValueError(
+                f"Edit ({offset}, {delete}) is outside the document (length {self._length})"
+            )
+
+        first, start_col, first_start = self._locate(offset)
+        last, end_col, _ = self._locate(offset + delete, first, first_start)
+        replacement = (
+            self._lines[first][:start_col] + insert + self._lines[last][end_col:]
+        ).split("\n")
+        stats = [_line_stats(line) for line in replacement]
+
+        for old in self._stats[first:last + 1]:
+            self._chars -= old.chars
+            self._words -= old.words
+            self._markdown_lines -= old.markdown
+            self._cr_lines -= old.ends_with_cr
+        for new in stats:
+            self._chars += new.chars
+            self._words += new.words
+            self._markdown_lines += new.markdown
+            self._cr_lines += new.ends_with_cr
+
+        old_boundaries = min(last + 1, len(self._lines) - 1)
+        self._lines[first:last + 1] = replacement
+        self._stats[first:last + 1] = stats
+
+        # Newlines on either side of the replaced lines and within them
+        lo = max(first - 1, 0)
+        joins = [
+            self._join(i) for i in range(lo, min(first + len(replacement), len(self._lines) - 1))
+        ]
+        self._joined += sum(joins) - sum(self._joins[lo:old_boundaries])
+        self._joins[lo:old_boundaries] = joins
+        self._length += len(insert) - delete
+        if first == 0:
+            self._hook_len = count_linkedin_chars(self._lines[0][:LINKEDIN_HOOK_CUTOFF])
+
+    def validate(self) -> dict:
+        """Same result as validate_linkedin_post on the current text."""
+        last = self._stats[-1]
+        separators = len(self._lines) - 1
+        # A CR before a separator forms one cluster with it
+        crlf = self._cr_lines - last.ends_with_cr
+        has_markdown = self._markdown_lines - last.markdown > 0 or last.markdown_last
+        return _report(
+            self._chars + separators - crlf - self._joined,
+            self._hook_len,
+            self._lines[0][:LINKEDIN_HOOK_CUTOFF],
+            has_markdown,
+            self._words,
+        )
@@ -0,0 +1,16 @@
+import threading
+from collections import defaultdict
+
+# Process-local counters, exposed at GET /api/metrics
+_counters: defaultdict[str, float] = defaultdict(float)
+_lock = threading.Lock()
+
+
+def incr(name: str, amount: float = 1) -> None:
+    with _lock:
+        _counters[name] += amount
+
+
+def snapshot() -> dict[str, float]:
+    with _lock:
+        return dict(sorted(_counters.items()))
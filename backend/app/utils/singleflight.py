@@ -0,0 +1,49 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from app.utils import metrics
+
+
+class _Flight:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key into one in-flight call.
+
+    Callers that arrive while a call is running await its result instead of starting
+    their own. Nothing is kept once the call finishes, so there is no staleness: the next
+    caller starts a fresh call. The call is cancelled only when every waiter has gone.
+    """
+
+    def __init__(self, name: str):
+        self._name = name
+        self._flights: dict[str, _Flight] = {}
+
+    def _land(self, key: str, flight: _Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    async def do(self, key: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(call()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _: self._land(key, flight))
+        else:
+            metrics.incr(f"singleflight.{self._name}.shared")
+
+        flight.waiters += 1
+        try:
+            # Shielded so one waiter being cancelled doesn't cancel the call for the rest
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if not flight.waiters and not flight.task.done():
+                flight.task.cancel()
+                # Forget it now, not when it finishes unwinding, so a caller arriving in
+                # between starts a fresh call instead of joining a cancelled one
+                self._land(key, flight)
@@ -0,0 +1,92 @@
+"""Compare the local claim extractor against the LLM one on past drafts.
+
+For each recent proofread draft, both extractors run on the same text. Recall is
+the share of LLM-extracted claims that some locally extracted sentence covers (at least
+60% of the claim's content words appear in it). Also reports per-draft latency.
+
+    python benchmark_claims.py [number_of_drafts]
+"""
+import asyncio
+import statistics
+import sys
+import time
+
+from sqlalchemy import select
+
+from app.db.session import async_session
+from app.models.post import Draft, Post
+from app.services.claim_extractor import extract_claims
+from app.services.llm import llm_completion
+from app.services.search_cache import normalize_query
+from app.services.tavily_search import CLAIM_EXTRACTION_PROMPT
+
+COVERAGE_THRESHOLD = 0.6
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the their "
+    "this to was were will with".split()
+)
+
+
+def _content_words(text: str) -> set[str]:
+    return {w for w in normalize_query(text).split() if w not in _STOPWORDS}
+
+
+def _covered(claim: str, sentences: list[str]) -> bool:
+    words = _content_words(claim)
+    if not words:
+        return True
+    return any(
+        len(words & _content_words(sentence)) / len(words) >= COVERAGE_THRESHOLD
+        for sentence in sentences
+    )
+
+
+async def _load_drafts(limit: int) -> list[tuple[str, str]]:
+    async with async_session() as session:
+        result = await session.execute(
+            select(Draft.content, Post.content_pillar)
+            .join(Post, Draft.post_id == Post.id)
+            .where(Draft.stage == "proofread")
+            .order_by(Draft.created_at.desc())
+            .limit(limit)
+        )
+        return [(content, getattr(pillar, "value", pillar)) for content, pillar in result.all()]
+
+
+async def benchmark(limit: int = 25) -> None:
+    drafts = await _load_drafts(limit)
+    if not drafts:
+        print("No proofread drafts found.")
+        return
+
+    recalls, local_ms, llm_ms = [], [], []
+    empty_local = 0
+    for content, pillar in drafts:
+        start = time.perf_counter()
+        local_claims = extract_claims(content)
+        local_ms.append((time.perf_counter() - start) * 1000)
+        empty_local += not local_claims
+
+        start = time.perf_counter()
+        claims_text = await llm_completion(
+            CLAIM_EXTRACTION_PROMPT.format(draft_content=content, content_pillar=pillar),
+            task="claim_extraction",
+        )
+        llm_ms.append((time.perf_counter() - start) * 1000)
+        llm_claims = [c.strip() for c in claims_text.strip().split("\n") if c.strip()][:4]
+
+        if llm_claims:
+            recalls.append(
+                sum(_covered(claim, local_claims) for claim in llm_claims) / len(llm_claims)
+            )
+
+    print(f"Drafts:               {len(drafts)}")
+    if recalls:
+        print(f"Recall vs LLM:        {statistics.mean(recalls):.0%}")
+    print(f"Local found nothing:  {empty_local}")
+    print(f"Local latency (p50):  {statistics.median(local_ms):.2f} ms")
+    print(f"LLM latency (p50):    {statistics.median(llm_ms):.0f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 25))
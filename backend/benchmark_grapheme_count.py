@@ -0,0 +1,86 @@
+"""Time count_linkedin_chars against grapheme.length on past posts and synthetic text.
+
+Runs both over recent drafts and final posts plus generated ASCII, accented and
+emoji-heavy posts, checks they agree on every one, and reports per-call latency.
+
+    python benchmark_grapheme_count.py [number_of_texts]
+"""
+import asyncio
+import random
+import statistics
+import sys
+import time
+
+import grapheme
+from sqlalchemy import select
+
+from app.db.session import async_session
+from app.models.post import Draft, Post
+from app.utils.linkedin import count_linkedin_chars
+
+REPEATS = 20
+_WORDS = ["word", "shipping", "agents", "AI", "—", "café", "naïve"]
+_EMOJI = ["🚀", "👍🏽", "❤️", "🧑‍💻", "🇺🇸", "👨‍👩‍👧‍👦"]
+
+
+def _synthetic_post(rng: random.Random, words: list[str]) -> str:
+    """Ten paragraphs of 45 words, about the size of a long LinkedIn post."""
+    return "\n\n".join(" ".join(rng.choice(words) for _ in range(45)) for _ in range(10))
+
+
+def _synthetic_texts() -> dict[str, str]:
+    rng = random.Random(1)
+    return {
+        "ASCII prose": _synthetic_post(rng, _WORDS[:4]),
+        "accented/BMP prose": _synthetic_post(rng, _WORDS),
+        "emoji-heavy": _synthetic_post(rng, _WORDS + _EMOJI),
+    }
+
+
+async def _load_texts(limit: int) -> list[str]:
+    async with async_session() as session:
+        drafts = await session.execute(
+            select(Draft.content).order_by(Draft.created_at.desc()).limit(limit)
+        )
+        posts = await session.execute(
+            select(Post.final_content).where(Post.final_content.is_not(None))
+            .order_by(Post.created_at.desc())
+            .limit(limit)
+        )
+        return [t for t in (*drafts.scalars().all(), *posts.scalars().all()) if t]
+
+
+def _time_us(count, text: str) -> float:
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        count(text)
+    return (time.perf_counter() - start) * 1e6 / REPEATS
+
+
+async def benchmark(limit: int = 3000) -> None:
+    for label, text in _synthetic_texts().items():
+        assert count_linkedin_chars(text) == grapheme.length(text), label
+        legacy, current = _time_us(grapheme.length, text), _time_us(count_linkedin_chars, text)
+        print(
+            f"{label:20} {len(text):5} cp: {legacy:7.0f} us -> {current:6.1f} us "
+            f"({legacy / current:.0f}x)"
+        )
+
+    texts = await _load_texts(limit)
+    if not texts:
+        print("No posts found.")
+        return
+
+    mismatches = sum(count_linkedin_chars(t) != grapheme.length(t) for t in texts)
+    legacy_us = [_time_us(grapheme.length, t) for t in texts]
+    current_us = [_time_us(count_linkedin_chars, t) for t in texts]
+
+    print(f"Texts:                {len(texts)} ({sum(map(len, texts)):,} chars)")
+    print(f"Mismatches:           {mismatches}")
+    for label, times in (("grapheme", legacy_us), ("Current ", current_us)):
+        p50, total_ms = statistics.median(times), sum(times) / 1000
+        print(f"{label} p50 / total: {p50:.1f} us / {total_ms:.0f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 3000))
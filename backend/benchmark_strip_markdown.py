@@ -0,0 +1,103 @@
+"""Time strip_markdown against the original multi-pass implementation on past posts.
+
+Runs both over recent drafts, final posts and uploaded source documents (the large
+pasted text), checks they agree on every one, and reports per-call latency.
+
+    python benchmark_strip_markdown.py [number_of_texts]
+"""
+import asyncio
+import statistics
+import sys
+import time
+
+from sqlalchemy import select
+
+from app.db.session import async_session
+from app.models.post import Draft, Post
+from app.utils.linkedin import (
+    _BOLD_ITALIC_RE,
+    _BOLD_RE,
+    _BOLD_UNDER_RE,
+    _CODE_FENCE_RE,
+    _HEADER_RE,
+    _INLINE_CODE_RE,
+    _ITALIC_STAR_RE,
+    _ITALIC_UNDER_RE,
+    _LINK_RE,
+    _LIST_RE,
+    _NUMBERED_LIST_RE,
+    _ORPHAN_BACKTICKS_RE,
+    _ORPHAN_STARS_RE,
+    _STRIKETHROUGH_RE,
+    strip_markdown,
+)
+
+REPEATS = 5
+
+
+def legacy_strip_markdown(text: str) -> str:
+    """strip_markdown as it was before marker gating: every pattern on every pass."""
+    result = text
+    for _ in range(3):
+        prev = result
+        result = _CODE_FENCE_RE.sub("", result)
+        result = _INLINE_CODE_RE.sub(r"\1", result)
+        result = _BOLD_ITALIC_RE.sub(r"\1", result)
+        result = _BOLD_RE.sub(r"\1", result)
+        result = _BOLD_UNDER_RE.sub(r"\1", result)
+        result = _ITALIC_STAR_RE.sub(r"\1", result)
+        result = _ITALIC_UNDER_RE.sub(r"\1", result)
+        result = _STRIKETHROUGH_RE.sub(r"\1", result)
+        result = _HEADER_RE.sub("", result)
+        result = _LIST_RE.sub("", result)
+        result = _NUMBERED_LIST_RE.sub("", result)
+        result = _LINK_RE.sub(r"\1", result)
+        if result == prev:
+            break
+    result = _ORPHAN_STARS_RE.sub("", result)
+    result = _ORPHAN_BACKTICKS_RE.sub("", result)
+    return result
+
+
+async def _load_texts(limit: int) -> list[str]:
+    async with async_session() as session:
+        drafts = await session.execute(
+            select(Draft.content).order_by(Draft.created_at.desc()).limit(limit)
+        )
+        posts = await session.execute(
+            select(Post.final_content, Post.uploaded_file_text)
+            .order_by(Post.created_at.desc())
+            .limit(limit)
+        )
+        texts = list(drafts.scalars().all())
+        for final_content, uploaded in posts.all():
+            texts += [t for t in (final_content, uploaded) if t]
+        return texts
+
+
+def _time_ms(strip, text: str) -> float:
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        strip(text)
+    return (time.perf_counter() - start) * 1000 / REPEATS
+
+
+async def benchmark(limit: int = 3000) -> None:
+    texts = await _load_texts(limit)
+    if not texts:
+        print("No posts found.")
+        return
+
+    mismatches = sum(strip_markdown(t) != legacy_strip_markdown(t) for t in texts)
+    legacy_ms = [_time_ms(legacy_strip_markdown, t) for t in texts]
+    current_ms = [_time_ms(strip_markdown, t) for t in texts]
+
+    print(f"Texts:                {len(texts)} ({sum(map(len, texts)):,} chars)")
+    print(f"Mismatches:           {mismatches}")
+    print(f"Legacy   p50 / total: {statistics.median(legacy_ms):.3f} / {sum(legacy_ms):.0f} ms")
+    print(f"Current  p50 / total: {statistics.median(current_ms):.3f} / {sum(current_ms):.0f} ms")
+    print(f"Largest text:         {max(map(len, texts)):,} chars")
+
+
+if __name__ == "__main__":
+    asyncio.run(benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 3000))
@@ -0,0 +1,76 @@
+import json
+import os
+import random
+
+import grapheme
+import pytest
+
+from app.utils.linkedin import count_linkedin_chars
+
+CORPUS = [
+    "",
+    "Plain ASCII prose.",
+    "café naïve — “quoted” 中文",
+    "👨‍👩‍👧‍👦 family",
+    "🧑‍💻 and 👩🏻‍❤️‍💋‍👨🏼",
+    "👍🏽 ✌🏿 👋🏻👋🏼👋🏽",
+    "❤️ ☺︎ 🏳️‍🌈 🏴‍☠️",
+    "🇺🇸🇬🇧🇫 lone 🇺",
+    "#️⃣ 1️⃣ *️⃣",
+    "🏴󠁧󠁢󠁳󠁣󠁴󠁿 tag sequence",
+    "a\r\n\r\nb\n\rc\r",
+    "\u0600\n\u094d🏻",
+    "\u0600abc \u0600\r\n",
+    "é́ क्षत्रिय 각각 각",
+    "\u200d\u200d lone joiners \u200d",
+]
+
+
+def _property_pools() -> dict[str, list[str]]:
+    """Sample code points per grapheme break property, from grapheme's own table."""
+    data = os.path.join(os.path.dirname(grapheme.__file__), "data")
+    with open(os.path.join(data, "grapheme_break_property.json")) as f:
+        properties = json.load(f)
+    rng = random.Random(0)
+    pools = {}
+    for name in sorted(properties):
+        code_points = list(properties[name]["single_chars"])
+        for lo, hi in properties[name]["ranges"]:
+            code_points += rng.sample(range(lo, hi + 1), min(50, hi - lo + 1))
+        if code_points:
+            pools[name] = [chr(c) for c in code_points]
+    pools["Other"] = list("abcXYZ 1.,éñ中文ü—“”") + ["🚀", "❤"]
+    pools["CRLF"] = ["\r\n"]
+    return pools
+
+
+# Whole emoji sequences and their pieces, glued together at random
+_EMOJI_PIECES = [
+    "👨", "👩", "👧", "🧑", "💻", "❤", "🏳", "🌈", "🏴", "☠", "#", "1", "🇺", "🇸", "🇬",
+    "\u200d", "\ufe0f", "\u20e3", "🏻", "🏽", "🏿", "\U000e0067", "\U000e007f",
+    "\r", "\n", "\u0600", "\u094d", "a", " ", "👨‍👩‍👧‍👦", "🇺🇸", "👍🏽",
+]
+
+
+@pytest.mark.parametrize("text", CORPUS)
+def test_matches_grapheme_on_corpus(text):
+    for variant in (text, f"x{text}y", text * 3, f"\n{text}\r\n"):
+        assert count_linkedin_chars(variant) == grapheme.length(variant), repr(variant)
+
+
+def test_matches_grapheme_on_random_break_properties():
+    pools = _property_pools()
+    names = list(pools)
+    rng = random.Random(11)
+    for _ in range(50_000):
+        text = "".join(
+            rng.choice(pools[rng.choice(names)]) for _ in range(rng.randint(0, 12))
+        )
+        assert count_linkedin_chars(text) == grapheme.length(text), repr(text)
+
+
+def test_matches_grapheme_on_random_emoji_sequences():
+    rng = random.Random(46)
+    for _ in range(20_000):
+        text = "".join(rng.choice(_EMOJI_PIECES) for _ in range(rng.randint(0, 16)))
+        assert count_linkedin_chars(text) == grapheme.length(text), repr(text)
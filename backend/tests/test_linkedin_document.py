@@ -0,0 +1,52 @@
+import random
+
+import pytest
+
+from app.utils import linkedin
+from app.utils.linkedin import LinkedInDocument, validate_linkedin_post
+
+# Newlines, CR, Prepend/Extend/SpacingMark, Hangul jamo, emoji and markdown markers, so
+# edits land on every line-boundary case the document corrects for
+_ALPHABET = list("ab *_`\n\r.#-[]()~1 ") + [
+    "\u0600", "\u0d4e", "\u094d", "\u0903", "\u0301", "\u200d", "\x01", "\u1100", "\u1161",
+    "각", "🏻", "👨‍👩", "🇺🇸", "\r\n", "```", "**", "\n\n", "](", "1. ",
+]
+
+
+def _random_text(rng: random.Random, max_len: int) -> str:
+    return "".join(rng.choice(_ALPHABET) for _ in range(rng.randint(0, max_len)))
+
+
+def _check_random_edits(seed: int, documents: int) -> None:
+    rng = random.Random(seed)
+    for _ in range(documents):
+        text = _random_text(rng, 60)
+        doc = LinkedInDocument(text)
+        for _ in range(30):
+            offset = rng.randint(0, len(text))
+            delete = rng.randint(0, min(6, len(text) - offset))
+            insert = _random_text(rng, 4)
+            text = text[:offset] + insert + text[offset + delete:]
+            doc.apply_edit(offset, delete, insert)
+            assert doc.text == text
+            assert doc.validate() == validate_linkedin_post(text), repr(text)
+
+
+def test_random_edits_match_full_validation():
+    _check_random_edits(seed=5, documents=1000)
+
+
+def test_random_edits_match_without_grapheme_table(monkeypatch):
+    # The fallback when grapheme's property table can't be read
+    for name in ("_MAYBE_JOINING_RE", "_JOINING_SPANS_RE", "_PREPEND_RE"):
+        monkeypatch.setattr(linkedin, name, None)
+    monkeypatch.setattr(linkedin, "_validation_cache", linkedin.OrderedDict())
+    _check_random_edits(seed=6, documents=300)
+
+
+@pytest.mark.parametrize("offset, delete", [(-1, 0), (0, 5), (4, 1)])
+def test_out_of_range_edit_is_rejected(offset, delete):
+    doc = LinkedInDocument("abcd")
+    with pytest.raises(ValueError):
+        doc.apply_edit(offset, delete, "x")
+    assert doc.text == "abcd"
@@ -0,0 +1,69 @@
+import random
+import time
+
+import pytest
+
+from app.utils.linkedin import (
+    _ITALIC_UNDER_RE,
+    _LINK_RE,
+    _strip_italic_underscores,
+    _strip_links,
+    strip_markdown,
+)
+from benchmark_strip_markdown import legacy_strip_markdown
+
+# Markdown-heavy alphabet, so random strings hit the patterns and their edge cases
+_ALPHABET = list("`*_~#-.[]()!\n\r 1a") + ["**", "__", "~~", "```", "](", "1. ", "- ", "é", "名"]
+
+CORPUS = [
+    "",
+    "Plain prose with nothing to strip.",
+    "# Header\n\n**Bold** and *italic* and ***both***, __under__ and _under_.",
+    "- item one\n* item two\n1. first\n2. second",
+    "Read [the docs](https://example.com) and [more](x) [unclosed](",
+    "```python\nprint('hi')\n```\nthen `inline` code",
+    "snake_case_names stay, _this_ goes, ~~struck~~ too",
+    "**nested *italic* inside** and *dangling and trailing*",
+    "[a [b](c) d](e) [](x) [x]() [y](\n) []",
+    "_a\n_ x _a_b_ c__d_ _é_ _名_",
+]
+
+
+def _random_text(rng: random.Random) -> str:
+    return "".join(rng.choice(_ALPHABET) for _ in range(rng.randint(0, 60)))
+
+
+@pytest.mark.parametrize("text", CORPUS)
+def test_matches_legacy_on_corpus(text):
+    assert strip_markdown(text) == legacy_strip_markdown(text)
+
+
+def test_matches_legacy_on_random_text():
+    rng = random.Random(43)
+    for _ in range(20_000):
+        text = _random_text(rng)
+        assert strip_markdown(text) == legacy_strip_markdown(text), repr(text)
+
+
+def test_linear_rules_match_their_regexes():
+    rng = random.Random(7)
+    for _ in range(20_000):
+        text = _random_text(rng)
+        assert _strip_links(text) == _LINK_RE.sub(r"\1", text), repr(text)
+        assert _strip_italic_underscores(text) == _ITALIC_UNDER_RE.sub(r"\1", text), repr(text)
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "a](b " + "[" * 20_000,
+        "x _a" * 20_000,
+        "[x]" * 20_000 + "(",
+        "*a" * 20_001,
+        "`a" * 20_001,
+    ],
+)
+def test_pathological_input_is_linear(text):
+    start = time.perf_counter()
+    strip_markdown(text)
+    assert time.perf_counter() - start < 0.5
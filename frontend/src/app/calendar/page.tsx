@@ -1,15 +1,21 @@
 "use client";
 
 import { useState } from "react";
+import { useQueryClient } from "@tanstack/react-query";
 import { Card } from "@/components/ui/Card";
 import { Button } from "@/components/ui/Button";
 import { Spinner } from "@/components/ui/Spinner";
 import { CalendarGrid } from "@/components/calendar/CalendarGrid";
 import { ScheduleModal } from "@/components/calendar/ScheduleModal";
 import { useCalendar, useCreateCalendarEntry, useUpdateCalendarEntry, useDeleteCalendarEntry } from "@/hooks/useCalendar";
+import { usePostValidations } from "@/hooks/usePosts";
 import { useToast } from "@/components/ui/Toast";
+import { scheduleManyOnTypefully } from "@/lib/api";
 import type { CalendarEntry } from "@/lib/types";
 
+// Time of day calendar posts are published at when scheduled in bulk (local time)
+const DEFAULT_PUBLISH_TIME = "09:00";
+
 const MONTH_NAMES = ["January", "February", "March", "April", "May", "June", "July", "August", "September", "October", "November", "December"];
 
 export default function CalendarPage() {
@@ -21,10 +27,15 @@ export default function CalendarPage() {
   const [selectedDate, setSelectedDate] = useState<string>("");
 
   const { data: entries, isLoading } = useCalendar(month, year);
+  const { data: validations } = usePostValidations(
+    (entries || []).flatMap((e) => (e.post_id ? [e.post_id] : [])),
+  );
   const createEntry = useCreateCalendarEntry();
   const updateEntry = useUpdateCalendarEntry();
   const deleteEntry = useDeleteCalendarEntry();
   const { toast } = useToast();
+  const [bulkScheduling, setBulkScheduling] = useState(false);
+  const queryClient = useQueryClient();
 
   const prevMonth = () => {
     if (month === 1) { setMonth(12); setYear(year - 1); }
@@ -79,6 +90,33 @@ export default function CalendarPage() {
     }
   };
 
+  // Entries with a linked post that Typefully doesn't already have queued or published
+  const schedulable = (entries || []).filter(
+    (e: CalendarEntry) => e.post_id && e.status !== "scheduled" && e.status !== "published",
+  );
+
+  const handleScheduleMonth = async () => {
+    setBulkScheduling(true);
+    try {
+      const { scheduled, failed } = await scheduleManyOnTypefully(
+        schedulable.map((e: CalendarEntry) => ({
+          post_id: e.post_id as string,
+          publish_at: new Date(`${e.scheduled_date}T${DEFAULT_PUBLISH_TIME}`).toISOString(),
+        })),
+      );
+      toast(
+        failed ? `Scheduled ${scheduled} posts, ${failed} failed` : `Scheduled ${scheduled} posts`,
+        failed ? "error" : "success",
+      );
+      // Scheduling moves entries to "scheduled"
+      queryClient.invalidateQueries({ queryKey: ["calendar"] });
+    } catch {
+      toast("Failed to schedule posts", "error");
+    } finally {
+      setBulkScheduling(false);
+    }
+  };
+
   return (
     <div className="space-y-6">
       <div className="flex items-center justify-between">
@@ -87,9 +125,19 @@ export default function CalendarPage() {
           <h3 className="text-lg font-semibold">{MONTH_NAMES[month - 1]} {year}</h3>
           <Button variant="ghost" size="sm" onClick={nextMonth}>&rarr;</Button>
         </div>
-        <Button size="sm" onClick={() => { setSelectedEntry(null); setSelectedDate(""); setModalOpen(true); }}>
-          Add Entry
-        </Button>
+        <div className="flex items-center gap-2">
+          <Button
+            variant="secondary"
+            size="sm"
+            onClick={handleScheduleMonth}
+            disabled={bulkScheduling || schedulable.length === 0}
+          >
+            {bulkScheduling ? "Scheduling..." : `Schedule month on Typefully (${schedulable.length})`}
+          </Button>
+          <Button size="sm" onClick={() => { setSelectedEntry(null); setSelectedDate(""); setModalOpen(true); }}>
+            Add Entry
+          </Button>
+        </div>
       </div>
 
       {isLoading ? (
@@ -99,6 +147,7 @@ export default function CalendarPage() {
           year={year}
           month={month}
           entries={entries || []}
+          validations={validations}
           onDayClick={handleDayClick}
           onEntryClick={handleEntryClick}
         />
@@ -21,6 +21,7 @@ import { useQuery, useQueryClient } from "@tanstack/react-query";
 import {
   runAgent,
   resumeAgent,
+  cancelAgentRun,
   fetchPostMedia,
   fetchTypefullyProfile,
   deletePost,
@@ -92,12 +93,13 @@ export default function PostDetailPage({ params }: { params: Promise<{ id: strin
     .filter((e) => e.event === "node_complete")
     .map((e) => (e.data as Record<string, string>).node || (e.data as Record<string, string>).stage);
 
-  // Extract image URL from generate_image node completion
+  // Extract image URL from generate_image node completion, or the late image_ready event
   const generatedImageUrl = useMemo(() => {
-    const imageEvent = events.find(
+    const imageEvent = [...events].reverse().find(
       (e) =>
-        e.event === "node_complete" &&
-        (e.data as Record<string, string>).node === "generate_image" &&
+        (e.event === "image_ready" ||
+          (e.event === "node_complete" &&
+            (e.data as Record<string, string>).node === "generate_image")) &&
         (e.data as Record<string, string>).image_url,
     );
     if (imageEvent) {
@@ -129,6 +131,10 @@ export default function PostDetailPage({ params }: { params: Promise<{ id: strin
   useEffect(() => {
     if (events.length === 0) return;
     const lastEvent = events[events.length - 1];
+    if (lastEvent.event === "image_ready") {
+      queryClient.invalidateQueries({ queryKey: ["post-media", id] });
+      return;
+    }
     if (lastEvent.event !== "node_complete") return;
     const node = (lastEvent.data as Record<string, string>).node;
     if (node === "draft" || node === "optimize" || node === "proofread") {
@@ -160,7 +166,7 @@ export default function PostDetailPage({ params }: { params: Promise<{ id: strin
   const mediaImageUrl = useMemo(() => {
     const imageAsset = mediaAssets.find((a: MediaAsset) => a.content_type.startsWith("image/"));
     if (imageAsset) {
-      return `/api/uploads/file/${imageAsset.file_path.split("/").pop()}`;
+      return `/api/uploads/file/${imageAsset.file_path.split("/").pop()}?w=768`;
     }
     return undefined;
   }, [mediaAssets]);
@@ -186,11 +192,15 @@ export default function PostDetailPage({ params }: { params: Promise<{ id: strin
     }
   };
 
-  const handleRequestEdit = async (feedback: string) => {
+  const handleRequestEdit = async (feedback: string, regenerateImage: boolean) => {
     if (!post?.thread_id) return;
     setResuming(true);
     try {
-      await resumeAgent(post.thread_id, { status: "edit_requested", feedback });
+      await resumeAgent(post.thread_id, {
+        status: "edit_requested",
+        feedback,
+        regenerate_image: regenerateImage,
+      });
       toast("Edit requested, agent is revising...", "info");
       refetch();
     } catch {
@@ -229,6 +239,23 @@ export default function PostDetailPage({ params }: { params: Promise<{ id: strin
     }
   };
 
+  const [stopping, setStopping] = useState(false);
+
+  const handleStop = async () => {
+    if (!post?.thread_id) return;
+    setStopping(true);
+    try {
+      await cancelAgentRun(post.thread_id);
+      toast("Agent run stopped", "info");
+    } catch {
+      // Nothing was running any more; just stop listening
+    } finally {
+      setSseEnabled(false);
+      setStopping(false);
+      refetch();
+    }
+  };
+
   const [confirmDelete, setConfirmDelete] = useState(false);
 
   const handleDelete = async () => {
@@ -276,8 +303,9 @@ export default function PostDetailPage({ params }: { params: Promise<{ id: strin
     if (!post) return;
     setTypefullyLoading(true);
     try {
-      const result = await getTypefullyStatus(post.id);
+      const result = await getTypefullyStatus(post.id, true);
       setTypefullyStatus(result.status);
+      refetch();
     } catch {
       toast("Failed to fetch Typefully status", "error");
     } finally {
@@ -367,6 +395,17 @@ export default function PostDetailPage({ params }: { params: Promise<{ id: strin
             <Card>
               <AgentStreamLog events={events} />
             </Card>
+            {!isInterrupted && !isComplete && !sseError && (
+              <Button
+                size="sm"
+                variant="secondary"
+                onClick={handleStop}
+                loading={stopping}
+                className="w-full"
+              >
+                Stop Agent
+              </Button>
+            )}
           </>
         )}
 
@@ -505,7 +544,7 @@ export default function PostDetailPage({ params }: { params: Promise<{ id: strin
                 <div className="flex items-center gap-2">
                   <span className="text-xs text-gray-500">Typefully Draft</span>
                   <Badge className="bg-blue-100 text-blue-700">
-                    {typefullyStatus || "draft"}
+                    {typefullyStatus || post?.typefully_status || "draft"}
                   </Badge>
                 </div>
 
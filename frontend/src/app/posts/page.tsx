@@ -5,7 +5,7 @@ import { PostCard } from "@/components/posts/PostCard";
 import { Select } from "@/components/ui/Select";
 import { Input } from "@/components/ui/Input";
 import { Skeleton } from "@/components/ui/Skeleton";
-import { usePosts } from "@/hooks/usePosts";
+import { usePosts, usePostValidations } from "@/hooks/usePosts";
 import { CONTENT_PILLARS, POST_FORMATS, POST_STATUSES } from "@/lib/constants";
 
 export default function PostsPage() {
@@ -21,6 +21,9 @@ export default function PostsPage() {
   if (search) params.search = search;
 
   const { data: posts, isLoading } = usePosts(params);
+  const { data: validations } = usePostValidations(
+    (posts || []).filter((p) => p.final_content).map((p) => p.id),
+  );
 
   return (
     <div className="space-y-6">
@@ -50,7 +53,7 @@ export default function PostsPage() {
       ) : (
         <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-4">
           {posts.map((post) => (
-            <PostCard key={post.id} post={post} />
+            <PostCard key={post.id} post={post} validation={validations?.[post.id]} />
           ))}
         </div>
       )}
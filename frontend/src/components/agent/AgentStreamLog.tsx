@@ -75,6 +75,20 @@ export function AgentStreamLog({ events }: AgentStreamLogProps) {
             );
           }
 
+          if (evt.event === "image_ready") {
+            return (
+              <div key={i} className="flex items-start gap-2 text-sm py-0.5">
+                <span className="text-green-500 mt-0.5 flex-shrink-0">●</span>
+                <div className="min-w-0">
+                  <span className="font-medium text-gray-700">{label}</span>
+                  {description && (
+                    <span className="text-gray-500 ml-1.5">{description}</span>
+                  )}
+                </div>
+              </div>
+            );
+          }
+
           if (evt.event === "complete") {
             return (
               <div key={i} className="flex items-start gap-2 text-sm py-0.5">
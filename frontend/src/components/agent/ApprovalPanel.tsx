@@ -8,7 +8,7 @@ import { Badge } from "@/components/ui/Badge";
 
 interface ApprovalPanelProps {
   onApprove: () => void;
-  onRequestEdit: (feedback: string) => void;
+  onRequestEdit: (feedback: string, regenerateImage: boolean) => void;
   isLoading?: boolean;
   charCount?: number;
   warnings?: string[];
@@ -23,6 +23,7 @@ export function ApprovalPanel({
 }: ApprovalPanelProps) {
   const [feedback, setFeedback] = useState("");
   const [showFeedback, setShowFeedback] = useState(false);
+  const [regenerateImage, setRegenerateImage] = useState(false);
 
   const charColor =
     charCount !== undefined && charCount > 3000
@@ -66,10 +67,18 @@ export function ApprovalPanel({
             placeholder="e.g. Make the hook more provocative, shorten the third paragraph..."
             rows={4}
           />
+          <label className="flex items-center gap-2 text-sm text-amber-900">
+            <input
+              type="checkbox"
+              checked={regenerateImage}
+              onChange={(e) => setRegenerateImage(e.target.checked)}
+            />
+            Regenerate image (otherwise reused if the concept is unchanged)
+          </label>
           <div className="flex gap-2">
             <Button
               variant="primary"
-              onClick={() => onRequestEdit(feedback)}
+              onClick={() => onRequestEdit(feedback, regenerateImage)}
               disabled={!feedback.trim()}
               loading={isLoading}
             >
@@ -2,17 +2,18 @@
 
 import { useMemo } from "react";
 import { CalendarCell } from "./CalendarCell";
-import type { CalendarEntry } from "@/lib/types";
+import type { CalendarEntry, LinkedInValidation } from "@/lib/types";
 
 interface CalendarGridProps {
   year: number;
   month: number;
   entries: CalendarEntry[];
+  validations?: Record<string, LinkedInValidation>;
   onDayClick: (date: string) => void;
   onEntryClick: (entry: CalendarEntry) => void;
 }
 
-export function CalendarGrid({ year, month, entries, onDayClick, onEntryClick }: CalendarGridProps) {
+export function CalendarGrid({ year, month, entries, validations, onDayClick, onEntryClick }: CalendarGridProps) {
   const days = useMemo(() => {
     const firstDay = new Date(year, month - 1, 1);
     const lastDay = new Date(year, month, 0);
@@ -52,6 +53,7 @@ export function CalendarGrid({ year, month, entries, onDayClick, onEntryClick }:
             day={cell.day}
             date={cell.date}
             entries={cell.date ? entriesByDate[cell.date] || [] : []}
+            validations={validations}
             onClick={() => cell.date && onDayClick(cell.date)}
             onEntryClick={onEntryClick}
           />
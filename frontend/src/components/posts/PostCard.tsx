@@ -5,9 +5,9 @@ import { Card } from "@/components/ui/Card";
 import { Badge } from "@/components/ui/Badge";
 import { PILLAR_COLORS, STATUS_COLORS } from "@/lib/constants";
 import { formatRelative } from "@/utils/formatDate";
-import type { Post } from "@/lib/types";
+import type { LinkedInValidation, Post } from "@/lib/types";
 
-export function PostCard({ post }: { post: Post }) {
+export function PostCard({ post, validation }: { post: Post; validation?: LinkedInValidation }) {
   return (
     <Link href={`/posts/${post.id}`}>
       <Card className="hover:shadow-md transition-shadow cursor-pointer">
@@ -27,7 +27,17 @@ export function PostCard({ post }: { post: Post }) {
         </div>
         <div className="flex items-center justify-between text-xs text-gray-500">
           <span>{formatRelative(post.created_at)}</span>
-          {post.revision_count > 0 && <span>v{post.revision_count + 1}</span>}
+          <div className="flex items-center gap-2">
+            {validation && (
+              <span
+                className={validation.valid ? "text-gray-500" : "text-red-600 font-medium"}
+                title={validation.warnings.join("\n")}
+              >
+                {validation.char_count.toLocaleString()} chars
+              </span>
+            )}
+            {post.revision_count > 0 && <span>v{post.revision_count + 1}</span>}
+          </div>
         </div>
       </Card>
     </Link>
@@ -3,6 +3,7 @@
 import { useState, useEffect, useMemo } from "react";
 import { Textarea } from "@/components/ui/Textarea";
 import { Button } from "@/components/ui/Button";
+import { useLiveValidation } from "@/hooks/useLiveValidation";
 
 const LINKEDIN_CHAR_LIMIT = 3000;
 const MARKDOWN_RE =
@@ -22,8 +23,10 @@ export function PostEditor({ content, onSave, readOnly }: PostEditorProps) {
     setEditedContent(content);
   }, [content]);
 
-  const charCount = editedContent.length;
-  const wordCount = editedContent.trim().split(/\s+/).filter(Boolean).length;
+  // Exact grapheme counts and warnings from the server; local estimates until connected
+  const live = useLiveValidation(editedContent);
+  const charCount = live?.char_count ?? editedContent.length;
+  const wordCount = live?.word_count ?? editedContent.trim().split(/\s+/).filter(Boolean).length;
 
   const charColor =
     charCount > LINKEDIN_CHAR_LIMIT
@@ -64,7 +67,11 @@ export function PostEditor({ content, onSave, readOnly }: PostEditorProps) {
         </div>
       )}
 
-      {hasMarkdown && (
+      {live ? (
+        live.warnings.map((warning) => (
+          <p key={warning} className="text-xs text-amber-600">{warning}</p>
+        ))
+      ) : hasMarkdown && (
         <p className="text-xs text-amber-600">
           Markdown formatting detected — LinkedIn renders plain text only
         </p>
@@ -87,7 +87,7 @@ export function PostMedia({ postId }: PostMediaProps) {
             return (
               <div key={asset.id} className="relative group rounded-lg overflow-hidden border border-gray-200">
                 <img
-                  src={getFileUrl(`/api/uploads/file/${asset.file_path.split("/").pop()}`)}
+                  src={getFileUrl(`/api/uploads/file/${asset.file_path.split("/").pop()}?w=320`)}
                   alt={asset.filename}
                   className="w-full h-24 object-cover"
                 />
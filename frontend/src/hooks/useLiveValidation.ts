@@ -0,0 +1,100 @@
+"use client";
+
+import { useEffect, useRef, useState } from "react";
+import type { LinkedInValidation } from "@/lib/types";
+
+const API_URL = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000/api";
+const LIVE_URL = `${API_URL.replace(/^http/, "ws")}/typefully/validate/live`;
+const RECONNECT_DELAY = 3000;
+
+interface Edit {
+  offset: number;
+  delete: number;
+  insert: string;
+}
+
+// The single replacement turning `prev` into `next`. Works on code points, as the server does.
+function diff(prev: string[], next: string[]): Edit {
+  const max = Math.min(prev.length, next.length);
+  let start = 0;
+  while (start < max && prev[start] === next[start]) start++;
+  let end = 0;
+  while (end < max - start && prev[prev.length - 1 - end] === next[next.length - 1 - end]) end++;
+  return {
+    offset: start,
+    delete: prev.length - start - end,
+    insert: next.slice(start, next.length - end).join(""),
+  };
+}
+
+/**
+ * Server-side LinkedIn validation of `text`, kept current over a WebSocket by sending
+ * only what changed on each edit. Null until the first result arrives and while the
+ * socket is disconnected; it reconnects on its own.
+ */
+export function useLiveValidation(text: string): LinkedInValidation | null {
+  const [validation, setValidation] = useState<LinkedInValidation | null>(null);
+  const socketRef = useRef<WebSocket | null>(null);
+  // Text the server currently holds, as code points
+  const sentRef = useRef<string[] | null>(null);
+  const versionRef = useRef(0);
+  const shownRef = useRef(0);
+  const textRef = useRef(text);
+  textRef.current = text;
+
+  useEffect(() => {
+    let closed = false;
+    let retry: ReturnType<typeof setTimeout> | undefined;
+
+    const connect = () => {
+      const socket = new WebSocket(LIVE_URL);
+      socketRef.current = socket;
+
+      const reset = () => {
+        sentRef.current = Array.from(textRef.current);
+        socket.send(JSON.stringify({ type: "reset", text: textRef.current, version: ++versionRef.current }));
+      };
+
+      socket.onopen = reset;
+      socket.onmessage = (e) => {
+        const message = JSON.parse(e.data);
+        if (message.type === "error") {
+          // The server's copy has drifted — resend the whole text
+          reset();
+          return;
+        }
+        if (message.version > shownRef.current) {
+          shownRef.current = message.version;
+          setValidation(message);
+        }
+      };
+      socket.onclose = () => {
+        // The last result no longer tracks the text; reconnect and start over from a reset
+        sentRef.current = null;
+        socketRef.current = null;
+        setValidation(null);
+        if (!closed) retry = setTimeout(connect, RECONNECT_DELAY);
+      };
+    };
+
+    connect();
+    return () => {
+      closed = true;
+      clearTimeout(retry);
+      socketRef.current?.close();
+      socketRef.current = null;
+    };
+  }, []);
+
+  useEffect(() => {
+    const socket = socketRef.current;
+    if (!socket || socket.readyState !== WebSocket.OPEN || !sentRef.current) return;
+    const next = Array.from(text);
+    const edit = diff(sentRef.current, next);
+    if (edit.delete === 0 && !edit.insert) return;
+    sentRef.current = next;
+    socket.send(JSON.stringify({ type: "edit", ...edit, version: ++versionRef.current }));
+  }, [text]);
+
+  return validation;
+}
@@ -1,8 +1,8 @@
 "use client";
 
 import { useQuery, useMutation, useQueryClient } from "@tanstack/react-query";
-import { fetchPosts, fetchPost, createPost, updatePost, deletePost, fetchPostVersions } from "@/lib/api";
-import type { Post, PostWithDrafts, Draft } from "@/lib/types";
+import { fetchPosts, fetchPost, createPost, updatePost, deletePost, fetchPostVersions, validateLinkedInBatch } from "@/lib/api";
+import type { Post, PostWithDrafts, Draft, LinkedInValidation } from "@/lib/types";
 
 export function usePosts(params?: Record<string, string>) {
   return useQuery<Post[]>({
@@ -27,6 +27,15 @@ export function usePostVersions(id: string) {
   });
 }
 
+// LinkedIn validation for many posts' final content in one request, keyed by post id
+export function usePostValidations(postIds: string[]) {
+  return useQuery<Record<string, LinkedInValidation>>({
+    queryKey: ["post-validations", postIds],
+    queryFn: () => validateLinkedInBatch({ post_ids: postIds }).then((r) => r.posts),
+    enabled: postIds.length > 0,
+  });
+}
+
 export function useCreatePost() {
   const qc = useQueryClient();
   return useMutation({
@@ -43,6 +52,7 @@ export function useUpdatePost() {
     onSuccess: (_, { id }) => {
       qc.invalidateQueries({ queryKey: ["posts"] });
       qc.invalidateQueries({ queryKey: ["post", id] });
+      qc.invalidateQueries({ queryKey: ["post-validations"] });
     },
   });
 }
@@ -76,8 +76,22 @@ export function useSSE({ threadId, isResume }: UseSSEOptions): UseSSEReturn {
       setEvents((prev) => [...prev, { event: "interrupt", data }]);
       setIsInterrupted(true);
       setInterruptData(data);
+      // Stay connected: a background image may still arrive before "paused"
       doneRef.current = true;
-      cleanup();
+    });
+
+    source.addEventListener("image_ready", (e) => {
+      const data = JSON.parse(e.data);
+      setEvents((prev) => [...prev, { event: "image_ready", data }]);
+      setInterruptData((prev) =>
+        prev
+          ? {
+              ...prev,
+              image_url: data.image_url || "",
+              image_generation_status: data.image_generation_status,
+            }
+          : prev,
+      );
     });
 
     source.addEventListener("complete", (e) => {
@@ -96,6 +110,11 @@ export function useSSE({ threadId, isResume }: UseSSEOptions): UseSSEReturn {
       cleanup();
     });
 
+    source.addEventListener("cancelled", () => {
+      doneRef.current = true;
+      cleanup();
+    });
+
     source.addEventListener("error", (e) => {
       if (e instanceof MessageEvent) {
         const data = JSON.parse(e.data);
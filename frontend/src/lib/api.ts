@@ -54,9 +54,17 @@ export const runAgent = (data: {
 
 export const resumeAgent = (
   threadId: string,
-  data: { status: string; feedback?: string; content_override?: string },
+  data: {
+    status: string;
+    feedback?: string;
+    content_override?: string;
+    regenerate_image?: boolean;
+  },
 ) => api.post(`/agent/resume/${threadId}`, data).then((r) => r.data);
 
+export const cancelAgentRun = (threadId: string) =>
+  api.post(`/agent/cancel/${threadId}`).then((r) => r.data);
+
 export const fetchAgentStatus = (threadId: string) =>
   api.get(`/agent/status/${threadId}`).then((r) => r.data);
 
@@ -116,6 +124,12 @@ export const upsertSetting = (key: string, value: string) =>
 export const validateLinkedIn = (content: string): Promise<LinkedInValidation> =>
   api.post("/typefully/validate", { content }).then((r) => r.data);
 
+export const validateLinkedInBatch = (body: {
+  contents?: string[];
+  post_ids?: string[];
+}): Promise<{ results: LinkedInValidation[]; posts: Record<string, LinkedInValidation> }> =>
+  api.post("/typefully/validate/batch", body).then((r) => r.data);
+
 export const pushToTypefully = (postId: string): Promise<{ draft_id: string }> =>
   api.post("/typefully/draft", { post_id: postId }).then((r) => r.data);
 
@@ -125,6 +139,14 @@ export const scheduleOnTypefully = (
 ): Promise<{ draft_id: string }> =>
   api.post("/typefully/schedule", { post_id: postId, publish_at: publishAt }).then((r) => r.data);
 
+export const scheduleManyOnTypefully = (
+  items: { post_id: string; publish_at: string }[],
+): Promise<{
+  results: { post_id: string; success: boolean; draft_id: string | null; error: string | null }[];
+  scheduled: number;
+  failed: number;
+}> => api.post("/typefully/schedule/bulk", { items }).then((r) => r.data);
+
 export const fetchTypefullyProfile = (): Promise<{
   name: string;
   profile_image_url: string;
@@ -134,8 +156,13 @@ export const fetchTypefullyProfile = (): Promise<{
 
 export const getTypefullyStatus = (
   postId: string,
-): Promise<{ status: string; draft: Record<string, unknown> }> =>
-  api.get(`/typefully/draft/${postId}`).then((r) => r.data);
+  refresh = false,
+): Promise<{
+  status: string;
+  publish_at: string | null;
+  synced_at: string | null;
+  post_status: string;
+}> => api.get(`/typefully/draft/${postId}`, { params: { refresh } }).then((r) => r.data);
 
 // Health
 export const fetchHealth = () =>
@@ -10,6 +10,8 @@ export interface Post {
   uploaded_file_text: string | null;
   revision_count: number;
   typefully_draft_id: string | null;
+  typefully_status: string | null;
+  typefully_publish_at: string | null;
   created_at: string;
   updated_at: string;
 }